@@ -0,0 +1,336 @@
+"""Mede vazão e memória da Fila, do despacho do Hospital, da simulação e dos relatórios
+
+Os dados vêm de utils.geradores com semente fixa, de modo que execuções com os
+mesmos argumentos processam exatamente os mesmos pacientes e médicos. Uso:
+
+    python -m benchmarks.desempenho --tamanho pequeno --saida base.json
+    python -m benchmarks.desempenho --tamanho pequeno --base base.json
+
+Cada amostra soma ao menos TEMPO_MINIMO_AMOSTRA segundos medidos: casos
+curtos são preparados e executados de novo até atingir esse tempo, para que o
+ruído de uma execução isolada não se confunda com regressão.
+
+Com --base, os casos cuja vazão caiu mais que --tolerancia em relação à base
+são apontados como regressão e o processo termina com código 1.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+from models.fila import Fila
+from models.hospital import Hospital
+from services.atendimento import SimuladorAtendimento, MODO_EVENTOS
+from services.relatorios import gerar_relatorio
+from utils.geradores import fluxo_chegadas, gerar_lote_pacientes, gerar_medicos_aleatorios
+from utils.relogio import RelogioSimulado
+from utils.saida import silenciar
+
+# tamanho: (pacientes, médicos)
+TAMANHOS = {
+    'pequeno': (1000, 10),
+    'medio': (100000, 100),
+    'grande': (1000000, 1000),
+}
+TEMPO_MINIMO_AMOSTRA = 0.2  # segundos medidos por amostra, somando execuções repetidas
+TEMPO_MEDIO_ATENDIMENTO = 30  # minutos, centro da faixa padrão de gerar_medicos_aleatorios
+OCUPACAO_ALVO = 0.95  # taxa de chegadas da simulação frente à capacidade dos médicos
+
+# Um caso prepara seus dados e devolve a função medida, que retorna o número de operações
+Caso = Callable[[int, int, int], Callable[[], int]]
+
+
+def _pacientes(quantidade: int, semente: int) -> list:
+    return list(gerar_lote_pacientes(quantidade, semente, inicio=0.0))
+
+
+def _hospital(medicos: int, semente: int) -> Tuple[Hospital, RelogioSimulado]:
+    relogio = RelogioSimulado(0.0)
+    hospital = Hospital('Benchmark', relogio)
+    for medico in gerar_medicos_aleatorios(medicos, relogio, semente=semente):
+        hospital.adicionar_medico(medico)
+    return hospital, relogio
+
+
+def _esvaziar(hospital: Hospital, relogio: RelogioSimulado) -> int:
+    """Atende pacientes até não haver mais término previsto; retorna quantos foram atendidos"""
+    atendidos = len(hospital.pacientes_atendidos)
+    with silenciar():
+        hospital.atender_pacientes(relogio.agora())
+        while (proximo := hospital.proximo_termino()) is not None:
+            relogio.definir(proximo)
+            hospital.finalizar_atendimentos(proximo)
+            hospital.atender_pacientes(proximo)
+    return len(hospital.pacientes_atendidos) - atendidos
+
+
+def _repetir(funcao: Callable[[], object]) -> int:
+    """Chama a função repetidamente por TEMPO_MINIMO_AMOSTRA; retorna o número de chamadas"""
+    chamadas = 0
+    fim = perf_counter() + TEMPO_MINIMO_AMOSTRA
+    while chamadas == 0 or perf_counter() < fim:
+        funcao()
+        chamadas += 1
+    return chamadas
+
+
+def caso_fila_adicionar_paciente(pacientes: int, medicos: int, semente: int) -> Callable[[], int]:
+    lista = _pacientes(pacientes, semente)
+    fila = Fila(RelogioSimulado(0.0))
+
+    def executar() -> int:
+        for paciente in lista:
+            fila.adicionar_paciente(paciente)
+        return len(lista)
+    return executar
+
+
+def caso_fila_adicionar_varios(pacientes: int, medicos: int, semente: int) -> Callable[[], int]:
+    lista = _pacientes(pacientes, semente)
+    fila = Fila(RelogioSimulado(0.0))
+
+    def executar() -> int:
+        fila.adicionar_varios(lista)
+        return len(lista)
+    return executar
+
+
+def caso_fila_atender_proximo(pacientes: int, medicos: int, semente: int) -> Callable[[], int]:
+    fila = Fila(RelogioSimulado(0.0))
+    fila.adicionar_varios(_pacientes(pacientes, semente))
+
+    def executar() -> int:
+        atendidos = 0
+        while fila.atender_proximo() is not None:
+            atendidos += 1
+        return atendidos
+    return executar
+
+
+def caso_hospital_admitir_paciente(pacientes: int, medicos: int, semente: int) -> Callable[[], int]:
+    lista = _pacientes(pacientes, semente)
+    hospital, _ = _hospital(medicos, semente)
+
+    def executar() -> int:
+        for paciente in lista:
+            hospital.admitir_paciente(paciente)
+        return len(lista)
+    return executar
+
+
+def caso_hospital_despacho(pacientes: int, medicos: int, semente: int) -> Callable[[], int]:
+    """atender_pacientes/finalizar_atendimentos até esvaziar as filas atendidas"""
+    hospital, relogio = _hospital(medicos, semente)
+    for paciente in _pacientes(pacientes, semente):
+        hospital.admitir_paciente(paciente)
+    return lambda: _esvaziar(hospital, relogio)
+
+
+def _hospital_atendido(pacientes: int, medicos: int, semente: int) -> Hospital:
+    hospital, relogio = _hospital(medicos, semente)
+    for paciente in _pacientes(pacientes, semente):
+        hospital.admitir_paciente(paciente)
+    _esvaziar(hospital, relogio)
+    return hospital
+
+
+def caso_hospital_gerar_relatorio(pacientes: int, medicos: int, semente: int) -> Callable[[], int]:
+    """Relatório recalculado a cada chamada, como após cada mudança de estado"""
+    hospital = _hospital_atendido(pacientes, medicos, semente)
+
+    def gerar() -> None:
+        hospital.invalidar_relatorio()
+        hospital.gerar_relatorio()
+    return lambda: _repetir(gerar)
+
+
+def caso_hospital_gerar_relatorio_cache(pacientes: int, medicos: int, semente: int) -> Callable[[], int]:
+    """Chamadas repetidas sem mudança de estado, atendidas pelo relatório guardado"""
+    hospital = _hospital_atendido(pacientes, medicos, semente)
+    return lambda: _repetir(hospital.gerar_relatorio)
+
+
+def _simulador(pacientes: int, medicos: int, semente: int) -> SimuladorAtendimento:
+    relogio = RelogioSimulado(0.0)
+    taxa_por_hora = medicos * 60 / TEMPO_MEDIO_ATENDIMENTO * OCUPACAO_ALVO
+    chegadas = list(fluxo_chegadas(taxa_por_hora, semente, inicio=0.0, limite=pacientes))
+    duracao = chegadas[-1].hora_chegada / 60 + 4 * 60 if chegadas else 60
+    return SimuladorAtendimento(Fila(relogio), gerar_medicos_aleatorios(medicos, relogio, semente=semente),
+                                duracao, modo=MODO_EVENTOS, relogio=relogio, chegadas=chegadas,
+                                guardar_atendidos=False, exibir=False)
+
+
+def caso_simulador_eventos(pacientes: int, medicos: int, semente: int) -> Callable[[], int]:
+    """Turno completo no modo eventos, com chegadas a 95% da capacidade dos médicos"""
+    simulador = _simulador(pacientes, medicos, semente)
+
+    def executar() -> int:
+        simulador.executar()
+        return simulador.estatisticas.total
+    return executar
+
+
+def caso_relatorios_gerar_relatorio(pacientes: int, medicos: int, semente: int) -> Callable[[], int]:
+    simulador = _simulador(pacientes, medicos, semente)
+    simulador.executar()
+    return lambda: _repetir(lambda: gerar_relatorio(simulador, exibir=False))
+
+
+CASOS: Dict[str, Caso] = {
+    'fila.adicionar_paciente': caso_fila_adicionar_paciente,
+    'fila.adicionar_varios': caso_fila_adicionar_varios,
+    'fila.atender_proximo': caso_fila_atender_proximo,
+    'hospital.admitir_paciente': caso_hospital_admitir_paciente,
+    'hospital.despacho': caso_hospital_despacho,
+    'hospital.gerar_relatorio': caso_hospital_gerar_relatorio,
+    'hospital.gerar_relatorio_cache': caso_hospital_gerar_relatorio_cache,
+    'simulador.eventos': caso_simulador_eventos,
+    'relatorios.gerar_relatorio': caso_relatorios_gerar_relatorio,
+}
+
+
+def _amostra(caso: Caso, pacientes: int, medicos: int, semente: int) -> Tuple[float, int]:
+    """Prepara e executa o caso até somar TEMPO_MINIMO_AMOSTRA segundos medidos
+
+    Returns:
+        Tuple[float, int]: (segundos medidos, operações executadas)
+    """
+    segundos = 0.0
+    operacoes = 0
+    while segundos < TEMPO_MINIMO_AMOSTRA:
+        executar = caso(pacientes, medicos, semente)
+        # Como no timeit: coletas do lixo disparadas pelos dados da preparação
+        # variam de uma execução para outra e não entram na medição
+        gc.collect()
+        gc.disable()
+        try:
+            inicio = perf_counter()
+            operacoes += executar()
+            segundos += perf_counter() - inicio
+        finally:
+            gc.enable()
+    return segundos, operacoes
+
+
+def _melhor(amostras: List[Tuple[float, int]]) -> Dict:
+    """Resume as amostras de um caso pela de menor tempo por operação"""
+    segundos, operacoes = min(amostras, key=lambda amostra: amostra[0] / max(amostra[1], 1))
+    return {
+        'segundos': segundos,
+        'operacoes': operacoes,
+        'segundos_por_operacao': segundos / operacoes if operacoes else 0.0,
+        'operacoes_por_segundo': operacoes / segundos if segundos > 0 else 0.0,
+    }
+
+
+def _memoria_pico(caso: Caso, pacientes: int, medicos: int, semente: int) -> int:
+    """Pico de memória de uma execução do caso, medido com tracemalloc"""
+    executar = caso(pacientes, medicos, semente)
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        executar()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def executar_benchmarks(pacientes: int, medicos: int, semente: int = 0, repeticoes: int = 5,
+                        memoria: bool = True, casos: Optional[list] = None) -> Dict:
+    """Executa os casos selecionados (padrão: todos) e retorna o documento de resultados
+
+    As amostras são intercaladas (uma de cada caso por rodada), de modo que as
+    variações de velocidade da máquina ao longo da execução atinjam todos os
+    casos, em vez de derrubar todas as amostras de um só. Fica a amostra de
+    menor tempo por operação. O pico de memória é medido numa execução
+    adicional com tracemalloc, que deixaria os tempos mais lentos.
+    """
+    nomes = list(casos or CASOS)
+    amostras: Dict[str, List[Tuple[float, int]]] = {nome: [] for nome in nomes}
+    for _ in range(repeticoes):
+        for nome in nomes:
+            amostras[nome].append(_amostra(CASOS[nome], pacientes, medicos, semente))
+
+    resultados = {}
+    for nome in nomes:
+        resultados[nome] = _melhor(amostras[nome])
+        if memoria:
+            resultados[nome]['memoria_pico_bytes'] = _memoria_pico(CASOS[nome], pacientes, medicos, semente)
+        print(_linha(nome, resultados[nome]))
+    return {
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'pacientes': pacientes,
+        'medicos': medicos,
+        'semente': semente,
+        'resultados': resultados,
+    }
+
+
+def _linha(nome: str, resultado: Dict) -> str:
+    memoria = resultado.get('memoria_pico_bytes')
+    memoria = f"{memoria / 2 ** 20:10.1f} MiB" if memoria is not None else ''
+    por_operacao = resultado['segundos_por_operacao'] * 1e6
+    return (f"{nome:<32} {resultado['operacoes_por_segundo']:>14,.0f} op/s {por_operacao:>11.3f} µs/op "
+            f"{resultado['segundos']:>7.3f} s {memoria}")
+
+
+def comparar(atual: Dict, base: Dict, tolerancia: float = 0.1) -> Dict[str, Dict]:
+    """Compara a vazão de cada caso presente nos dois documentos
+
+    Returns:
+        Dict: {caso: {'razao': vazão atual / vazão base, 'regressao': bool}}
+    """
+    if (atual['pacientes'], atual['medicos']) != (base['pacientes'], base['medicos']):
+        raise ValueError("Os resultados comparados foram medidos com tamanhos diferentes")
+    comparacao = {}
+    for nome, resultado in atual['resultados'].items():
+        referencia = base['resultados'].get(nome)
+        if not referencia or not referencia['operacoes_por_segundo']:
+            continue
+        razao = resultado['operacoes_por_segundo'] / referencia['operacoes_por_segundo']
+        comparacao[nome] = {'razao': razao, 'regressao': razao < 1 - tolerancia}
+    return comparacao
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanho', choices=TAMANHOS, default='pequeno',
+                        help='pequeno: 1k pacientes/10 médicos; medio: 100k/100; grande: 1M/1000')
+    parser.add_argument('--pacientes', type=int, help='substitui o número de pacientes do tamanho')
+    parser.add_argument('--medicos', type=int, help='substitui o número de médicos do tamanho')
+    parser.add_argument('--casos', nargs='+', choices=CASOS, help='casos a executar (padrão: todos)')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--sem-memoria', action='store_true', help='não mede o pico de memória')
+    parser.add_argument('--saida', help='grava os resultados em JSON neste arquivo')
+    parser.add_argument('--base', help='JSON de resultados anteriores para comparação')
+    parser.add_argument('--tolerancia', type=float, default=0.1,
+                        help='queda de vazão tolerada antes de apontar regressão (fração)')
+    args = parser.parse_args()
+
+    pacientes, medicos = TAMANHOS[args.tamanho]
+    documento = executar_benchmarks(args.pacientes or pacientes, args.medicos or medicos, args.semente,
+                                    args.repeticoes, not args.sem_memoria, args.casos)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(documento, arquivo, indent=2)
+
+    if not args.base:
+        return 0
+    with open(args.base, encoding='utf-8') as arquivo:
+        base = json.load(arquivo)
+    comparacao = comparar(documento, base, args.tolerancia)
+    print(f"\nComparação com {args.base}:")
+    for nome, dados in comparacao.items():
+        marca = '  REGRESSÃO' if dados['regressao'] else ''
+        print(f"  {nome:<32} {dados['razao']:6.2f}x{marca}")
+    return 1 if any(dados['regressao'] for dados in comparacao.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Compara a vazão da FilaFragmentada com a FilaSincronizada
+
+Mede, para cada número de threads, três cenários: só admissões (cada
+produtor admite um lote próprio), só atendimentos (consumidores esvaziam
+uma fila já cheia) e misto (produtores admitem enquanto consumidores
+esvaziam a fila). A coluna "escala" é a vazão relativa à de uma thread.
+Com o GIL as threads não executam Python em paralelo: o esperado é que a
+vazão da fila fragmentada se mantenha com mais threads, enquanto a do lock
+único cai com a disputa. No cenário misto, com mais produtores a fila cresce
+mais rápido do que é esvaziada e cada atendimento fica mais caro; a vazão
+tende então ao custo somado de uma admissão e de um atendimento. Uso:
+
+    python -m benchmarks.fila_concorrente --pacientes 200000 --threads 1 2 4 8
+"""
+import argparse
+import threading
+from time import perf_counter
+from typing import Callable, Dict, List
+from models.fila_concorrente import FilaFragmentada, FilaSincronizada
+from utils.geradores import gerar_lote_pacientes
+
+IMPLEMENTACOES = {
+    'sincronizada': FilaSincronizada,
+    'fragmentada': FilaFragmentada,
+}
+
+
+def _executar(alvos: List[Callable[[], None]]) -> float:
+    """Tempo para executar cada alvo numa thread própria, todas ao mesmo tempo"""
+    threads = [threading.Thread(target=alvo) for alvo in alvos]
+    inicio = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return perf_counter() - inicio
+
+
+def medir_admissao(classe, lotes: List[list]) -> float:
+    """Tempo para admitir os lotes, um produtor por lote, sem consumidores"""
+    fila = classe()
+
+    def produzir(lote):
+        for paciente in lote:
+            fila.adicionar_paciente(paciente)
+
+    return _executar([lambda lote=lote: produzir(lote) for lote in lotes])
+
+
+def medir_atendimento(classe, pacientes: list, consumidores: int) -> float:
+    """Tempo para `consumidores` threads esvaziarem uma fila com os pacientes"""
+    fila = classe()
+    fila.adicionar_varios(pacientes)
+
+    def consumir():
+        while fila.atender_proximo() is not None:
+            pass
+
+    return _executar([consumir] * consumidores)
+
+
+def medir(classe, lotes: List[list], consumidores: int) -> float:
+    """Tempo para admitir e atender todos os pacientes dos lotes"""
+    fila = classe()
+    total = sum(len(lote) for lote in lotes)
+    restantes = [total]
+    trava = threading.Lock()
+
+    def produzir(lote):
+        for paciente in lote:
+            fila.adicionar_paciente(paciente)
+
+    def consumir():
+        while True:
+            with trava:
+                if restantes[0] == 0:
+                    return
+                restantes[0] -= 1
+            fila.atender_proximo(timeout=None)
+
+    return _executar([lambda lote=lote: produzir(lote) for lote in lotes]
+                     + [consumir] * consumidores)
+
+
+def _tabela(titulo: str, threads: List[int], medicao: Callable[[type, int], float],
+            total: int) -> None:
+    print(f"\n{titulo} (pacientes/s)")
+    print(f"{'threads':>8} " + ' '.join(f'{nome:>14} {"escala":>7}' for nome in IMPLEMENTACOES))
+    base: Dict[str, float] = {}
+    for quantidade in threads:
+        colunas = []
+        for nome, classe in IMPLEMENTACOES.items():
+            vazao = total / medicao(classe, quantidade)
+            base.setdefault(nome, vazao)
+            colunas.append(f'{vazao:>14,.0f} {vazao / base[nome]:>6.2f}x')
+        print(f'{quantidade:>8} ' + ' '.join(colunas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pacientes', type=int, default=100000)
+    parser.add_argument('--threads', '--produtores', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--consumidores', type=int, default=2,
+                        help='consumidores no cenário misto')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    pacientes = list(gerar_lote_pacientes(args.pacientes, args.semente, inicio=0.0))
+
+    def lotes(quantidade):
+        return [pacientes[i::quantidade] for i in range(quantidade)]
+
+    _tabela('Admissão: N produtores', args.threads,
+            lambda classe, n: medir_admissao(classe, lotes(n)), args.pacientes)
+    _tabela('Atendimento: N consumidores', args.threads,
+            lambda classe, n: medir_atendimento(classe, pacientes, n), args.pacientes)
+    _tabela(f'Misto: N produtores, {args.consumidores} consumidores', args.threads,
+            lambda classe, n: medir(classe, lotes(n), args.consumidores), args.pacientes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+# Quantidade de pacientes exibidos por fila nas telas de acompanhamento
+TAMANHO_PAGINA_FILA = 10
@@ -2,48 +2,60 @@ from models.paciente import Paciente
 from models.fila import Fila
 from models.medico import Medico
 from models.especialidade import Especialidade
-from utils.geradores import gerar_pacientes_aleatorios, gerar_medicos_aleatorios
-from services.atendimento import SimuladorAtendimento
+from utils.geradores import gerar_pacientes_aleatorios, gerar_medicos_aleatorios, fluxo_chegadas
+from services.atendimento import SimuladorAtendimento, MODO_EVENTOS
 from services.relatorios import gerar_relatorio
+from utils.saida import configurar_saida, obter_logger
 import time
 
+_saida = obter_logger(__name__)
+
 
 def main():
     # Configuração
-    num_pacientes = 20  # Reduzido para demonstração
+    num_pacientes = 20  # Já aguardando no início (reduzido para demonstração)
+    chegadas_por_hora = 4  # Novos pacientes ao longo do turno
     num_medicos = 5
     tempo_simulacao = 480  # minutos (8 horas)
-    tempo_intervalo = 1  # segundos entre passos da simulação
+    tempo_intervalo = 1  # segundos entre passos da simulação (modo tempo real)
+    modo = MODO_EVENTOS  # relógio virtual: a simulação não espera o tempo passar
 
-    print("=== INICIANDO SIMULAÇÃO HOSPITALAR ===")
+    # Mensagens gravadas em lotes por uma thread à parte (ver utils.saida)
+    configurar_saida()
+    _saida.info("=== INICIANDO SIMULAÇÃO HOSPITALAR ===")
 
     # Gerar dados iniciais
-    print("\nGerando recursos hospitalares...")
+    _saida.info("\nGerando recursos hospitalares...")
     medicos = gerar_medicos_aleatorios(num_medicos)
     pacientes = gerar_pacientes_aleatorios(num_pacientes)
 
     # Inicializar fila prioritária
     fila = Fila()
-    for paciente in pacientes:
-        fila.adicionar_paciente(paciente)
+    fila.adicionar_varios(pacientes)
+
+    # Chegadas ao longo do turno, geradas sob demanda durante a simulação
+    chegadas = fluxo_chegadas(chegadas_por_hora, duracao_turno=tempo_simulacao,
+                              id_inicial=num_pacientes + 1)
 
     # Inicializar simulador
     simulador = SimuladorAtendimento(
         fila=fila,
         medicos=medicos,
         tempo_total=tempo_simulacao,
-        intervalo=tempo_intervalo
+        intervalo=tempo_intervalo,
+        modo=modo,
+        chegadas=chegadas
     )
 
     # Executar simulação
-    print("\nIniciando simulação...")
+    _saida.info("\nIniciando simulação...")
     simulador.executar()
 
     # Gerar relatórios
-    print("\nGerando relatórios finais...")
+    _saida.info("\nGerando relatórios finais...")
     gerar_relatorio(simulador)
 
-    print("\n=== SIMULAÇÃO CONCLUÍDA ===")
+    _saida.info("\n=== SIMULAÇÃO CONCLUÍDA ===")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+from heapq import heapify, heappush, heappop
+from typing import Callable, Dict, Hashable, List, Optional
+from models.medico import Medico
+
+
+class IndiceDisponibilidade:
+    """Índice de médicos livres por grupo e de términos previstos de atendimento
+
+    Evita varrer todos os médicos a cada passo: o despacho consulta apenas os
+    grupos com médicos livres e a finalização apenas os atendimentos cujo
+    término previsto já passou. Médicos livres de um grupo são entregues na
+    ordem de cadastro, como no laço sobre a lista de médicos.
+
+    O índice precisa ser avisado de cada mudança de estado (ocupar/liberar);
+    médicos atendidos por fora dele ficam desatualizados.
+    """
+
+    def __init__(self, agrupar: Optional[Callable[[Medico], Hashable]] = None):
+        """
+        Args:
+            agrupar: Função que define o grupo do médico (padrão: especialidade)
+        """
+        self._agrupar = agrupar or (lambda medico: medico.especialidade)
+        self._livres: Dict[Hashable, list] = {}  # grupo: heap de (ordem, médico)
+        self._terminos = []  # heap de (hora_fim_prevista, ordem, médico)
+        self._ordem: Dict[int, int] = {}  # id(médico): ordem de cadastro
+
+    def adicionar(self, medico: Medico) -> None:
+        """Cadastra um médico no índice, livre ou ocupado"""
+        self._ordem[id(medico)] = len(self._ordem)
+        self._livres.setdefault(self._agrupar(medico), [])
+        if medico.ocupado:
+            self.ocupar(medico)
+        else:
+            self.liberar(medico)
+
+    def grupos_com_livres(self) -> List[Hashable]:
+        """Retorna os grupos que têm ao menos um médico livre"""
+        return [grupo for grupo, livres in self._livres.items() if livres]
+
+    def tem_livre(self, grupo: Hashable) -> bool:
+        """Retorna True se há médico livre no grupo"""
+        return bool(self._livres.get(grupo))
+
+    def total_livres(self) -> int:
+        """Retorna o número de médicos livres em todos os grupos"""
+        return sum(len(livres) for livres in self._livres.values())
+
+    def retirar_livre(self, grupo: Hashable) -> Optional[Medico]:
+        """Remove e retorna o primeiro médico livre do grupo (ou None)"""
+        livres = self._livres.get(grupo)
+        if not livres:
+            return None
+        return heappop(livres)[1]
+
+    def retirar(self, medico: Medico) -> None:
+        """Remove um médico específico dos livres (ex.: ao reproduzir um diário)"""
+        livres = self._livres[self._agrupar(medico)]
+        if livres and livres[0][1] is medico:
+            heappop(livres)
+            return
+        livres.remove((self._ordem[id(medico)], medico))
+        heapify(livres)
+
+    def ocupar(self, medico: Medico) -> None:
+        """Registra o término previsto de um médico que acabou de iniciar atendimento"""
+        heappush(self._terminos, (medico.hora_fim_prevista, self._ordem[id(medico)], medico))
+
+    def liberar(self, medico: Medico) -> None:
+        """Devolve o médico ao grupo de livres"""
+        heappush(self._livres[self._agrupar(medico)], (self._ordem[id(medico)], medico))
+
+    def proximo_termino(self) -> Optional[float]:
+        """Retorna o instante do próximo término previsto (ou None)"""
+        self._descartar_obsoletos()
+        return self._terminos[0][0] if self._terminos else None
+
+    def concluidos(self, agora: float) -> List[Medico]:
+        """Remove e retorna os médicos cujo atendimento terminou até `agora`
+
+        Os médicos retornados continuam ocupados: cabe ao chamador finalizar
+        o atendimento e chamar liberar().
+        """
+        medicos = []
+        self._descartar_obsoletos()
+        while self._terminos and self._terminos[0][0] <= agora:
+            medicos.append(heappop(self._terminos)[2])
+            self._descartar_obsoletos()
+        return medicos
+
+    def _descartar_obsoletos(self) -> None:
+        """Remove términos de atendimentos já finalizados por fora do índice"""
+        terminos = self._terminos
+        while terminos and terminos[0][0] != terminos[0][2].hora_fim_prevista:
+            heappop(terminos)
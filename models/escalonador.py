@@ -0,0 +1,133 @@
+from abc import ABC, abstractmethod
+from heapq import heappush, heappop
+from itertools import count
+from typing import Dict, Optional, Tuple
+from models.especialidade import Especialidade
+from models.fila import Fila
+from models.paciente import Paciente
+
+# Filas que os médicos de cada especialidade podem atender, em ordem de preferência.
+# Clínicos gerais e urgência cobrem um ao outro; especialistas também atendem a
+# clínica geral quando sua própria fila está vazia ou menos prioritária.
+COMPATIBILIDADE_PADRAO: Dict[Especialidade, Tuple[Especialidade, ...]] = {
+    especialidade: (especialidade, Especialidade.CLINICO_GERAL) for especialidade in Especialidade
+}
+COMPATIBILIDADE_PADRAO[Especialidade.CLINICO_GERAL] = (Especialidade.CLINICO_GERAL, Especialidade.URGENCIA)
+COMPATIBILIDADE_PADRAO[Especialidade.URGENCIA] = (Especialidade.URGENCIA, Especialidade.CLINICO_GERAL)
+
+
+class Escalonador(ABC):
+    """Decide de qual fila um médico livre deve chamar o próximo paciente"""
+
+    def configurar(self, filas: Dict[Especialidade, Fila]) -> None:
+        """Associa o escalonador às filas de espera do hospital"""
+        self.filas = filas
+
+    def filas_atendidas(self, especialidade: Especialidade) -> Tuple[Especialidade, ...]:
+        """Filas que um médico da especialidade pode atender"""
+        return (especialidade,)
+
+    def notificar(self, especialidade: Especialidade) -> None:
+        """Avisa que o início da fila da especialidade pode ter mudado"""
+
+    @abstractmethod
+    def escolher(self, especialidade: Especialidade, agora: float) -> Optional[Especialidade]:
+        """Retorna a fila de onde um médico da especialidade deve chamar o próximo paciente
+
+        Returns:
+            Especialidade da fila escolhida ou None se não houver paciente compatível
+        """
+
+
+class EscalonadorPorEspecialidade(Escalonador):
+    """Cada médico atende apenas a fila da sua especialidade"""
+
+    def escolher(self, especialidade: Especialidade, agora: float) -> Optional[Especialidade]:
+        return especialidade if len(self.filas[especialidade]) > 0 else None
+
+
+class EscalonadorMultiFila(Escalonador):
+    """Escolhe o paciente mais prioritário entre todas as filas compatíveis com o médico
+
+    A prioridade de um paciente no início de cada fila é sua gravidade reduzida
+    de `envelhecimento` níveis por hora de espera, o que evita que filas de
+    menor gravidade fiquem esperando indefinidamente. Como o envelhecimento é
+    o mesmo para todos, a ordem entre pacientes não muda com o tempo e a chave
+    pode ficar fixa numa heap: cada especialidade de médico tem uma heap com o
+    início das filas que atende, e a escolha custa O(log filas).
+
+    O envelhecimento compara os primeiros de cada fila; dentro de uma fila a
+    ordem continua sendo a da própria Fila (gravidade, chegada).
+    """
+
+    def __init__(self, compatibilidade: Optional[Dict[Especialidade, Tuple[Especialidade, ...]]] = None,
+                 envelhecimento: float = 1.0):
+        """
+        Args:
+            compatibilidade: Filas atendidas por médicos de cada especialidade
+                (padrão: COMPATIBILIDADE_PADRAO); a própria fila é sempre incluída
+            envelhecimento: Níveis de gravidade descontados por hora de espera
+        """
+        compatibilidade = compatibilidade or COMPATIBILIDADE_PADRAO
+        self.envelhecimento = envelhecimento
+        self._compatibilidade: Dict[Especialidade, Tuple[Especialidade, ...]] = {}
+        self._atendentes: Dict[Especialidade, list] = {esp: [] for esp in Especialidade}
+        for especialidade in Especialidade:
+            filas = (especialidade,) + tuple(f for f in compatibilidade.get(especialidade, ())
+                                             if f != especialidade)
+            self._compatibilidade[especialidade] = filas
+            for fila in filas:
+                self._atendentes[fila].append(especialidade)
+
+        self._heaps: Dict[Especialidade, list] = {esp: [] for esp in Especialidade}
+        self._cabecas: Dict[Especialidade, Optional[Tuple[float, Paciente]]] = {}
+        self._seq = count()
+
+    def configurar(self, filas: Dict[Especialidade, Fila]) -> None:
+        super().configurar(filas)
+        for especialidade in filas:
+            self.notificar(especialidade)
+
+    def filas_atendidas(self, especialidade: Especialidade) -> Tuple[Especialidade, ...]:
+        return self._compatibilidade[especialidade]
+
+    def _chave(self, paciente: Paciente) -> float:
+        # gravidade - envelhecimento * (agora - chegada) / 3600, sem o termo comum em `agora`
+        return paciente.gravidade + self.envelhecimento * paciente.hora_chegada / 3600
+
+    def notificar(self, especialidade: Especialidade) -> None:
+        primeiro = self.filas[especialidade].ver_proximo()
+        if primeiro is None:
+            self._cabecas[especialidade] = None
+            return
+
+        cabeca = (self._chave(primeiro), primeiro)
+        anterior = self._cabecas.get(especialidade)
+        if anterior is not None and anterior[1] is primeiro and anterior[0] == cabeca[0]:
+            return
+        self._cabecas[especialidade] = cabeca
+
+        for atendente in self._atendentes[especialidade]:
+            heap = self._heaps[atendente]
+            heappush(heap, (cabeca[0], primeiro.hora_chegada, next(self._seq), especialidade, primeiro))
+            if len(heap) > 4 * len(self._compatibilidade[atendente]) + 64:
+                self._reconstruir(atendente)
+
+    def escolher(self, especialidade: Especialidade, agora: float) -> Optional[Especialidade]:
+        heap = self._heaps[especialidade]
+        while heap:
+            chave, _, _, fila, paciente = heap[0]
+            cabeca = self._cabecas.get(fila)
+            if cabeca is not None and cabeca[1] is paciente and cabeca[0] == chave:
+                return fila
+            heappop(heap)  # entrada obsoleta: o início da fila mudou
+        return None
+
+    def _reconstruir(self, atendente: Especialidade) -> None:
+        """Descarta entradas obsoletas, mantendo só o início atual de cada fila compatível"""
+        heap = []
+        for fila in self._compatibilidade[atendente]:
+            cabeca = self._cabecas.get(fila)
+            if cabeca is not None:
+                heappush(heap, (cabeca[0], cabeca[1].hora_chegada, next(self._seq), fila, cabeca[1]))
+        self._heaps[atendente] = heap
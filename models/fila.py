@@ -1,55 +1,329 @@
-from heapq import heappush, heappop
-from typing import List
-import time
+from heapq import heapify, heappush, heappop, nlargest
+from math import log2
+from operator import itemgetter
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from config import TAMANHO_PAGINA_FILA
 from models.paciente import Paciente
+from utils.metricas import Metricas, METRICAS_DESATIVADAS
+from utils.relogio import Relogio, RELOGIO_REAL
+from utils.saida import mostrar, mostrar_ativo, obter_logger
+
+_saida = obter_logger(__name__)
 
 class Fila:
-    def __init__(self):
-        # Usando heap para eficiência na priorização
+    def __init__(self, relogio: Optional[Relogio] = None, metricas: Optional[Metricas] = None,
+                 sequencia: Optional[Iterator[int]] = None):
+        """
+        Args:
+            relogio: Fonte de tempo (padrão: relógio do sistema)
+            metricas: Coletor de latências das operações (padrão: desativado)
+            sequencia: Contador de desempate compartilhado com outras filas, para
+                que pacientes movidos entre elas mantenham a ordem de inserção
+                (padrão: contador próprio)
+        """
+        self.relogio = relogio or RELOGIO_REAL
+        self.metricas = metricas or METRICAS_DESATIVADAS
+        # Usando heap indexada para eficiência na priorização: cada entrada
+        # (prioridade, paciente) tem sua posição registrada por ID do paciente
         self._fila = []
+        self._posicoes: Dict[int, int] = {}  # ID paciente: índice na heap
         self._contador = 0  # Para desempate em casos de mesma prioridade
+        self._sequencia = sequencia
 
     def adicionar_paciente(self, paciente: Paciente) -> None:
         """Adiciona paciente na fila com base na gravidade e tempo de espera
         Args:
             paciente: Instância de Paciente a ser adicionada
         """
-        prioridade = (paciente.gravidade, paciente.hora_chegada, self._contador)
-        heappush(self._fila, (prioridade, paciente))
-        self._contador += 1
+        inicio = perf_counter() if self.metricas.ativo else None
+        self._fila.append(self._nova_entrada(paciente))
+        self._posicoes[paciente.id] = len(self._fila) - 1
+        self._subir(len(self._fila) - 1)
+        if inicio is not None:
+            self.metricas.observar('fila.adicionar_paciente', perf_counter() - inicio)
+
+    def adicionar_varios(self, pacientes: Iterable[Paciente]) -> None:
+        """Adiciona vários pacientes de uma vez, reorganizando a heap uma única vez
+        Args:
+            pacientes: Pacientes a serem adicionados
+        """
+        novas = []
+        ids = set()
+        for paciente in pacientes:
+            if paciente.id in ids:
+                raise ValueError(f"Paciente {paciente.id} repetido no lote")
+            ids.add(paciente.id)
+            novas.append(self._nova_entrada(paciente))
+        self._inserir_varias(novas)
+
+    def _inserir_varias(self, novas: List[tuple]) -> None:
+        if not novas:
+            return
+        total = len(self._fila) + len(novas)
+        if len(novas) * log2(total) < total:
+            # Poucos pacientes frente à fila existente: inserções individuais
+            for entrada in novas:
+                self._fila.append(entrada)
+                self._posicoes[entrada[1].id] = len(self._fila) - 1
+                self._subir(len(self._fila) - 1)
+        else:
+            self._fila.extend(novas)
+            heapify(self._fila)
+            self._posicoes = {paciente.id: i for i, (_, paciente) in enumerate(self._fila)}
 
     def atender_proximo(self) -> Paciente:
         """Remove e retorna o próximo paciente da fila
         Returns:
             Paciente: O próximo paciente mais prioritário ou None se fila vazia
         """
-        if self._fila:
-            return heappop(self._fila)[1]
-        return None
+        if not self._fila:
+            return None
+        if not self.metricas.ativo:
+            return self._remover_em(0)
+        inicio = perf_counter()
+        paciente = self._remover_em(0)
+        self.metricas.observar('fila.atender_proximo', perf_counter() - inicio)
+        return paciente
 
-    def mostrar_fila(self) -> None:
-        """Exibe a fila atual ordenada por prioridade"""
-        print('\n=== FILA DE ATENDIMENTO ===')
-        print(f'{"ID":<5} | {"Nome":<20} | {"Gravidade":<10} | {"Especialidade":<15} | {"Tempo Espera (min)":<15}')
-        print('-' * 70)
+    def ver_proximo(self) -> Optional[Paciente]:
+        """Retorna o próximo paciente sem removê-lo da fila (None se vazia)"""
+        return self._fila[0][1] if self._fila else None
 
-        # Cria lista ordenada sem modificar a heap original
-        fila_ordenada = sorted(self._fila, key=lambda x: x[0])
-        for prioridade, paciente in fila_ordenada:
-            tempo_espera = (time.time() - paciente.hora_chegada)/60 if paciente.hora_chegada else 0
-            print(f'{paciente.id:<5} | {paciente.nome:<20} | {paciente.gravidade:<10} | '
-                  f'{str(paciente.especialidade):<15} | {tempo_espera:.1f}')
+    def remover(self, paciente_id: int) -> Optional[Paciente]:
+        """Remove um paciente da fila (ex.: desistência ou transferência)
+        Args:
+            paciente_id: ID do paciente a ser removido
+        Returns:
+            Paciente: O paciente removido ou None se não estiver na fila
+        """
+        posicao = self._posicoes.get(paciente_id)
+        if posicao is None:
+            return None
+        return self._remover_em(posicao)
+
+    def atualizar_gravidade(self, paciente_id: int, nova_gravidade: int) -> None:
+        """Reclassifica a gravidade de um paciente em espera, mantendo sua ordem de chegada
+        Args:
+            paciente_id: ID do paciente na fila
+            nova_gravidade: Nova gravidade (1 a 5, 1 = mais grave)
+        """
+        posicao = self._posicoes.get(paciente_id)
+        if posicao is None:
+            raise KeyError(f"Paciente {paciente_id} não está na fila")
 
-        print(f'\nTotal na fila: {len(self._fila)} pacientes')
-        print('=' * 70)
+        (gravidade, hora_chegada, contador), paciente = self._fila[posicao]
+        paciente.gravidade = nova_gravidade
+        self._fila[posicao] = ((nova_gravidade, hora_chegada, contador), paciente)
+        if nova_gravidade < gravidade:
+            self._subir(posicao)
+        else:
+            self._descer(posicao)
+
+    def extrair(self, paciente_id: int) -> Optional[Tuple[tuple, Paciente]]:
+        """Remove um paciente preservando sua prioridade, para reinseri-lo em outra fila
+        Args:
+            paciente_id: ID do paciente a ser removido
+        Returns:
+            Tuple: ((gravidade, hora_chegada, contador), paciente) ou None se não estiver na fila
+        """
+        posicao = self._posicoes.get(paciente_id)
+        if posicao is None:
+            return None
+        prioridade = self._fila[posicao][0]
+        return prioridade, self._remover_em(posicao)
+
+    def reinserir(self, prioridade: tuple, paciente: Paciente) -> None:
+        """Insere um paciente com a prioridade (gravidade, hora_chegada, contador) de extrair()"""
+        if paciente.id in self._posicoes:
+            raise ValueError(f"Paciente {paciente.id} já está na fila")
+        self._fila.append((prioridade, paciente))
+        self._posicoes[paciente.id] = len(self._fila) - 1
+        self._subir(len(self._fila) - 1)
+
+    def reinserir_varios(self, entradas: List[Tuple[tuple, Paciente]]) -> None:
+        """Versão em lote de reinserir(), com a mesma reorganização de adicionar_varios()"""
+        ids = set()
+        for _, paciente in entradas:
+            if paciente.id in self._posicoes or paciente.id in ids:
+                raise ValueError(f"Paciente {paciente.id} já está na fila")
+            ids.add(paciente.id)
+        self._inserir_varias(list(entradas))
+
+    def contem(self, paciente_id: int) -> bool:
+        """Retorna True se o paciente está aguardando nesta fila"""
+        return paciente_id in self._posicoes
+
+    def __contains__(self, paciente_id: int) -> bool:
+        return self.contem(paciente_id)
+
+    def estado(self) -> Tuple[List[Tuple[tuple, Paciente]], int]:
+        """Conteúdo da fila para snapshots
+        Returns:
+            Tuple: Entradas ((gravidade, hora_chegada, contador), paciente) na ordem
+                interna da heap e o próximo contador de desempate
+        """
+        return list(self._fila), self._contador
+
+    def restaurar_estado(self, entradas: List[Tuple[tuple, Paciente]], contador: int) -> None:
+        """Substitui o conteúdo pelo devolvido por estado(), sem reorganizar a heap
+        Args:
+            entradas: Entradas já em ordem de heap, como lidas de um snapshot
+            contador: Próximo contador de desempate
+        """
+        self._fila = entradas
+        self._posicoes = {paciente.id: i for i, (_, paciente) in enumerate(entradas)}
+        self._contador = contador
+
+    def _nova_entrada(self, paciente: Paciente) -> tuple:
+        if paciente.id in self._posicoes:
+            raise ValueError(f"Paciente {paciente.id} já está na fila")
+        if self._sequencia is not None:
+            prioridade = (paciente.gravidade, paciente.hora_chegada, next(self._sequencia))
+        else:
+            prioridade = (paciente.gravidade, paciente.hora_chegada, self._contador)
+            self._contador += 1
+        return prioridade, paciente
+
+    def _remover_em(self, posicao: int) -> Paciente:
+        """Remove a entrada na posição dada mantendo a propriedade de heap"""
+        ultima = self._fila.pop()
+        if posicao == len(self._fila):
+            removida = ultima
+        else:
+            removida = self._fila[posicao]
+            self._fila[posicao] = ultima
+            self._posicoes[ultima[1].id] = posicao
+            if ultima[0] < removida[0]:
+                self._subir(posicao)
+            else:
+                self._descer(posicao)
+        del self._posicoes[removida[1].id]
+        return removida[1]
+
+    def _subir(self, posicao: int) -> None:
+        fila = self._fila
+        entrada = fila[posicao]
+        while posicao > 0:
+            pai = (posicao - 1) >> 1
+            if entrada[0] < fila[pai][0]:
+                fila[posicao] = fila[pai]
+                self._posicoes[fila[posicao][1].id] = posicao
+                posicao = pai
+            else:
+                break
+        fila[posicao] = entrada
+        self._posicoes[entrada[1].id] = posicao
+
+    def _descer(self, posicao: int) -> None:
+        fila = self._fila
+        tamanho = len(fila)
+        entrada = fila[posicao]
+        while True:
+            filho = 2 * posicao + 1
+            if filho >= tamanho:
+                break
+            if filho + 1 < tamanho and fila[filho + 1][0] < fila[filho][0]:
+                filho += 1
+            if fila[filho][0] < entrada[0]:
+                fila[posicao] = fila[filho]
+                self._posicoes[fila[posicao][1].id] = posicao
+                posicao = filho
+            else:
+                break
+        fila[posicao] = entrada
+        self._posicoes[entrada[1].id] = posicao
+
+    def em_ordem(self) -> Iterator[Paciente]:
+        """Percorre a fila em ordem de prioridade sem removê-los nem ordenar a heap inteira
+        Cada paciente produzido custa O(log k), onde k é a quantidade já percorrida.
+        A fila não deve ser modificada durante a iteração.
+        Returns:
+            Iterator[Paciente]: Pacientes do mais ao menos prioritário
+        """
+        fila = self._fila
+        if not fila:
+            return
+        # Heap auxiliar com a fronteira de nós ainda não visitados da heap principal
+        fronteira = [(fila[0][0], 0)]
+        while fronteira:
+            _, posicao = heappop(fronteira)
+            yield fila[posicao][1]
+            for filho in (2 * posicao + 1, 2 * posicao + 2):
+                if filho < len(fila):
+                    heappush(fronteira, (fila[filho][0], filho))
+
+    def primeiros(self, k: int) -> List[Paciente]:
+        """Retorna os k próximos pacientes em ordem de prioridade, sem removê-los
+        Args:
+            k: Quantidade de pacientes desejada
+        Returns:
+            List[Paciente]: Até k pacientes, do mais ao menos prioritário
+        """
+        pacientes = []
+        if k <= 0:
+            return pacientes
+        for paciente in self.em_ordem():
+            pacientes.append(paciente)
+            if len(pacientes) == k:
+                break
+        return pacientes
+
+    def ultimos(self, k: int) -> List[Paciente]:
+        """Retorna os k pacientes menos prioritários, sem removê-los
+        Args:
+            k: Quantidade de pacientes desejada
+        Returns:
+            List[Paciente]: Até k pacientes, do menos ao mais prioritário
+        """
+        if k <= 0:
+            return []
+        return [paciente for _, paciente in nlargest(k, self._fila, key=itemgetter(0))]
+
+    def mostrar_fila(self, limite: Optional[int] = TAMANHO_PAGINA_FILA) -> None:
+        """Exibe a fila atual ordenada por prioridade
+        Args:
+            limite: Máximo de pacientes exibidos (None exibe todos)
+        """
+        if mostrar_ativo(_saida):
+            mostrar(_saida, '\n'.join(self.linhas_fila(limite)))
+
+    def linhas_fila(self, limite: Optional[int] = TAMANHO_PAGINA_FILA) -> List[str]:
+        """Monta as linhas da tabela exibida por mostrar_fila
+        Args:
+            limite: Máximo de pacientes listados (None lista todos)
+        Returns:
+            List[str]: Linhas da tabela, sem quebra de linha final
+        """
+        linhas = ['\n=== FILA DE ATENDIMENTO ===',
+                  f'{"ID":<5} | {"Nome":<20} | {"Gravidade":<10} | {"Especialidade":<15} | {"Tempo Espera (min)":<15}',
+                  '-' * 70]
+
+        # Percorre apenas os primeiros pacientes sem modificar a heap original
+        exibidos = self.primeiros(limite) if limite is not None else self.em_ordem()
+        agora = self.relogio.agora()
+        for paciente in exibidos:
+            tempo_espera = (agora - paciente.hora_chegada)/60 if paciente.hora_chegada else 0
+            linhas.append(f'{paciente.id:<5} | {paciente.nome:<20} | {paciente.gravidade:<10} | '
+                          f'{str(paciente.especialidade):<15} | {tempo_espera:.1f}')
+
+        if limite is not None and len(self._fila) > limite:
+            linhas.append(f'... e mais {len(self._fila) - limite} pacientes')
+        linhas.append(f'\nTotal na fila: {len(self._fila)} pacientes')
+        linhas.append('=' * 70)
+        return linhas
 
     def __len__(self) -> int:
         """Retorna o número de pacientes na fila"""
         return len(self._fila)
 
-    def pacientes_em_espera(self) -> List[Paciente]:
+    def pacientes_em_espera(self, limite: Optional[int] = None) -> List[Paciente]:
         """Retorna lista de pacientes em espera, ordenados por prioridade
+        Args:
+            limite: Máximo de pacientes retornados (None retorna todos)
         Returns:
             List[Paciente]: Lista ordenada de pacientes
         """
+        if limite is not None:
+            return self.primeiros(limite)
         return [paciente for _, paciente in sorted(self._fila, key=lambda x: x[0])]
\ No newline at end of file
@@ -0,0 +1,219 @@
+import threading
+from itertools import count
+from time import monotonic
+from typing import Iterable, List, Optional
+from models.fila import Fila
+from models.paciente import Paciente
+from utils.relogio import Relogio
+
+GRAVIDADES = (1, 2, 3, 4, 5)
+
+
+class FilaSincronizada:
+    """Fila protegida por um único lock, com espera bloqueante por pacientes
+
+    Serve de referência para comparar com a FilaFragmentada.
+    """
+
+    def __init__(self, relogio: Optional[Relogio] = None):
+        self._fila = Fila(relogio)
+        self._condicao = threading.Condition()
+
+    def adicionar_paciente(self, paciente: Paciente) -> None:
+        with self._condicao:
+            self._fila.adicionar_paciente(paciente)
+            self._condicao.notify()
+
+    def adicionar_varios(self, pacientes: Iterable[Paciente]) -> None:
+        pacientes = list(pacientes)
+        with self._condicao:
+            self._fila.adicionar_varios(pacientes)
+            self._condicao.notify(len(pacientes))
+
+    def atender_proximo(self, timeout: Optional[float] = 0) -> Optional[Paciente]:
+        """Remove e retorna o próximo paciente, esperando até `timeout` segundos
+        Args:
+            timeout: 0 não espera (como Fila); None espera indefinidamente
+        Returns:
+            Paciente: O próximo paciente ou None se o prazo acabar com a fila vazia
+        """
+        with self._condicao:
+            if timeout != 0 and not self._condicao.wait_for(lambda: len(self._fila) > 0, timeout):
+                return None
+            return self._fila.atender_proximo()
+
+    def remover(self, paciente_id: int) -> Optional[Paciente]:
+        with self._condicao:
+            return self._fila.remover(paciente_id)
+
+    def atualizar_gravidade(self, paciente_id: int, nova_gravidade: int) -> None:
+        with self._condicao:
+            self._fila.atualizar_gravidade(paciente_id, nova_gravidade)
+
+    def contem(self, paciente_id: int) -> bool:
+        with self._condicao:
+            return self._fila.contem(paciente_id)
+
+    def primeiros(self, k: int) -> List[Paciente]:
+        with self._condicao:
+            return self._fila.primeiros(k)
+
+    def __len__(self) -> int:
+        return len(self._fila)
+
+
+class FilaFragmentada:
+    """Fila segura para várias threads, fragmentada por gravidade
+
+    Cada gravidade tem sua própria Fila e seu próprio lock, de modo que
+    produtores de gravidades diferentes não disputam o mesmo lock. Como a
+    gravidade é o primeiro critério de prioridade, percorrer os fragmentos do
+    mais grave ao menos grave preserva exatamente a ordem de uma Fila única.
+
+    A disponibilidade é o tamanho de cada fragmento, consultado sem lock.
+    A condição global só é usada quando um consumidor precisa esperar: ele se
+    registra em `_esperando` e confere os fragmentos de novo antes de dormir;
+    produtores só tomam a condição para acordá-lo se houver alguém esperando.
+
+    Uma reclassificação move o paciente entre fragmentos com os dois locks
+    tomados em ordem de gravidade, mantendo seu contador de desempate, que é
+    compartilhado entre os fragmentos. As buscas por ID (contem, remover)
+    percorrem vários fragmentos e por isso são serializadas com as
+    reclassificações, para nunca verem um paciente em trânsito.
+    """
+
+    def __init__(self, relogio: Optional[Relogio] = None):
+        self._sequencia = count()  # contador de desempate de todos os fragmentos
+        self._fragmentos = {gravidade: Fila(relogio, sequencia=self._sequencia) for gravidade in GRAVIDADES}
+        self._locks = {gravidade: threading.Lock() for gravidade in GRAVIDADES}
+        self._reclassificacao = threading.Lock()  # serializa buscas por ID e mudanças de fragmento
+        self._condicao = threading.Condition(threading.Lock())
+        self._esperando = 0  # consumidores bloqueados em atender_proximo
+
+    def _fragmento(self, gravidade: int) -> int:
+        if gravidade not in self._fragmentos:
+            raise ValueError(f"Gravidade inválida: {gravidade}")
+        return gravidade
+
+    def _avisar(self, quantidade: int) -> None:
+        """Acorda consumidores bloqueados, se houver, após novas chegadas"""
+        # Lido sem lock: quem passa a esperar confere os fragmentos depois de
+        # se registrar, então não perde um paciente adicionado antes do aviso
+        if self._esperando:
+            with self._condicao:
+                self._condicao.notify(quantidade)
+
+    def _retirar(self) -> Optional[Paciente]:
+        """Remove o paciente mais prioritário sem esperar (None se vazia)"""
+        for gravidade in GRAVIDADES:
+            fila = self._fragmentos[gravidade]
+            if len(fila) == 0:
+                continue
+            with self._locks[gravidade]:
+                paciente = fila.atender_proximo()
+            if paciente is not None:
+                return paciente
+        return None
+
+    def adicionar_paciente(self, paciente: Paciente) -> None:
+        gravidade = self._fragmento(paciente.gravidade)
+        with self._locks[gravidade]:
+            self._fragmentos[gravidade].adicionar_paciente(paciente)
+        self._avisar(1)
+
+    def adicionar_varios(self, pacientes: Iterable[Paciente]) -> None:
+        """Adiciona um lote, com uma única operação de heap por fragmento"""
+        # Contadores sorteados na ordem do lote, como numa Fila única
+        por_gravidade = {gravidade: [] for gravidade in GRAVIDADES}
+        for paciente in pacientes:
+            gravidade = self._fragmento(paciente.gravidade)
+            prioridade = (gravidade, paciente.hora_chegada, next(self._sequencia))
+            por_gravidade[gravidade].append((prioridade, paciente))
+        total = 0
+        for gravidade, grupo in por_gravidade.items():
+            if grupo:
+                with self._locks[gravidade]:
+                    self._fragmentos[gravidade].reinserir_varios(grupo)
+                total += len(grupo)
+        if total:
+            self._avisar(total)
+
+    def atender_proximo(self, timeout: Optional[float] = 0) -> Optional[Paciente]:
+        """Remove e retorna o próximo paciente, esperando até `timeout` segundos
+        Args:
+            timeout: 0 não espera (como Fila); None espera indefinidamente
+        Returns:
+            Paciente: O próximo paciente ou None se o prazo acabar com a fila vazia
+        """
+        paciente = self._retirar()
+        if paciente is not None or timeout == 0:
+            return paciente
+
+        prazo = None if timeout is None else monotonic() + timeout
+        with self._condicao:
+            self._esperando += 1
+            try:
+                while True:
+                    paciente = self._retirar()
+                    if paciente is not None:
+                        return paciente
+                    restante = None if prazo is None else prazo - monotonic()
+                    if restante is not None and restante <= 0:
+                        return None
+                    self._condicao.wait(restante)
+            finally:
+                self._esperando -= 1
+
+    def remover(self, paciente_id: int) -> Optional[Paciente]:
+        with self._reclassificacao:
+            for gravidade in GRAVIDADES:
+                with self._locks[gravidade]:
+                    paciente = self._fragmentos[gravidade].remover(paciente_id)
+                if paciente is not None:
+                    return paciente
+        return None
+
+    def atualizar_gravidade(self, paciente_id: int, nova_gravidade: int) -> None:
+        """Reclassifica um paciente, movendo-o de fragmento se a gravidade mudar"""
+        destino = self._fragmento(nova_gravidade)
+        with self._reclassificacao:
+            origem = self._localizar(paciente_id)
+            if origem is None:
+                raise KeyError(f"Paciente {paciente_id} não está na fila")
+            if origem == destino:
+                return
+            # Ordem fixa de aquisição entre fragmentos evita impasse
+            primeiro, segundo = sorted((origem, destino))
+            with self._locks[primeiro], self._locks[segundo]:
+                entrada = self._fragmentos[origem].extrair(paciente_id)
+                if entrada is None:  # atendido enquanto era localizado
+                    raise KeyError(f"Paciente {paciente_id} não está na fila")
+                (_, hora_chegada, contador), paciente = entrada
+                paciente.gravidade = nova_gravidade
+                self._fragmentos[destino].reinserir((nova_gravidade, hora_chegada, contador), paciente)
+        self._avisar(1)
+
+    def contem(self, paciente_id: int) -> bool:
+        with self._reclassificacao:
+            return self._localizar(paciente_id) is not None
+
+    def _localizar(self, paciente_id: int) -> Optional[int]:
+        """Gravidade do fragmento que contém o paciente (None se ausente)"""
+        for gravidade in GRAVIDADES:
+            with self._locks[gravidade]:
+                if self._fragmentos[gravidade].contem(paciente_id):
+                    return gravidade
+        return None
+
+    def primeiros(self, k: int) -> List[Paciente]:
+        """Retorna os k próximos pacientes em ordem de prioridade, sem removê-los"""
+        pacientes = []
+        for gravidade in GRAVIDADES:
+            if len(pacientes) >= k:
+                break
+            with self._locks[gravidade]:
+                pacientes.extend(self._fragmentos[gravidade].primeiros(k - len(pacientes)))
+        return pacientes
+
+    def __len__(self) -> int:
+        return sum(len(fila) for fila in self._fragmentos.values())
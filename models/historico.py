@@ -0,0 +1,174 @@
+from array import array
+from collections.abc import Mapping, Sequence
+from math import isnan, nan
+from typing import Dict, Iterator, List, Optional, Tuple
+from models.especialidade import Especialidade
+from models.paciente import Paciente
+
+
+def _opcional(valor: float) -> Optional[float]:
+    return None if isnan(valor) else valor
+
+
+class HistoricoAtendimentos:
+    """Registro colunar de atendimentos finalizados
+
+    Cada atendimento ocupa uma linha em arrays de tipos primitivos (cerca de
+    60 bytes por atendimento, contra centenas num dicionário). Nomes de
+    pacientes são internados numa tabela; instantes ausentes viram NaN e a
+    especialidade é guardada pelo valor do enum (0 = não definida).
+    Registros e pacientes são remontados apenas quando lidos.
+    """
+
+    COLUNAS = ('medico_id', 'paciente_id', 'paciente_nome', 'hora_chegada', 'hora_inicio',
+               'hora_fim', 'tempo_espera', 'gravidade', 'especialidade')
+
+    def __init__(self):
+        self.medico_id = array('q')
+        self.paciente_id = array('q')
+        self.paciente_nome = array('l')  # índice em self.nomes
+        self.hora_chegada = array('d')
+        self.hora_inicio = array('d')
+        self.hora_fim = array('d')
+        self.tempo_espera = array('d')
+        self.gravidade = array('b')
+        self.especialidade = array('b')
+        self.nomes: List[str] = []
+        self._indice_nomes: Dict[str, int] = {}
+        self._linhas_por_medico: Dict[int, array] = {}  # ID médico: linhas do médico
+
+    def adicionar_medico(self, medico_id: int) -> None:
+        """Garante que o médico apareça no histórico, mesmo sem atendimentos"""
+        self._linhas_por_medico.setdefault(medico_id, array('q'))
+
+    def registrar(self, medico_id: int, paciente: Paciente) -> None:
+        """Acrescenta o atendimento finalizado de um paciente"""
+        nome = self._indice_nomes.get(paciente.nome)
+        if nome is None:
+            nome = self._indice_nomes[paciente.nome] = len(self.nomes)
+            self.nomes.append(paciente.nome)
+
+        tempo_espera = paciente.tempo_espera()
+        self._linhas_por_medico.setdefault(medico_id, array('q')).append(len(self.medico_id))
+        self.medico_id.append(medico_id)
+        self.paciente_id.append(paciente.id)
+        self.paciente_nome.append(nome)
+        self.hora_chegada.append(paciente.hora_chegada)
+        self.hora_inicio.append(nan if paciente.hora_atendimento is None else paciente.hora_atendimento)
+        self.hora_fim.append(nan if paciente.hora_saida is None else paciente.hora_saida)
+        self.tempo_espera.append(nan if tempo_espera is None else tempo_espera)
+        self.gravidade.append(paciente.gravidade)
+        self.especialidade.append(paciente.especialidade.value if paciente.especialidade else 0)
+
+    def __len__(self) -> int:
+        return len(self.medico_id)
+
+    def registro(self, linha: int) -> Dict:
+        """Remonta o atendimento de uma linha no formato de dicionário"""
+        return {
+            'paciente_id': self.paciente_id[linha],
+            'paciente_nome': self.nomes[self.paciente_nome[linha]],
+            'hora_inicio': _opcional(self.hora_inicio[linha]),
+            'hora_fim': _opcional(self.hora_fim[linha]),
+            'tempo_espera': _opcional(self.tempo_espera[linha]),
+            'gravidade': self.gravidade[linha]
+        }
+
+    def paciente(self, linha: int) -> Paciente:
+        """Remonta o paciente atendido numa linha"""
+        codigo = self.especialidade[linha]
+        paciente = Paciente(self.paciente_id[linha], self.nomes[self.paciente_nome[linha]],
+                            self.gravidade[linha], self.hora_chegada[linha],
+                            Especialidade(codigo) if codigo else None)
+        paciente.hora_atendimento = _opcional(self.hora_inicio[linha])
+        paciente.hora_saida = _opcional(self.hora_fim[linha])
+        return paciente
+
+    def pacientes(self) -> 'PacientesAtendidos':
+        """Visão somente leitura dos pacientes atendidos, em ordem de finalização"""
+        return PacientesAtendidos(self)
+
+    def por_medico(self) -> 'HistoricoPorMedico':
+        """Visão somente leitura {ID médico: lista de atendimentos}"""
+        return HistoricoPorMedico(self)
+
+    def estado(self) -> Tuple[Dict[str, array], List[str], Dict[int, array]]:
+        """Conteúdo do histórico para snapshots, sem cópia (não deve ser modificado)
+        Returns:
+            Tuple: Colunas por nome (COLUNAS), tabela de nomes e linhas de cada médico
+        """
+        colunas = {coluna: getattr(self, coluna) for coluna in self.COLUNAS}
+        return colunas, self.nomes, self._linhas_por_medico
+
+    def restaurar_estado(self, colunas: Dict[str, array], nomes: List[str],
+                         linhas_por_medico: Dict[int, array]) -> None:
+        """Substitui o conteúdo pelo devolvido por estado()"""
+        for coluna in self.COLUNAS:
+            setattr(self, coluna, colunas[coluna])
+        self.nomes = nomes
+        self._indice_nomes = {nome: i for i, nome in enumerate(nomes)}
+        self._linhas_por_medico = dict(linhas_por_medico)
+
+    def tamanho_em_bytes(self) -> int:
+        """Memória aproximada ocupada pelas colunas e índices"""
+        colunas = [getattr(self, coluna) for coluna in self.COLUNAS]
+        total = sum(coluna.itemsize * len(coluna) for coluna in colunas)
+        total += sum(linhas.itemsize * len(linhas) for linhas in self._linhas_por_medico.values())
+        return total
+
+
+class AtendimentosMedico(Sequence):
+    """Sequência dos atendimentos de um médico, remontados sob demanda"""
+
+    def __init__(self, historico: HistoricoAtendimentos, linhas: array):
+        self._historico = historico
+        self._linhas = linhas
+
+    def __len__(self) -> int:
+        return len(self._linhas)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._historico.registro(linha) for linha in self._linhas[indice]]
+        return self._historico.registro(self._linhas[indice])
+
+    def __eq__(self, outro) -> bool:
+        return list(self) == list(outro)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class PacientesAtendidos(Sequence):
+    """Sequência dos pacientes atendidos, remontados sob demanda a partir do histórico"""
+
+    def __init__(self, historico: HistoricoAtendimentos):
+        self._historico = historico
+
+    def __len__(self) -> int:
+        return len(self._historico)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._historico.paciente(linha) for linha in range(len(self))[indice]]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("Índice fora do histórico")
+        return self._historico.paciente(indice)
+
+
+class HistoricoPorMedico(Mapping):
+    """Mapeamento {ID médico: atendimentos} sobre o histórico colunar"""
+
+    def __init__(self, historico: HistoricoAtendimentos):
+        self._historico = historico
+
+    def __getitem__(self, medico_id: int) -> AtendimentosMedico:
+        return AtendimentosMedico(self._historico, self._historico._linhas_por_medico[medico_id])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._historico._linhas_por_medico)
+
+    def __len__(self) -> int:
+        return len(self._historico._linhas_por_medico)
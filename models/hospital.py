@@ -1,30 +1,71 @@
-from typing import Dict, List, Optional
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+from config import TAMANHO_PAGINA_FILA
 from models.medico import Medico
+from models.disponibilidade import IndiceDisponibilidade
+from models.escalonador import Escalonador, EscalonadorPorEspecialidade
+from models.historico import HistoricoAtendimentos, HistoricoPorMedico, PacientesAtendidos
 from models.paciente import Paciente
 from models.especialidade import Especialidade
 from models.fila import Fila
-import time
-import random
+from services.chegadas import FluxoChegadas, registro_de_paciente
+from services.estatisticas import AcumuladorAtendimentos
+from utils.diario import DiarioEventos
+from utils.metricas import Metricas, METRICAS_DESATIVADAS
+from utils.relogio import Relogio, RelogioSimulado, RELOGIO_REAL
+from utils.saida import mostrar, mostrar_ativo, obter_logger, registrar_evento
+
+_saida = obter_logger(__name__)
 
 
 class Hospital:
-    def __init__(self, nome: str):
+    def __init__(self, nome: str, relogio: Optional[Relogio] = None,
+                 escalonador: Optional[Escalonador] = None, metricas: Optional[Metricas] = None,
+                 diario: Optional[DiarioEventos] = None):
+        """
+        Args:
+            nome: Nome do hospital
+            relogio: Fonte de tempo (padrão: relógio do sistema)
+            escalonador: Política de escolha da fila atendida por cada médico livre
+                (padrão: cada médico atende só a fila da sua especialidade)
+            metricas: Coletor de latências e séries de filas e ocupação (padrão: desativado)
+            diario: Diário onde são registrados cadastros, admissões, inícios e fins
+                de atendimento, para auditoria e reprodução (padrão: nenhum)
+        """
         self.nome = nome
+        self.relogio = relogio or RELOGIO_REAL
+        self.metricas = metricas or METRICAS_DESATIVADAS
+        self.diario = diario
+        self.escalonador = escalonador or EscalonadorPorEspecialidade()
         self.medicos: List[Medico] = []
         self.filas_espera: Dict[Especialidade, Fila] = {}
-        self.pacientes_atendidos: List[Paciente] = []
-        self.historico_medicos: Dict[int, List[Dict]] = {}  # ID médico: lista de atendimentos
+        self.historico = HistoricoAtendimentos()  # registro colunar dos atendimentos
+        self.pacientes_atendidos: PacientesAtendidos = self.historico.pacientes()  # remontados sob demanda
+        self.estatisticas = AcumuladorAtendimentos()  # atualizado a cada atendimento finalizado
+        self.versao = 0  # incrementada a cada mudança de estado refletida no relatório
+        self._relatorio: Optional[Tuple[int, Dict]] = None  # (versão, último relatório gerado)
+        self.historico_medicos: HistoricoPorMedico = self.historico.por_medico()  # ID médico: lista de atendimentos
+        self._disponibilidade = IndiceDisponibilidade()  # livres por especialidade e términos
         self._inicializar_filas()
+        if self.diario is not None:
+            self.diario.registrar('hospital', self.relogio.agora(), nome=nome)
 
     def _inicializar_filas(self) -> None:
         """Inicializa filas de espera para todas as especialidades"""
         for especialidade in Especialidade:
-            self.filas_espera[especialidade] = Fila()
+            self.filas_espera[especialidade] = Fila(self.relogio, self.metricas)
+        self.escalonador.configurar(self.filas_espera)
 
     def adicionar_medico(self, medico: Medico) -> None:
         """Cadastra um novo médico no hospital"""
         self.medicos.append(medico)
-        self.historico_medicos[medico.id] = []
+        self.versao += 1
+        self.historico.adicionar_medico(medico.id)
+        self._disponibilidade.adicionar(medico)
+        if self.diario is not None:
+            self.diario.registrar('medico', self.relogio.agora(), id=medico.id, nome=medico.nome,
+                                  especialidade=medico.especialidade.name,
+                                  tempo_medio_atendimento=medico.tempo_medio_atendimento)
 
     def admitir_paciente(self, paciente: Paciente) -> None:
         """Adiciona paciente na fila de espera apropriada"""
@@ -33,65 +74,244 @@ class Hospital:
 
         fila = self.filas_espera[paciente.especialidade]
         fila.adicionar_paciente(paciente)
+        self.versao += 1
+        self.escalonador.notificar(paciente.especialidade)
+        if self.diario is not None:
+            self.diario.registrar('admissao', self.relogio.agora(), **registro_de_paciente(paciente))
+
+    def admitir_chegadas(self, chegadas: FluxoChegadas, agora: Optional[float] = None) -> int:
+        """Admite os pacientes do fluxo que já chegaram, deixando os demais na fonte
+        Returns:
+            int: Quantidade de pacientes admitidos
+        """
+        if agora is None:
+            agora = self.relogio.agora()
+        admitidos = 0
+        for paciente in chegadas.ate(agora):
+            self.admitir_paciente(paciente)
+            admitidos += 1
+        return admitidos
+
+    def avancar_ate(self, instante: float, chegadas: Optional[FluxoChegadas] = None) -> None:
+        """Processa em ordem cronológica chegadas e fins de atendimento até `instante`
+
+        Salta de evento em evento sem esperar o relógio; se o relógio do hospital
+        for um RelogioSimulado, ele é posicionado em cada evento e, ao final, em `instante`.
+        """
+        simulado = self.relogio if isinstance(self.relogio, RelogioSimulado) else None
+        self.atender_pacientes(min(self.relogio.agora(), instante))
+
+        while True:
+            proximo_fim = self.proximo_termino()
+            proxima_chegada = chegadas.proxima_hora() if chegadas else None
+            proximos = [hora for hora in (proximo_fim, proxima_chegada)
+                        if hora is not None and hora <= instante]
+            if not proximos:
+                break
+
+            agora = min(proximos)
+            if simulado and agora > simulado.agora():
+                simulado.definir(agora)
+            self.finalizar_atendimentos(agora)
+            if chegadas:
+                self.admitir_chegadas(chegadas, agora)
+            self.atender_pacientes(agora)
+
+        if simulado and instante > simulado.agora():
+            simulado.definir(instante)
+
+    def remover_paciente(self, paciente_id: int) -> Optional[Paciente]:
+        """Retira um paciente de qualquer fila de espera (desistência, transferência)"""
+        for especialidade, fila in self.filas_espera.items():
+            if fila.contem(paciente_id):
+                paciente = fila.remover(paciente_id)
+                self.versao += 1
+                self.escalonador.notificar(especialidade)
+                if self.diario is not None:
+                    self.diario.registrar('remocao', self.relogio.agora(), paciente_id=paciente_id)
+                return paciente
+        return None
+
+    def atualizar_gravidade(self, paciente_id: int, nova_gravidade: int) -> None:
+        """Reclassifica a gravidade de um paciente que aguarda atendimento"""
+        for especialidade, fila in self.filas_espera.items():
+            if fila.contem(paciente_id):
+                fila.atualizar_gravidade(paciente_id, nova_gravidade)
+                self.versao += 1
+                self.escalonador.notificar(especialidade)
+                if self.diario is not None:
+                    self.diario.registrar('gravidade', self.relogio.agora(), paciente_id=paciente_id,
+                                          gravidade=nova_gravidade)
+                return
+        raise KeyError(f"Paciente {paciente_id} não está em nenhuma fila")
 
     def _determinar_especialidade(self, gravidade: int) -> Especialidade:
         """Determina a especialidade adequada baseada na gravidade"""
         if gravidade == 1:  # Casos mais graves
             return Especialidade.URGENCIA
         elif gravidade == 2:
-            return random.choice([Especialidade.CARDIOLOGIA, Especialidade.NEUROLOGIA])
+            # Encaminha para a fila menos carregada entre as opções
+            return min((Especialidade.CARDIOLOGIA, Especialidade.NEUROLOGIA),
+                       key=lambda especialidade: len(self.filas_espera[especialidade]))
         else:
             return Especialidade.CLINICO_GERAL
 
-    def atender_pacientes(self) -> None:
-        """Processa o atendimento de pacientes por todos os médicos disponíveis"""
-        for medico in self.medicos:
-            if not medico.ocupado:
-                fila = self.filas_espera[medico.especialidade]
+    def atender_pacientes(self, agora: Optional[float] = None) -> List[Medico]:
+        """Processa o atendimento de pacientes por todos os médicos disponíveis
+
+        Consulta apenas as especialidades com médicos livres, sem varrer a lista de médicos;
+        o escalonador decide de qual fila compatível cada médico chama o paciente.
+        Returns:
+            List[Medico]: Médicos que iniciaram atendimento nesta chamada
+        """
+        if agora is None:
+            agora = self.relogio.agora()
+        inicio = perf_counter() if self.metricas.ativo else None
+        iniciados = []
+        for especialidade in self._disponibilidade.grupos_com_livres():
+            while self._disponibilidade.tem_livre(especialidade):
+                origem = self.escalonador.escolher(especialidade, agora)
+                if origem is None:
+                    break
+
+                medico = self._disponibilidade.retirar_livre(especialidade)
+                paciente = self.filas_espera[origem].atender_proximo()
+                self._iniciar(medico, origem, paciente, agora)
+                iniciados.append(medico)
+                registrar_evento(_saida, "%s iniciou atendimento de %s", medico.nome, paciente.nome)
+        if inicio is not None:
+            self.metricas.observar('hospital.atender_pacientes', perf_counter() - inicio)
+            self._amostrar(agora)
+        return iniciados
+
+    def finalizar_atendimentos(self, agora: Optional[float] = None) -> None:
+        """Finaliza atendimentos que já completaram o tempo médio
 
-                if len(fila) > 0:
-                    paciente = fila.atender_proximo()
-                    medico.iniciar_atendimento(paciente)
-                    print(f"{medico.nome} iniciou atendimento de {paciente.nome}")
+        Consulta apenas os médicos cujo término previsto já passou.
+        """
+        if agora is None:
+            agora = self.relogio.agora()
+        for medico in self._disponibilidade.concluidos(agora):
+            paciente = self._finalizar(medico, agora)
+            registrar_evento(_saida, "%s finalizou atendimento de %s", medico.nome, paciente.nome)
+        if self.metricas.ativo:
+            self._amostrar(agora)
 
-    def finalizar_atendimentos(self) -> None:
-        """Finaliza atendimentos que já completaram o tempo médio"""
+    def encerrar_atendimentos(self, agora: Optional[float] = None) -> None:
+        """Finaliza todos os atendimentos em curso, concluídos ou não (ex.: fim do turno)"""
+        if agora is None:
+            agora = self.relogio.agora()
         for medico in self.medicos:
-            if medico.ocupado and medico.tempo_restante_atendimento() <= 0:
-                paciente = medico.finalizar_atendimento()
-                self.pacientes_atendidos.append(paciente)
-                self._registrar_atendimento(medico, paciente)
-                print(f"{medico.nome} finalizou atendimento de {paciente.nome}")
+            if medico.ocupado:
+                paciente = self._finalizar(medico, agora)
+                registrar_evento(_saida, "%s finalizou atendimento de %s", medico.nome, paciente.nome)
+
+    def iniciar_atendimento(self, medico: Medico, paciente_id: int, origem: Especialidade,
+                            agora: Optional[float] = None) -> Paciente:
+        """Inicia um atendimento escolhido por fora do escalonador (ex.: ao reproduzir um diário)
+
+        Args:
+            medico: Médico livre do hospital
+            paciente_id: ID do paciente a ser chamado
+            origem: Fila de onde o paciente é chamado
+            agora: Instante de início (padrão: relógio do hospital)
+        Returns:
+            Paciente: O paciente chamado
+        """
+        if medico.ocupado:
+            raise ValueError(f"Médico {medico.id} já está atendendo outro paciente")
+        paciente = self.filas_espera[origem].remover(paciente_id)
+        if paciente is None:
+            raise ValueError(f"Paciente {paciente_id} não está na fila {origem.name}")
+        self._disponibilidade.retirar(medico)
+        self._iniciar(medico, origem, paciente, self.relogio.agora() if agora is None else agora)
+        return paciente
+
+    def finalizar_atendimento(self, medico: Medico, agora: Optional[float] = None) -> Paciente:
+        """Finaliza o atendimento em curso de um médico, concluído ou não
+
+        Args:
+            medico: Médico ocupado do hospital
+            agora: Instante de término (padrão: relógio do hospital)
+        Returns:
+            Paciente: O paciente atendido
+        """
+        if not medico.ocupado:
+            raise ValueError(f"Médico {medico.id} não está atendendo nenhum paciente")
+        return self._finalizar(medico, self.relogio.agora() if agora is None else agora)
+
+    def _iniciar(self, medico: Medico, origem: Especialidade, paciente: Paciente, agora: float) -> None:
+        """Inicia o atendimento de um paciente já retirado da fila `origem` por um médico livre já retirado do índice"""
+        self.versao += 1
+        self.escalonador.notificar(origem)
+        medico.iniciar_atendimento(paciente, agora)
+        self._disponibilidade.ocupar(medico)
+        if self.diario is not None:
+            self.diario.registrar('inicio', agora, medico_id=medico.id, paciente_id=paciente.id,
+                                  fila=origem.name)
+
+    def _finalizar(self, medico: Medico, agora: float) -> Paciente:
+        """Finaliza o atendimento do médico, devolvendo-o aos livres"""
+        paciente = medico.finalizar_atendimento(agora)
+        self.versao += 1
+        self._disponibilidade.liberar(medico)
+        self._registrar_atendimento(medico, paciente)
+        if self.diario is not None:
+            self.diario.registrar('fim', agora, medico_id=medico.id, paciente_id=paciente.id)
+        return paciente
+
+    def proximo_termino(self) -> Optional[float]:
+        """Retorna o instante previsto do próximo fim de atendimento (ou None)"""
+        return self._disponibilidade.proximo_termino()
+
+    def _amostrar(self, agora: float) -> None:
+        """Registra nas métricas o tamanho das filas e a ocupação dos médicos"""
+        for especialidade, fila in self.filas_espera.items():
+            self.metricas.amostrar('tamanho_fila', agora, len(fila), especialidade.name)
+        if self.medicos:
+            ocupados = len(self.medicos) - self._disponibilidade.total_livres()
+            self.metricas.amostrar('utilizacao_medicos', agora, ocupados / len(self.medicos))
 
     def _registrar_atendimento(self, medico: Medico, paciente: Paciente) -> None:
         """Registra estatísticas do atendimento"""
-        registro = {
-            'paciente_id': paciente.id,
-            'paciente_nome': paciente.nome,
-            'hora_inicio': paciente.hora_atendimento,
-            'hora_fim': paciente.hora_saida,
-            'tempo_espera': paciente.tempo_espera(),
-            'gravidade': paciente.gravidade
-        }
-        self.historico_medicos[medico.id].append(registro)
-
-    def mostrar_estado(self) -> None:
-        """Exibe o estado atual do hospital"""
-        print(f"\n=== {self.nome.upper()} ===")
-        print("\nMédicos:")
-        for medico in self.medicos:
-            print(f"  - {medico}")
+        self.historico.registrar(medico.id, paciente)
+        self.estatisticas.registrar(paciente)
 
-        print("\nFilas de espera:")
+    def mostrar_estado(self, tamanho_pagina: Optional[int] = TAMANHO_PAGINA_FILA) -> None:
+        """Exibe o estado atual do hospital
+        Args:
+            tamanho_pagina: Máximo de pacientes exibidos por fila (None exibe todos)
+        """
+        if not mostrar_ativo(_saida):
+            return
+        linhas = [f"\n=== {self.nome.upper()} ===", "\nMédicos:"]
+        linhas += [f"  - {medico}" for medico in self.medicos]
+        linhas.append("\nFilas de espera:")
         for especialidade, fila in self.filas_espera.items():
-            print(f"\nEspecialidade: {especialidade.name}")
-            fila.mostrar_fila()
+            linhas.append(f"\nEspecialidade: {especialidade.name}")
+            linhas += fila.linhas_fila(tamanho_pagina)
+        linhas.append(f"\nTotal pacientes atendidos: {len(self.pacientes_atendidos)}")
+        linhas.append("=" * 50)
+        mostrar(_saida, "\n".join(linhas))
 
-        print(f"\nTotal pacientes atendidos: {len(self.pacientes_atendidos)}")
-        print("=" * 50)
+    def invalidar_relatorio(self) -> None:
+        """Descarta o relatório guardado, forçando gerar_relatorio() a recalculá-lo
+
+        As operações do hospital já fazem isso; só é preciso ao alterar por fora
+        o estado refletido no relatório (ex.: médicos ou filas modificados diretamente).
+        """
+        self.versao += 1
 
     def gerar_relatorio(self) -> Dict:
-        """Gera um relatório com estatísticas do hospital"""
+        """Gera um relatório com estatísticas do hospital
+
+        Usa contadores mantidos a cada atendimento finalizado, em O(especialidades + médicos).
+        Enquanto o estado não muda, chamadas seguintes devolvem o mesmo relatório
+        (que não deve ser modificado pelo chamador).
+        """
+        if self._relatorio is not None and self._relatorio[0] == self.versao:
+            return self._relatorio[1]
+
         relatorio = {
             'nome_hospital': self.nome,
             'total_medicos': len(self.medicos),
@@ -102,20 +322,18 @@ class Hospital:
         }
 
         # Calcula estatísticas por especialidade
-        tempo_total_espera = 0
+        por_especialidade = self.estatisticas.por_especialidade
         for especialidade, fila in self.filas_espera.items():
+            atendidos = por_especialidade.get(especialidade)
             relatorio['especialidades'][especialidade.name] = {
                 'em_espera': len(fila),
-                'atendidos': sum(1 for p in self.pacientes_atendidos
-                                 if p.especialidade == especialidade)
+                'atendidos': atendidos.quantidade if atendidos else 0
             }
 
-        # Calcula tempo médio de espera
-        if self.pacientes_atendidos:
-            tempo_total_espera = sum(p.tempo_espera() or 0
-                                     for p in self.pacientes_atendidos)
-            relatorio['tempo_medio_espera'] = (
-                    tempo_total_espera / len(self.pacientes_atendidos))
+        # Calcula tempo médio de espera (esperas desconhecidas contam como zero)
+        geral = self.estatisticas.geral
+        if geral.quantidade:
+            relatorio['tempo_medio_espera'] = geral.soma / geral.quantidade
 
         # Estatísticas por médico
         for medico in self.medicos:
@@ -129,4 +347,5 @@ class Hospital:
                     if medico.total_pacientes_atendidos > 0 else 0)
             })
 
+        self._relatorio = (self.versao, relatorio)
         return relatorio
\ No newline at end of file
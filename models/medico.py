@@ -1,11 +1,16 @@
 from typing import Optional
 from models.especialidade import Especialidade
 from models.paciente import Paciente
-import time
+from utils.relogio import Relogio, RELOGIO_REAL
 
 
 class Medico:
-    def __init__(self, id: int, nome: str, especialidade: Especialidade, tempo_medio_atendimento: int):
+    __slots__ = ('id', 'nome', 'especialidade', 'tempo_medio_atendimento', 'paciente_atual',
+                 'hora_inicio_atendimento', 'total_pacientes_atendidos', 'tempo_total_atendimento',
+                 'relogio')
+
+    def __init__(self, id: int, nome: str, especialidade: Especialidade, tempo_medio_atendimento: int,
+                 relogio: Optional[Relogio] = None):
         """
         Inicializa um médico com seus atributos básicos
 
@@ -14,6 +19,7 @@ class Medico:
             nome: Nome completo do médico
             especialidade: Especialidade médica (enum Especialidade)
             tempo_medio_atendimento: Tempo médio de atendimento em minutos
+            relogio: Fonte de tempo (padrão: relógio do sistema)
         """
         self.id = id
         self.nome = nome
@@ -23,27 +29,35 @@ class Medico:
         self.hora_inicio_atendimento: Optional[float] = None
         self.total_pacientes_atendidos = 0
         self.tempo_total_atendimento = 0
+        self.relogio = relogio or RELOGIO_REAL
 
-    def iniciar_atendimento(self, paciente: Paciente) -> None:
+    def iniciar_atendimento(self, paciente: Paciente, agora: Optional[float] = None) -> None:
         """
         Inicia o atendimento de um paciente
+
+        Args:
+            paciente: Paciente a ser atendido
+            agora: Instante de início (timestamp); usa o relógio do médico se omitido
         """
         if self.ocupado:
             raise ValueError("Médico já está atendendo outro paciente")
 
         self.paciente_atual = paciente
-        self.hora_inicio_atendimento = time.time()
+        self.hora_inicio_atendimento = agora if agora is not None else self.relogio.agora()
         paciente.hora_atendimento = self.hora_inicio_atendimento
 
-    def finalizar_atendimento(self) -> Paciente:
+    def finalizar_atendimento(self, agora: Optional[float] = None) -> Paciente:
         """
         Finaliza o atendimento e retorna o paciente atendido
+
+        Args:
+            agora: Instante de término (timestamp); usa o relógio do médico se omitido
         """
         if not self.ocupado:
             raise ValueError("Médico não está atendendo nenhum paciente")
 
         paciente = self.paciente_atual
-        hora_fim = time.time()
+        hora_fim = agora if agora is not None else self.relogio.agora()
 
         # Registra os tempos
         paciente.hora_saida = hora_fim
@@ -64,16 +78,28 @@ class Medico:
         """Retorna True se o médico está atendendo um paciente"""
         return self.paciente_atual is not None
 
-    def tempo_restante_atendimento(self) -> float:
+    def tempo_restante_atendimento(self, agora: Optional[float] = None) -> float:
         """
         Estima o tempo restante para o atendimento atual em minutos
+
+        Args:
+            agora: Instante de referência (timestamp); usa o relógio do médico se omitido
         """
         if not self.ocupado:
             return 0
 
-        tempo_decorrido = (time.time() - self.hora_inicio_atendimento) / 60
+        if agora is None:
+            agora = self.relogio.agora()
+        tempo_decorrido = (agora - self.hora_inicio_atendimento) / 60
         return max(0, self.tempo_medio_atendimento - tempo_decorrido)
 
+    @property
+    def hora_fim_prevista(self) -> Optional[float]:
+        """Instante previsto para o fim do atendimento atual (timestamp)"""
+        if not self.ocupado:
+            return None
+        return self.hora_inicio_atendimento + self.tempo_medio_atendimento * 60
+
     def __str__(self) -> str:
         status = "Ocupado" if self.ocupado else "Disponível"
         if self.ocupado and self.paciente_atual:
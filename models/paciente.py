@@ -1,20 +1,24 @@
-import time
 from enum import nonmember
+from utils.relogio import RELOGIO_REAL
 
 
 class Paciente:
-    def __init__(self, id, nome, gravidade, hora_chegada, especialidade=None):
+    __slots__ = ('id', 'nome', 'gravidade', 'hora_chegada', 'especialidade',
+                 'hora_atendimento', 'hora_saida')
+
+    def __init__(self, id, nome, gravidade, hora_chegada, especialidade=None, relogio=None):
         self.id = id
         self.nome = nome
         self.gravidade = gravidade # 1 a 5 (1 = mais grave)
-        self.hora_chegada = hora_chegada if hora_chegada else time.time()
+        self.hora_chegada = hora_chegada if hora_chegada is not None else (relogio or RELOGIO_REAL).agora()
         self.especialidade = especialidade
+        self.hora_atendimento = None
         self.hora_saida = None
 
     ##def __str__(self):
     ##   return f'Paciente {self.id}: {self.nome} (Gravidade: {self.gravidade}'
 
     def tempo_espera(self):
-        if self.hora.atendimento:
-            return self.hora.atendimento - self.hora_chegada
+        if self.hora_atendimento is not None:
+            return self.hora_atendimento - self.hora_chegada
         return None
\ No newline at end of file
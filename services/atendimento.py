@@ -1,25 +1,121 @@
-import time
-from typing import List
+from heapq import heappush, heappop
+from itertools import count
+from math import ceil
+from time import perf_counter
+from typing import Iterable, List, Optional
 from models.medico import Medico
+from models.disponibilidade import IndiceDisponibilidade
+from models.paciente import Paciente
 from models.fila import Fila
+from services.chegadas import FluxoChegadas
+from services.estatisticas import AcumuladorAtendimentos
+from utils.metricas import Metricas, METRICAS_DESATIVADAS
+from utils.relogio import Relogio, RelogioSimulado, RELOGIO_REAL
+from utils.saida import mostrar, mostrar_ativo, obter_logger
+
+_saida = obter_logger(__name__)
+
+# Tipos de evento do modo por eventos. Eventos no mesmo instante são
+# processados nesta ordem: primeiro liberam-se médicos e admitem-se
+# chegadas, depois os atendimentos são iniciados. Os fins de atendimento
+# vêm do índice de disponibilidade e precedem os demais no mesmo instante.
+EVENTO_FIM = 0
+EVENTO_CHEGADA = 1
+EVENTO_INICIO = 2
+EVENTO_STATUS = 3
+# Com intervalo > 0, cada passo segue a ordem do modo tempo real: chegadas,
+# inícios e só então fins; o médico liberado volta a atender no passo seguinte.
+EVENTO_FIM_NO_PASSO = 2.5
+
+MODO_TEMPO_REAL = 'tempo_real'
+MODO_EVENTOS = 'eventos'
+
+INTERVALO_STATUS = 30  # minutos entre exibições de status
 
 
 class SimuladorAtendimento:
     def __init__(self, fila: Fila, medicos: List[Medico],
-                 tempo_total: int, intervalo: float = 1):
+                 tempo_total: int, intervalo: float = 1,
+                 modo: str = MODO_TEMPO_REAL, relogio: Optional[Relogio] = None,
+                 chegadas: Optional[Iterable[Paciente]] = None, guardar_atendidos: bool = True,
+                 exibir: bool = True, metricas: Optional[Metricas] = None):
+        """
+        Args:
+            fila: Fila de pacientes já presentes no início da simulação
+            medicos: Médicos disponíveis
+            tempo_total: Duração da simulação em minutos
+            intervalo: Segundos entre passos. No modo eventos, os eventos são
+                alinhados a esses passos e o resultado é o mesmo do modo tempo
+                real com um RelogioSimulado; com 0, o tempo é contínuo
+            modo: 'tempo_real' (avança com o relógio) ou 'eventos' (salta entre eventos)
+            relogio: Fonte de tempo (padrão: relógio do sistema). No modo eventos,
+                um RelogioSimulado é posicionado em cada evento processado
+            chegadas: Fonte de pacientes em ordem de hora_chegada (gerador, leitor
+                de arquivo...), consumida aos poucos: só ficam em memória os que já chegaram
+            guardar_atendidos: Se False, pacientes atendidos entram apenas nas
+                estatísticas, sem acumular em pacientes_atendidos
+            exibir: Se False, não imprime status nem o resumo final
+            metricas: Coletor de eventos por segundo, tamanho da fila e ocupação
+                dos médicos (padrão: desativado). As latências da fila são
+                coletadas pelas métricas da própria Fila
+        """
+        if modo not in (MODO_TEMPO_REAL, MODO_EVENTOS):
+            raise ValueError(f"Modo de simulação inválido: {modo}")
+
         self.fila = fila
         self.medicos = medicos
         self.tempo_total = tempo_total  # em minutos
         self.intervalo = intervalo  # em segundos
+        self.modo = modo
+        self.relogio = relogio or RELOGIO_REAL
         self.tempo_decorrido = 0  # em minutos
         self.pacientes_atendidos = []
+        self.guardar_atendidos = guardar_atendidos
+        self.exibir = exibir
+        self.metricas = metricas or METRICAS_DESATIVADAS
+        self.estatisticas = AcumuladorAtendimentos()  # atualizado a cada atendimento finalizado
+        self.agora: Optional[float] = None  # instante do passo/evento atual
+        self._chegadas = []  # heap de (hora_chegada, seq, paciente)
+        self._fluxo = FluxoChegadas(chegadas) if chegadas is not None else None
+        self._chegada_do_fluxo: Optional[Paciente] = None  # única chegada do fluxo já agendada
+        self._eventos = []  # heap de (hora, tipo, seq, alvo)
+        self._seq = count()
+        self._disponibilidade = IndiceDisponibilidade()
+        self._inicio_agendado = False
+        self._inicio_turno = 0.0
+
+    def agendar_chegada(self, paciente: Paciente) -> None:
+        """Agenda a chegada futura de um paciente (em paciente.hora_chegada)"""
+        heappush(self._chegadas, (paciente.hora_chegada, next(self._seq), paciente))
 
     def executar(self) -> None:
-        tempo_inicio = time.time()
+        # Todos os médicos atendem a fila única: um só grupo de disponibilidade
+        self._disponibilidade = IndiceDisponibilidade(agrupar=lambda medico: None)
+        for medico in self.medicos:
+            self._disponibilidade.adicionar(medico)
+
+        inicio = perf_counter() if self.metricas.ativo else None
+        if self.modo == MODO_EVENTOS:
+            self._executar_eventos()
+        else:
+            self._executar_tempo_real()
+        if inicio is not None:
+            self.metricas.observar('simulador.executar', perf_counter() - inicio)
+
+    def _executar_tempo_real(self) -> None:
+        tempo_inicio = self.relogio.agora()
 
         while self.tempo_decorrido < self.tempo_total:
             # Atualizar tempo decorrido
-            self.tempo_decorrido = (time.time() - tempo_inicio) / 60
+            self.agora = self.relogio.agora()
+            self.tempo_decorrido = (self.agora - tempo_inicio) / 60
+
+            # Admitir chegadas agendadas
+            while self._chegadas and self._chegadas[0][0] <= self.agora:
+                self.fila.adicionar_paciente(heappop(self._chegadas)[2])
+            if self._fluxo:
+                for paciente in self._fluxo.ate(self.agora):
+                    self.fila.adicionar_paciente(paciente)
 
             # Atender pacientes com médicos disponíveis
             self._atender_pacientes()
@@ -27,44 +123,173 @@ class SimuladorAtendimento:
             # Finalizar atendimentos concluídos
             self._finalizar_atendimentos()
 
+            if self.metricas.ativo:
+                self._registrar_metricas()
+
             # Mostrar status periodicamente
-            if int(self.tempo_decorrido) % 30 == 0:  # A cada 30 minutos
+            if self.exibir and int(self.tempo_decorrido) % INTERVALO_STATUS == 0:
                 self._mostrar_status()
 
-            time.sleep(self.intervalo)
+            self.relogio.dormir(self.intervalo)
 
         # Finalizar simulação
+        self.agora = self.relogio.agora()
+        self._finalizar_simulacao()
+
+    def _executar_eventos(self) -> None:
+        """Executa a simulação com relógio virtual, saltando direto ao próximo evento"""
+        inicio = self.relogio.agora()
+        self._inicio_turno = inicio
+        self.agora = inicio
+        simulado = self.relogio if isinstance(self.relogio, RelogioSimulado) else None
+        # O laço em tempo real processa até o primeiro passo no fim do turno
+        # e força a finalização dos atendimentos no passo seguinte
+        limite = self._no_passo(inicio + self.tempo_total * 60)
+        final = limite + self.intervalo if self.intervalo > 0 else limite
+        ordem_fim = EVENTO_FIM_NO_PASSO if self.intervalo > 0 else EVENTO_FIM
+
+        self._eventos = []
+        while self._chegadas:
+            hora, _, paciente = heappop(self._chegadas)
+            self._agendar(self._no_passo(hora), EVENTO_CHEGADA, paciente)
+        self._agendar_chegada_do_fluxo()
+
+        if self.exibir:
+            for minuto in range(0, int(self.tempo_total), INTERVALO_STATUS):
+                self._agendar(inicio + minuto * 60, EVENTO_STATUS, None)
+
+        self._agendar_inicio(inicio)
+
+        while True:
+            proximo_fim = self._disponibilidade.proximo_termino()
+            if proximo_fim is not None:
+                proximo_fim = self._no_passo(proximo_fim)
+            if self._eventos and (proximo_fim is None or self._eventos[0][:2] < (proximo_fim, ordem_fim)):
+                hora, tipo, _, alvo = self._eventos[0]
+            elif proximo_fim is not None:
+                hora, tipo, alvo = proximo_fim, EVENTO_FIM, None
+            else:
+                break
+            if hora > limite:
+                break
+            if tipo != EVENTO_FIM:
+                heappop(self._eventos)
+
+            self.agora = hora
+            if simulado:
+                simulado.definir(hora)
+            self.tempo_decorrido = (hora - inicio) / 60
+
+            if tipo == EVENTO_FIM:
+                for medico in self._disponibilidade.concluidos(hora):
+                    self._processar_fim(medico)
+            elif tipo == EVENTO_CHEGADA:
+                self.fila.adicionar_paciente(alvo)
+                if alvo is self._chegada_do_fluxo:
+                    self._agendar_chegada_do_fluxo()
+                self._agendar_inicio(hora)
+            elif tipo == EVENTO_INICIO:
+                self._processar_inicio()
+            else:
+                self._mostrar_status()
+
+            if self.metricas.ativo:
+                self._registrar_metricas()
+
+        self.agora = final
+        if simulado:
+            simulado.definir(final)
+        self.tempo_decorrido = (limite - inicio) / 60
+        self._eventos = []
         self._finalizar_simulacao()
 
+    def _no_passo(self, hora: float) -> float:
+        """Instante do primeiro passo em que `hora` já passou (a própria hora se intervalo for 0)
+
+        Args:
+            hora: Instante de uma chegada ou de um fim de atendimento
+
+        Returns:
+            float: Instante em que o modo tempo real processaria o evento
+        """
+        if self.intervalo <= 0:
+            return max(hora, self._inicio_turno)
+        passos = max(0, ceil((hora - self._inicio_turno) / self.intervalo))
+        return self._inicio_turno + passos * self.intervalo
+
+    def _agendar(self, hora: float, tipo: int, alvo) -> None:
+        heappush(self._eventos, (hora, tipo, next(self._seq), alvo))
+
+    def _agendar_chegada_do_fluxo(self) -> None:
+        """Lê do fluxo apenas a próxima chegada e a coloca na agenda de eventos"""
+        self._chegada_do_fluxo = self._fluxo.proximo() if self._fluxo else None
+        if self._chegada_do_fluxo is not None:
+            hora = self._no_passo(max(self._chegada_do_fluxo.hora_chegada, self.agora))
+            self._agendar(hora, EVENTO_CHEGADA, self._chegada_do_fluxo)
+
+    def _agendar_inicio(self, hora: float) -> None:
+        """Agenda uma tentativa de início de atendimentos em `hora`"""
+        if not self._inicio_agendado and self._disponibilidade.tem_livre(None) and len(self.fila) > 0:
+            self._inicio_agendado = True
+            self._agendar(hora, EVENTO_INICIO, None)
+
+    def _processar_inicio(self) -> None:
+        self._inicio_agendado = False
+        self._atender_pacientes()
+
+    def _processar_fim(self, medico: Medico) -> None:
+        paciente = medico.finalizar_atendimento(self.agora)
+        self._disponibilidade.liberar(medico)
+        self._registrar_atendido(paciente)
+        # No laço em tempo real, o médico liberado só atende no passo seguinte
+        self._agendar_inicio(self.agora + self.intervalo)
+
     def _atender_pacientes(self) -> None:
-        for medico in self.medicos:
-            if not medico.ocupado and len(self.fila) > 0:
-                paciente = self.fila.proximo()
-                if paciente:
-                    medico.iniciar_atendimento(paciente)
+        while self._disponibilidade.tem_livre(None) and len(self.fila) > 0:
+            medico = self._disponibilidade.retirar_livre(None)
+            paciente = self.fila.atender_proximo()
+            medico.iniciar_atendimento(paciente, self.agora)
+            self._disponibilidade.ocupar(medico)
 
     def _finalizar_atendimentos(self) -> None:
-        for medico in self.medicos:
-            if medico.ocupado and medico.tempo_restante_atendimento() <= 0:
-                paciente = medico.finalizar_atendimento()
-                self.pacientes_atendidos.append(paciente)
+        for medico in self._disponibilidade.concluidos(self.agora):
+            paciente = medico.finalizar_atendimento(self.agora)
+            self._disponibilidade.liberar(medico)
+            self._registrar_atendido(paciente)
+
+    def _registrar_metricas(self) -> None:
+        """Conta o evento (ou passo) processado e amostra fila e ocupação"""
+        self.metricas.contar_evento()
+        self.metricas.amostrar('tamanho_fila', self.agora, len(self.fila))
+        if self.medicos:
+            ocupados = len(self.medicos) - self._disponibilidade.total_livres()
+            self.metricas.amostrar('utilizacao_medicos', self.agora, ocupados / len(self.medicos))
+
+    def _registrar_atendido(self, paciente: Paciente) -> None:
+        if self.guardar_atendidos:
+            self.pacientes_atendidos.append(paciente)
+        self.estatisticas.registrar(paciente)
 
     def _mostrar_status(self) -> None:
-        print(f"\n[STATUS] Tempo: {self.tempo_decorrido:.1f} min")
-        print(f"Pacientes na fila: {len(self.fila)}")
-        print(f"Pacientes atendidos: {len(self.pacientes_atendidos)}")
+        if not mostrar_ativo(_saida):
+            return
+        linhas = [f"\n[STATUS] Tempo: {self.tempo_decorrido:.1f} min",
+                  f"Pacientes na fila: {len(self.fila)}",
+                  f"Pacientes atendidos: {self.estatisticas.total}"]
 
         for medico in self.medicos:
             status = f"Atendendo: {medico.paciente_atual.nome}" if medico.ocupado else "Disponível"
-            print(f"{medico.nome} ({medico.especialidade}): {status}")
+            linhas.append(f"{medico.nome} ({medico.especialidade}): {status}")
+        mostrar(_saida, "\n".join(linhas))
 
     def _finalizar_simulacao(self) -> None:
         # Forçar finalização de todos os atendimentos
         for medico in self.medicos:
             if medico.ocupado:
-                paciente = medico.finalizar_atendimento()
-                self.pacientes_atendidos.append(paciente)
+                paciente = medico.finalizar_atendimento(self.agora)
+                self._registrar_atendido(paciente)
 
-        print("\n=== FINALIZANDO SIMULAÇÃO ===")
-        print(f"Total pacientes atendidos: {len(self.pacientes_atendidos)}")
-        print(f"Pacientes restantes na fila: {len(self.fila)}")
\ No newline at end of file
+        if not self.exibir:
+            return
+        mostrar(_saida, "\n=== FINALIZANDO SIMULAÇÃO ===\nTotal pacientes atendidos: %d\n"
+                    "Pacientes restantes na fila: %d", self.estatisticas.total, len(self.fila))
@@ -0,0 +1,110 @@
+import csv
+import json
+from typing import Dict, Iterable, Iterator, Optional
+from models.paciente import Paciente
+from models.especialidade import Especialidade
+
+
+class FluxoChegadas:
+    """Consome pacientes de uma fonte em ordem de chegada, sob demanda
+
+    A fonte (gerador, leitor de arquivo, lista...) deve produzir pacientes em
+    ordem crescente de hora_chegada. Só o próximo paciente é lido antecipadamente,
+    de modo que fontes ilimitadas são processadas em memória constante.
+    """
+
+    def __init__(self, fonte: Iterable[Paciente]):
+        self._fonte = iter(fonte)
+        self._proximo: Optional[Paciente] = None
+        self._esgotado = False
+        self.consumidos = 0
+        self._avancar()
+
+    def _avancar(self) -> None:
+        self._proximo = next(self._fonte, None)
+        if self._proximo is None:
+            self._esgotado = True
+
+    @property
+    def esgotado(self) -> bool:
+        """True quando a fonte não tem mais pacientes"""
+        return self._esgotado
+
+    def proxima_hora(self) -> Optional[float]:
+        """Hora de chegada do próximo paciente (None se a fonte acabou)"""
+        return self._proximo.hora_chegada if self._proximo is not None else None
+
+    def proximo(self) -> Optional[Paciente]:
+        """Retira o próximo paciente da fonte, qualquer que seja sua hora de chegada"""
+        paciente = self._proximo
+        if paciente is not None:
+            self.consumidos += 1
+            self._avancar()
+        return paciente
+
+    def ate(self, instante: float) -> Iterator[Paciente]:
+        """Retira os pacientes que chegaram até `instante`"""
+        while self._proximo is not None and self._proximo.hora_chegada <= instante:
+            yield self.proximo()
+
+    def __iter__(self) -> Iterator[Paciente]:
+        while self._proximo is not None:
+            yield self.proximo()
+
+
+def paciente_de_registro(registro: Dict) -> Paciente:
+    """Cria um paciente a partir de um registro no formato de registro_de_paciente"""
+    especialidade = registro.get('especialidade')
+    return Paciente(
+        id=int(registro['id']),
+        nome=registro['nome'],
+        gravidade=int(registro['gravidade']),
+        hora_chegada=float(registro['hora_chegada']),
+        especialidade=Especialidade[especialidade] if especialidade else None
+    )
+
+
+def ler_chegadas_csv(caminho: str) -> Iterator[Paciente]:
+    """Lê chegadas de um CSV com cabeçalho id,nome,gravidade,hora_chegada,especialidade
+
+    A especialidade é o nome do membro de Especialidade (ex.: CARDIOLOGIA) ou vazia.
+    O arquivo é lido linha a linha.
+    """
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        for registro in csv.DictReader(arquivo):
+            yield paciente_de_registro(registro)
+
+
+def ler_chegadas_jsonl(caminho: str) -> Iterator[Paciente]:
+    """Lê chegadas de um arquivo JSONL, um objeto por linha com as mesmas chaves do CSV"""
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            if linha.strip():
+                yield paciente_de_registro(json.loads(linha))
+
+
+def registro_de_paciente(paciente: Paciente) -> Dict:
+    """Converte um paciente para o formato de registro lido pelos leitores de chegadas"""
+    return {
+        'id': paciente.id,
+        'nome': paciente.nome,
+        'gravidade': paciente.gravidade,
+        'hora_chegada': paciente.hora_chegada,
+        'especialidade': paciente.especialidade.name if paciente.especialidade else ''
+    }
+
+
+def salvar_chegadas_csv(pacientes: Iterable[Paciente], caminho: str) -> None:
+    """Grava chegadas em CSV no formato lido por ler_chegadas_csv"""
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.DictWriter(arquivo, ['id', 'nome', 'gravidade', 'hora_chegada', 'especialidade'])
+        escritor.writeheader()
+        for paciente in pacientes:
+            escritor.writerow(registro_de_paciente(paciente))
+
+
+def salvar_chegadas_jsonl(pacientes: Iterable[Paciente], caminho: str) -> None:
+    """Grava chegadas em JSONL no formato lido por ler_chegadas_jsonl"""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        for paciente in pacientes:
+            arquivo.write(json.dumps(registro_de_paciente(paciente), ensure_ascii=False) + '\n')
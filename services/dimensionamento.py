@@ -0,0 +1,310 @@
+import json
+import random
+import sys
+from array import array
+from itertools import count
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from models.especialidade import Especialidade
+from models.hospital import Hospital
+from models.medico import Medico
+from models.paciente import Paciente
+from services.chegadas import FluxoChegadas
+from services.replicacoes import Cenario, INICIO_SIMULADO
+from utils.geradores import fluxo_chegadas, gerar_lote_pacientes
+from utils.relogio import RelogioSimulado
+from utils.saida import silenciar
+
+GRAVIDADES = (1, 2, 3, 4, 5)
+QUANTIL_META = 0.9
+MAXIMO_POR_ESPECIALIDADE = 50  # limite da busca por especialidade
+REPLICACOES = 10  # com ~20 pacientes por gravidade e replicação, menos deixa o p90 ruidoso
+
+# Chegada guardada entre avaliações: (id, nome, gravidade, hora_chegada, especialidade)
+Chegada = Tuple[int, str, int, float, Optional[Especialidade]]
+
+
+def _quantil(valores: Sequence[float], p: float) -> float:
+    """Quantil p pelo mesmo critério de EstatisticasEspera (0 se não houver valores)"""
+    if not valores:
+        return 0.0
+    return sorted(valores)[round(p * (len(valores) - 1))]
+
+
+class DimensionadorEquipe:
+    """Busca a equipe mais barata cujo p90 de espera por gravidade fica abaixo da meta
+
+    A busca é gulosa (análise marginal): a cada passo acrescenta o médico cuja
+    especialidade mais reduz o excesso sobre a meta por unidade de custo, para
+    quando a meta é atingida ou quando nenhum acréscimo ajuda, e depois tenta
+    retirar médicos que se mostraram dispensáveis. O p90 de cada gravidade é
+    calculado sobre as esperas de todas as replicações juntas.
+
+    Para reaproveitar simulações entre candidatos:
+    - as chegadas de cada replicação e o tempo de atendimento do k-ésimo médico
+      de cada especialidade são sorteados uma única vez (números aleatórios
+      comuns), de modo que candidatos diferem apenas na equipe;
+    - com cada médico atendendo só a fila da sua especialidade, as filas são
+      independentes: cada especialidade é simulada à parte e o resultado de
+      (especialidade, médicos, replicação) fica em cache. Um candidato que
+      muda uma especialidade custa uma única simulação pequena.
+
+    Para tornar as filas independentes, pacientes sem especialidade são
+    encaminhados antes da simulação (gravidade 1 à urgência, 2 alternando
+    entre cardiologia e neurologia, demais à clínica geral), aproximando o
+    balanceamento de Hospital._determinar_especialidade. A equipe encontrada
+    é validada com o hospital completo, com o encaminhamento real; enquanto a
+    validação não atingir a meta, a busca continua acrescentando o médico de
+    maior ganho marginal, agora medido pela própria validação, até atingi-la
+    ou esgotar os limites (orçamento e máximo por especialidade).
+
+    Pacientes ainda na fila ao fim do turno entram com a espera até o fim
+    do turno, de modo que equipes insuficientes não parecem melhores do que são.
+    """
+
+    def __init__(self, cenario: Cenario, meta_p90: Union[float, Dict[int, float]],
+                 replicacoes: int = REPLICACOES, semente: int = 0,
+                 custos: Optional[Dict[Especialidade, float]] = None,
+                 maximo_por_especialidade: int = MAXIMO_POR_ESPECIALIDADE,
+                 orcamento: Optional[float] = None):
+        """
+        Args:
+            cenario: Demanda a atender; medicos_por_especialidade é a equipe mínima
+            meta_p90: p90 máximo de espera em minutos, único ou por gravidade
+                (gravidades ausentes do dicionário ficam sem meta)
+            replicacoes: Replicações simuladas por avaliação (o p90 das esperas de
+                todas elas é comparado à meta)
+            semente: Semente mestre das chegadas e dos tempos de atendimento
+            custos: Custo de um médico de cada especialidade (padrão: 1)
+            maximo_por_especialidade: Limite de médicos por especialidade na busca
+            orcamento: Custo máximo da equipe (None: limitado só por maximo_por_especialidade)
+        """
+        self.cenario = cenario
+        self.meta = (dict(meta_p90) if isinstance(meta_p90, dict)
+                     else {gravidade: meta_p90 for gravidade in GRAVIDADES})
+        self.custos = {especialidade: (custos or {}).get(especialidade, 1.0) for especialidade in Especialidade}
+        self.maximo_por_especialidade = maximo_por_especialidade
+        self.orcamento = orcamento
+        self.avaliacoes = 0  # simulações de especialidade efetivamente executadas
+        self.validacoes = 0  # simulações do hospital completo efetivamente executadas
+        self._fim = INICIO_SIMULADO + cenario.tempo_total * 60
+        self._cache: Dict[Tuple[Especialidade, int, int], Dict[int, array]] = {}
+        self._validadas: Dict[Tuple[Tuple[Especialidade, int], ...], Dict[int, float]] = {}
+
+        gerador = random.Random(semente)
+        self._chegadas: List[List[Chegada]] = [self._sortear_chegadas(gerador.getrandbits(64))
+                                               for _ in range(replicacoes)]
+        minimo, maximo = cenario.faixa_tempo_atendimento
+        self._tempos = {especialidade: [gerador.randint(minimo, maximo) for _ in range(maximo_por_especialidade)]
+                        for especialidade in Especialidade}
+
+        # Chegadas de cada replicação já encaminhadas, por especialidade
+        self._por_especialidade: List[Dict[Especialidade, List[Chegada]]] = []
+        for chegadas in self._chegadas:
+            alternancia = count()
+            grupos = {especialidade: [] for especialidade in Especialidade}
+            for chegada in chegadas:
+                grupos[chegada[4] or self._encaminhar(chegada[2], alternancia)].append(chegada)
+            self._por_especialidade.append(grupos)
+
+    def _sortear_chegadas(self, semente: int) -> List[Chegada]:
+        cenario = self.cenario
+        rng = random.Random(semente)
+        iniciais = gerar_lote_pacientes(cenario.pacientes_iniciais, rng.getrandbits(64), cenario.pesos_gravidade,
+                                        cenario.mix_especialidades, inicio=INICIO_SIMULADO)
+        turno = fluxo_chegadas(cenario.chegadas_por_hora, rng.getrandbits(64), cenario.pesos_gravidade,
+                               cenario.mix_especialidades, inicio=INICIO_SIMULADO,
+                               duracao_turno=cenario.tempo_total, id_inicial=cenario.pacientes_iniciais + 1)
+        return [(p.id, p.nome, p.gravidade, p.hora_chegada, p.especialidade)
+                for fonte in (iniciais, turno) for p in fonte]
+
+    @staticmethod
+    def _encaminhar(gravidade: int, alternancia) -> Especialidade:
+        if gravidade == 1:
+            return Especialidade.URGENCIA
+        if gravidade == 2:
+            return (Especialidade.CARDIOLOGIA, Especialidade.NEUROLOGIA)[next(alternancia) % 2]
+        return Especialidade.CLINICO_GERAL
+
+    def _medicos(self, especialidade: Especialidade, quantidade: int, relogio: RelogioSimulado,
+                 primeiro_id: int = 1) -> List[Medico]:
+        return [Medico(primeiro_id + k, f"Médico {primeiro_id + k}", especialidade,
+                       self._tempos[especialidade][k], relogio)
+                for k in range(quantidade)]
+
+    def _simular(self, hospital: Hospital, chegadas: List[Chegada],
+                 especialidade: Optional[Especialidade] = None) -> Dict[int, array]:
+        """Simula o turno e retorna as esperas (segundos) por gravidade"""
+        pacientes = [Paciente(id, nome, gravidade, hora, especialidade or esp_original)
+                     for id, nome, gravidade, hora, esp_original in chegadas]
+        with silenciar():
+            # Quem chegou antes do início já está na fila quando o turno começa
+            for paciente in pacientes:
+                if paciente.hora_chegada > INICIO_SIMULADO:
+                    break
+                hospital.admitir_paciente(paciente)
+            hospital.avancar_ate(self._fim, FluxoChegadas(p for p in pacientes if p.hora_chegada > INICIO_SIMULADO))
+
+        esperas = {gravidade: array('d') for gravidade in GRAVIDADES}
+        historico = hospital.historico
+        for gravidade, espera in zip(historico.gravidade, historico.tempo_espera):
+            esperas[gravidade].append(espera)
+        for medico in hospital.medicos:
+            if medico.ocupado:
+                esperas[medico.paciente_atual.gravidade].append(medico.paciente_atual.tempo_espera())
+        for fila in hospital.filas_espera.values():
+            for paciente in fila.em_ordem():
+                esperas[paciente.gravidade].append(self._fim - paciente.hora_chegada)
+        return esperas
+
+    def _esperas_especialidade(self, especialidade: Especialidade, medicos: int,
+                               replicacao: int) -> Dict[int, array]:
+        chave = (especialidade, medicos, replicacao)
+        if chave not in self._cache:
+            relogio = RelogioSimulado(INICIO_SIMULADO)
+            hospital = Hospital(especialidade.name, relogio)
+            for medico in self._medicos(especialidade, medicos, relogio):
+                hospital.adicionar_medico(medico)
+            self._cache[chave] = self._simular(hospital, self._por_especialidade[replicacao][especialidade],
+                                               especialidade)
+            self.avaliacoes += 1
+        return self._cache[chave]
+
+    def _p90(self, esperas_por_replicacao: List[Dict[int, List[float]]]) -> Dict[int, float]:
+        """p90 de espera (minutos) de cada gravidade sobre as esperas de todas as replicações"""
+        return {gravidade: _quantil([espera for esperas in esperas_por_replicacao for espera in esperas[gravidade]],
+                                    QUANTIL_META) / 60
+                for gravidade in GRAVIDADES}
+
+    def avaliar(self, equipe: Dict[Especialidade, int]) -> Dict[int, float]:
+        """Estima o p90 de espera (minutos) por gravidade com a equipe, a partir do cache"""
+        esperas_por_replicacao = []
+        for replicacao, grupos in enumerate(self._por_especialidade):
+            esperas = {gravidade: [] for gravidade in GRAVIDADES}
+            for especialidade, chegadas in grupos.items():
+                if not chegadas:
+                    continue
+                for gravidade, valores in self._esperas_especialidade(
+                        especialidade, equipe.get(especialidade, 0), replicacao).items():
+                    esperas[gravidade].extend(valores)
+            esperas_por_replicacao.append(esperas)
+        return self._p90(esperas_por_replicacao)
+
+    def validar(self, equipe: Dict[Especialidade, int]) -> Dict[int, float]:
+        """p90 de espera (minutos) por gravidade simulando o hospital completo com a equipe"""
+        chave = tuple(sorted(((especialidade, quantidade) for especialidade, quantidade in equipe.items()
+                              if quantidade), key=lambda item: item[0].value))
+        if chave not in self._validadas:
+            self._validadas[chave] = self._validar(dict(chave))
+            self.validacoes += 1
+        return self._validadas[chave]
+
+    def _validar(self, equipe: Dict[Especialidade, int]) -> Dict[int, float]:
+        esperas_por_replicacao = []
+        for chegadas in self._chegadas:
+            relogio = RelogioSimulado(INICIO_SIMULADO)
+            hospital = Hospital('Validação', relogio)
+            proximo_id = 1
+            for especialidade, quantidade in equipe.items():
+                for medico in self._medicos(especialidade, quantidade, relogio, proximo_id):
+                    hospital.adicionar_medico(medico)
+                proximo_id += quantidade
+            esperas_por_replicacao.append(self._simular(hospital, chegadas))
+        return self._p90(esperas_por_replicacao)
+
+    def excesso(self, p90: Dict[int, float]) -> float:
+        """Soma, em minutos, do quanto cada gravidade passa da meta"""
+        return sum(max(0.0, p90[gravidade] - meta) for gravidade, meta in self.meta.items())
+
+    def custo(self, equipe: Dict[Especialidade, int]) -> float:
+        return sum(self.custos[especialidade] * quantidade for especialidade, quantidade in equipe.items())
+
+    def _acrescimo(self, equipe: Dict[Especialidade, int], especialidades,
+                   excesso: float, medir) -> Optional[Especialidade]:
+        """Especialidade cujo médico a mais mais reduz o excesso medido por `medir`,
+        por unidade de custo, dentro dos limites (None se nenhuma reduz)"""
+        melhor = None
+        for especialidade in especialidades:
+            if equipe[especialidade] >= self.maximo_por_especialidade:
+                continue
+            candidata = {**equipe, especialidade: equipe[especialidade] + 1}
+            if self.orcamento is not None and self.custo(candidata) > self.orcamento:
+                continue
+            ganho = (excesso - self.excesso(medir(candidata))) / self.custos[especialidade]
+            if ganho > 0 and (melhor is None or ganho > melhor[0]):
+                melhor = (ganho, especialidade)
+        return melhor[1] if melhor else None
+
+    def dimensionar(self) -> Dict:
+        """Executa a busca e retorna a equipe encontrada com suas métricas
+
+        Returns:
+            Dict: equipe por especialidade, custo, p90 estimado e validado por
+                gravidade, se a meta foi atingida (na validação) e os passos da busca
+        """
+        demanda = {especialidade for grupos in self._por_especialidade
+                   for especialidade, chegadas in grupos.items() if chegadas}
+        equipe = {especialidade: max(self.cenario.medicos_por_especialidade.get(especialidade, 0),
+                                     1 if especialidade in demanda else 0)
+                  for especialidade in Especialidade}
+        passos = []
+        excesso = self.excesso(self.avaliar(equipe))
+
+        # Acréscimos pela maior redução de excesso por custo
+        while excesso > 0:
+            especialidade = self._acrescimo(equipe, demanda, excesso, self.avaliar)
+            if especialidade is None:
+                break  # nenhum médico a mais reduz o excesso: a meta é inatingível dentro dos limites
+            equipe[especialidade] += 1
+            excesso = self.excesso(self.avaliar(equipe))
+            passos.append({'acao': 'adicionar', 'especialidade': especialidade.name, 'excesso': excesso,
+                           'validado': False})
+
+        # Retiradas de médicos dispensáveis, dos mais caros aos mais baratos
+        if excesso == 0:
+            for especialidade in sorted(demanda, key=lambda e: (-self.custos[e], e.value)):
+                while equipe[especialidade] > max(1, self.cenario.medicos_por_especialidade.get(especialidade, 0)):
+                    candidata = {**equipe, especialidade: equipe[especialidade] - 1}
+                    if self.excesso(self.avaliar(candidata)) > 0:
+                        break
+                    equipe = candidata
+                    passos.append({'acao': 'remover', 'especialidade': especialidade.name, 'excesso': 0.0,
+                                   'validado': False})
+
+        # O encaminhamento real difere do aproximado: acréscimos medidos pela validação
+        validado = self.validar(equipe)
+        excesso = self.excesso(validado)
+        while excesso > 0:
+            especialidade = self._acrescimo(equipe, demanda, excesso, self.validar)
+            if especialidade is None:
+                break
+            equipe[especialidade] += 1
+            validado = self.validar(equipe)
+            excesso = self.excesso(validado)
+            passos.append({'acao': 'adicionar', 'especialidade': especialidade.name, 'excesso': excesso,
+                           'validado': True})
+
+        equipe = {especialidade: quantidade for especialidade, quantidade in equipe.items() if quantidade}
+        estimado = self.avaliar(equipe)
+        return {
+            'medicos_por_especialidade': {especialidade.name: quantidade for especialidade, quantidade in equipe.items()},
+            'total_medicos': sum(equipe.values()),
+            'custo': self.custo(equipe),
+            'tempo_espera_p90_estimado': estimado,
+            'tempo_espera_p90': validado,
+            'atende_meta': self.excesso(validado) == 0,
+            'avaliacoes': self.avaliacoes,
+            'validacoes': self.validacoes,
+            'passos': passos
+        }
+
+
+def dimensionar_equipe(cenario: Cenario, meta_p90: Union[float, Dict[int, float]], **opcoes) -> Dict:
+    """Atalho para DimensionadorEquipe(cenario, meta_p90, **opcoes).dimensionar()"""
+    return DimensionadorEquipe(cenario, meta_p90, **opcoes).dimensionar()
+
+
+if __name__ == '__main__':
+    # Uso: python -m services.dimensionamento <chegadas por hora> <meta p90 em minutos> [turno em minutos]
+    turno = int(sys.argv[3]) if len(sys.argv) > 3 else 480
+    resultado = dimensionar_equipe(Cenario('linha de comando', {}, float(sys.argv[1]), turno), float(sys.argv[2]))
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
@@ -0,0 +1,245 @@
+from bisect import bisect_right, insort
+from typing import Dict, Hashable, Optional, Sequence
+from models.paciente import Paciente
+
+QUANTIS_PADRAO = (0.5, 0.9, 0.99)
+LIMITE_AMOSTRAS_EXATAS = 1000  # até aqui os quantis são exatos; depois, estimados pelo P² estendido
+
+
+class QuantisP2:
+    """Estimador conjunto de vários quantis em fluxo pelo P² estendido (Raatikainen, 1987)
+
+    Acompanha m quantis com 2m + 3 marcadores compartilhados: cada amostra
+    localiza sua célula e desloca os marcadores uma única vez para todos os
+    quantis, em vez de uma vez por estimador. Com um único quantil equivale
+    ao P² original (Jain & Chlamtac, 1985), com cinco marcadores.
+    """
+
+    def __init__(self, ps: Sequence[float]):
+        """
+        Args:
+            ps: Quantis desejados, entre 0 e 1 (ex.: (0.5, 0.9) para p50 e p90)
+        """
+        ps = sorted(set(ps))
+        if not ps or not all(0 < p < 1 for p in ps):
+            raise ValueError("Os quantis devem estar entre 0 e 1")
+        # Frações alvo dos marcadores: extremos, cada quantil e os pontos médios entre eles
+        fracoes = [0.0]
+        anterior = 0.0
+        for p in ps:
+            fracoes += [(anterior + p) / 2, p]
+            anterior = p
+        fracoes += [(anterior + 1) / 2, 1.0]
+        self.ps = tuple(ps)
+        self._fracoes = fracoes
+        self._marcadores = {p: 2 * (i + 1) for i, p in enumerate(ps)}  # quantil: índice do marcador
+        self._n = 0
+        self._alturas = []  # alturas dos marcadores (as primeiras amostras, ordenadas)
+        self._posicoes = list(range(1, len(fracoes) + 1))
+
+    def registrar(self, valor: float) -> None:
+        """Incorpora uma nova amostra"""
+        q = self._alturas
+        self._n += 1
+        total = len(self._posicoes)
+        if self._n <= total:
+            insort(q, valor)
+            return
+
+        n = self._posicoes
+        if valor < q[0]:
+            q[0] = valor
+            k = 1
+        elif valor >= q[-1]:
+            q[-1] = valor
+            k = total - 1
+        else:
+            k = bisect_right(q, valor)  # q[k - 1] <= valor < q[k]
+        for i in range(k, total):
+            n[i] += 1
+
+        # Ajusta os marcadores intermediários que se afastaram da posição desejada
+        escala = self._n - 1
+        fracoes = self._fracoes
+        for i in range(1, total - 1):
+            atual = n[i]
+            d = 1 + escala * fracoes[i] - atual
+            if d >= 1:
+                if n[i + 1] - atual > 1:
+                    self._ajustar(i, 1)
+            elif d <= -1 and n[i - 1] - atual < -1:
+                self._ajustar(i, -1)
+
+    def _ajustar(self, i: int, d: int) -> None:
+        """Move o marcador i uma posição na direção d, corrigindo sua altura"""
+        q, n = self._alturas, self._posicoes
+        altura = self._parabolica(i, d)
+        if not q[i - 1] < altura < q[i + 1]:
+            altura = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+        q[i] = altura
+        n[i] += d
+
+    def _parabolica(self, i: int, d: int) -> float:
+        q, n = self._alturas, self._posicoes
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def iniciar(self, ordenadas: Sequence[float]) -> None:
+        """Posiciona os marcadores sobre amostras já ordenadas, como se tivessem sido
+        registradas, mas com cada marcador exatamente no seu quantil
+        Args:
+            ordenadas: Todas as amostras vistas até aqui, em ordem crescente
+        """
+        total = len(self._posicoes)
+        self._n = len(ordenadas)
+        if self._n <= total:
+            self._alturas = list(ordenadas)
+            return
+        posicoes = [1 + round((self._n - 1) * fracao) for fracao in self._fracoes]
+        for i in range(1, total):  # posições estritamente crescentes
+            posicoes[i] = max(posicoes[i], posicoes[i - 1] + 1)
+        for i in range(total - 2, -1, -1):
+            posicoes[i] = min(posicoes[i], posicoes[i + 1] - 1)
+        self._posicoes = posicoes
+        self._alturas = [ordenadas[posicao - 1] for posicao in posicoes]
+
+    def estado(self) -> Dict:
+        """Amostras vistas e marcadores (alturas e posições), para snapshots"""
+        return {'n': self._n, 'alturas': list(self._alturas), 'posicoes': list(self._posicoes)}
+
+    def restaurar_estado(self, estado: Dict) -> None:
+        """Retoma a estimativa a partir do devolvido por estado()"""
+        if len(estado['posicoes']) != len(self._posicoes):
+            raise ValueError("Estado de outro conjunto de quantis")
+        self._n = estado['n']
+        self._alturas = list(estado['alturas'])
+        self._posicoes = list(estado['posicoes'])
+
+    def valor(self, p: float) -> float:
+        """Retorna a estimativa atual do quantil p, um dos acompanhados (0 se não houver amostras)"""
+        q = self._alturas
+        if not q:
+            return 0
+        if self._n <= len(self._posicoes):
+            # Poucas amostras: quantil exato sobre os valores guardados
+            return q[round(p * (len(q) - 1))]
+        return q[self._marcadores[p]]
+
+
+class EstatisticasEspera:
+    """Acumulador em fluxo de tempos de espera: contagem, soma, mínimo, máximo e quantis"""
+
+    def __init__(self, quantis=QUANTIS_PADRAO):
+        self.quantidade = 0  # pacientes registrados
+        self.amostras = 0  # pacientes com tempo de espera conhecido
+        self.soma = 0.0
+        self.minimo: Optional[float] = None
+        self.maximo: Optional[float] = None
+        self._quantis = tuple(quantis)
+        self._estimador = QuantisP2(quantis)  # um só estimador para todos os quantis
+        self._exatas: Optional[list] = []  # amostras ordenadas, descartadas ao passar do limite
+
+    def registrar(self, tempo_espera: Optional[float]) -> None:
+        """Registra um paciente e seu tempo de espera (None se desconhecido)"""
+        self.quantidade += 1
+        if tempo_espera is None:
+            return
+
+        self.amostras += 1
+        self.soma += tempo_espera
+        if self.minimo is None or tempo_espera < self.minimo:
+            self.minimo = tempo_espera
+        if self.maximo is None or tempo_espera > self.maximo:
+            self.maximo = tempo_espera
+        if self._exatas is not None:
+            if self.amostras <= LIMITE_AMOSTRAS_EXATAS:
+                insort(self._exatas, tempo_espera)
+                return
+            # Passa a estimar em fluxo, com os marcadores nos quantis exatos das amostras guardadas
+            self._estimador.iniciar(self._exatas)
+            self._exatas = None
+        self._estimador.registrar(tempo_espera)
+
+    @property
+    def media(self) -> float:
+        """Média dos tempos de espera conhecidos"""
+        return self.soma / self.amostras if self.amostras else 0
+
+    def quantil(self, p: float) -> float:
+        """Retorna o quantil p (deve ser um dos quantis acompanhados)"""
+        if p not in self._quantis:
+            raise KeyError(p)
+        if self._exatas is not None:
+            if not self._exatas:
+                return 0
+            return self._exatas[round(p * (len(self._exatas) - 1))]
+        return self._estimador.valor(p)
+
+    def quantis(self) -> Dict[str, float]:
+        """Retorna os quantis acompanhados, rotulados como 'p50', 'p90', ..."""
+        return {f"p{p * 100:g}": self.quantil(p) for p in self._quantis}
+
+    def estado(self) -> Dict:
+        """Contagens, extremos, amostras exatas (None depois do limite) e estimador, para snapshots"""
+        return {
+            'quantidade': self.quantidade,
+            'amostras': self.amostras,
+            'soma': self.soma,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'exatas': None if self._exatas is None else list(self._exatas),
+            'estimador': self._estimador.estado()
+        }
+
+    def restaurar_estado(self, estado: Dict) -> None:
+        """Retoma o acúmulo a partir do devolvido por estado()"""
+        self.quantidade = estado['quantidade']
+        self.amostras = estado['amostras']
+        self.soma = estado['soma']
+        self.minimo = estado['minimo']
+        self.maximo = estado['maximo']
+        self._exatas = None if estado['exatas'] is None else list(estado['exatas'])
+        self._estimador.restaurar_estado(estado['estimador'])
+
+
+class AcumuladorAtendimentos:
+    """Estatísticas de espera atualizadas a cada atendimento finalizado
+
+    Permite gerar relatórios a qualquer momento em O(grupos), sem percorrer
+    a lista de pacientes atendidos.
+    """
+
+    def __init__(self, quantis=QUANTIS_PADRAO):
+        self._quantis = quantis
+        self.geral = EstatisticasEspera(quantis)
+        self.por_gravidade: Dict[int, EstatisticasEspera] = {}
+        self.por_especialidade: Dict[Hashable, EstatisticasEspera] = {}
+
+    @property
+    def quantis(self) -> tuple:
+        """Quantis acompanhados em cada grupo"""
+        return tuple(self._quantis)
+
+    @property
+    def total(self) -> int:
+        """Número de atendimentos registrados"""
+        return self.geral.quantidade
+
+    def registrar(self, paciente: Paciente) -> None:
+        """Registra um paciente cujo atendimento acabou de ser finalizado"""
+        tempo_espera = paciente.tempo_espera()
+        self.geral.registrar(tempo_espera)
+        self._grupo(self.por_gravidade, paciente.gravidade).registrar(tempo_espera)
+        if paciente.especialidade:
+            self._grupo(self.por_especialidade, paciente.especialidade).registrar(tempo_espera)
+
+    def gravidade(self, gravidade: int) -> EstatisticasEspera:
+        """Retorna as estatísticas de uma gravidade (vazias se não houver registros)"""
+        return self.por_gravidade.get(gravidade) or EstatisticasEspera(self._quantis)
+
+    def _grupo(self, grupos: Dict, chave: Hashable) -> EstatisticasEspera:
+        estatisticas = grupos.get(chave)
+        if estatisticas is None:
+            estatisticas = grupos[chave] = EstatisticasEspera(self._quantis)
+        return estatisticas
@@ -0,0 +1,159 @@
+import asyncio
+from typing import AsyncIterable, Iterable, Optional, Set, Union
+from models.hospital import Hospital
+from models.medico import Medico
+from models.paciente import Paciente
+from utils.relogio import RelogioAssincrono
+
+
+class HospitalAsync:
+    """Fachada assíncrona de um Hospital para uso num único laço de eventos asyncio
+
+    Admissões podem vir de várias tarefas concorrentes (balcões de triagem,
+    fluxos de chegada); cada admissão acorda o despachante, que inicia os
+    atendimentos possíveis, e cada atendimento iniciado ganha uma tarefa que
+    aguarda seu término no relógio do hospital. Nada é feito por varredura
+    periódica: o laço só trabalha quando há admissão ou término.
+
+    O relógio do hospital precisa ser um RelogioAssincrono (RelogioReal ou
+    RelogioAcelerado).
+    """
+
+    def __init__(self, hospital: Hospital):
+        if not isinstance(hospital.relogio, RelogioAssincrono):
+            raise TypeError(f"HospitalAsync requer um RelogioAssincrono; "
+                            f"{type(hospital.relogio).__name__} não implementa aguardar()")
+        self.hospital = hospital
+        self._pendente = asyncio.Event()  # há admissão ou médico liberado a despachar
+        self._ocioso = asyncio.Event()  # nada em curso nem pendente (ou alguma tarefa falhou)
+        self._consultas: Set[asyncio.Task] = set()
+        self._despachante: Optional[asyncio.Task] = None
+        self._falha: Optional[BaseException] = None  # primeira exceção do despachante ou de uma consulta
+
+    async def __aenter__(self) -> 'HospitalAsync':
+        self.iniciar()
+        return self
+
+    async def __aexit__(self, *excecao) -> None:
+        await self.encerrar()
+
+    def iniciar(self) -> None:
+        """Inicia o despachante no laço de eventos corrente"""
+        if self._despachante is None:
+            self._despachante = asyncio.create_task(self._despachar())
+            self._despachante.add_done_callback(self._ao_terminar)
+            self._sinalizar()
+
+    async def encerrar(self, aguardar_consultas: bool = True) -> None:
+        """Encerra o despachante, por padrão depois de concluir os atendimentos em curso
+
+        Falhas do despachante ou de um atendimento são relançadas depois que
+        todas as tarefas forem canceladas.
+        """
+        try:
+            if aguardar_consultas:
+                await self.aguardar_consultas()
+        finally:
+            for tarefa in list(self._consultas):
+                tarefa.cancel()
+            if self._despachante is not None:
+                self._despachante.cancel()
+                # As exceções já foram registradas em _falha por _ao_terminar
+                await asyncio.gather(self._despachante, *self._consultas, return_exceptions=True)
+                self._despachante = None
+
+    async def admitir_paciente(self, paciente: Paciente) -> None:
+        """Admite o paciente e acorda o despachante"""
+        self.hospital.admitir_paciente(paciente)
+        self._sinalizar()
+
+    async def admitir_fluxo(self, fonte: Union[Iterable[Paciente], AsyncIterable[Paciente]]) -> int:
+        """Admite pacientes de uma fonte ordenada por hora_chegada, cada um no seu horário
+
+        Aceita iteráveis comuns (geradores, leitores de arquivo) e assíncronos.
+        Returns:
+            int: Quantidade de pacientes admitidos
+        """
+        admitidos = 0
+        if hasattr(fonte, '__aiter__'):
+            async for paciente in fonte:
+                await self._admitir_no_horario(paciente)
+                admitidos += 1
+        else:
+            for paciente in fonte:
+                await self._admitir_no_horario(paciente)
+                admitidos += 1
+        return admitidos
+
+    async def _admitir_no_horario(self, paciente: Paciente) -> None:
+        relogio = self.hospital.relogio
+        espera = paciente.hora_chegada - relogio.agora()
+        if espera > 0:
+            await relogio.aguardar(espera)
+        await self.admitir_paciente(paciente)
+
+    async def aguardar_consultas(self) -> None:
+        """Aguarda até não haver atendimentos em curso nem despachos pendentes
+
+        Raises:
+            Exception: A primeira falha do despachante ou de um atendimento
+        """
+        while self._despachante is not None:
+            self._verificar_falhas()
+            if not self._consultas and not self._pendente.is_set():
+                return
+            await self._ocioso.wait()
+
+    def _verificar_falhas(self) -> None:
+        # O despachante pode ter terminado sem que _ao_terminar tenha rodado ainda
+        despachante = self._despachante
+        if self._falha is None and despachante.done():
+            if despachante.cancelled():
+                self._falha = RuntimeError("O despachante foi cancelado fora de encerrar()")
+            else:
+                self._falha = despachante.exception()
+        if self._falha is not None:
+            raise self._falha
+
+    def _sinalizar(self) -> None:
+        """Acorda o despachante: há admissão ou médico liberado"""
+        self._pendente.set()
+        self._ocioso.clear()
+
+    def _verificar_ocioso(self) -> None:
+        if not self._consultas and not self._pendente.is_set():
+            self._ocioso.set()
+
+    def _ao_terminar(self, tarefa: asyncio.Task) -> None:
+        """Retira a tarefa encerrada e registra sua falha, acordando quem aguarda"""
+        self._consultas.discard(tarefa)
+        if not tarefa.cancelled() and tarefa.exception() is not None:
+            if self._falha is None:
+                self._falha = tarefa.exception()
+            self._ocioso.set()
+        else:
+            self._verificar_ocioso()
+
+    async def _despachar(self) -> None:
+        while True:
+            await self._pendente.wait()
+            self._pendente.clear()
+            for medico in self.hospital.atender_pacientes():
+                tarefa = asyncio.create_task(self._acompanhar(medico))
+                self._consultas.add(tarefa)
+                tarefa.add_done_callback(self._ao_terminar)
+            self._verificar_ocioso()
+
+    async def _acompanhar(self, medico: Medico) -> None:
+        """Aguarda o término previsto do atendimento e o finaliza"""
+        relogio = self.hospital.relogio
+        paciente = medico.paciente_atual
+        # Repete a espera se acordar antes da hora (o término pode também ter
+        # sido finalizado junto com o de outro médico)
+        while medico.paciente_atual is paciente:
+            restante = medico.hora_fim_prevista - relogio.agora()
+            if restante > 0:
+                await relogio.aguardar(restante)
+                continue
+            self.hospital.finalizar_atendimentos()
+            self._sinalizar()
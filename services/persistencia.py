@@ -0,0 +1,331 @@
+"""Snapshot binário do estado de um Hospital e restauração rápida
+
+Formato do arquivo:
+
+    MAGICO (8 bytes) | versão (uint32) | tamanho do cabeçalho (uint32)
+    cabeçalho JSON (nome, médicos e atendimentos em curso, filas, seções)
+    seções de dados, alinhadas em 8 bytes
+
+Cada seção é o conteúdo bruto de um array. Nomes são gravados em duas
+seções: o texto concatenado em UTF-8 e, em '<seção>.fim', onde termina cada
+nome (em caracteres), de modo que qualquer caractere pode aparecer num nome.
+As filas são gravadas na ordem interna da heap, de modo que a restauração não
+reorganiza nada; o histórico é gravado coluna a coluna. As estatísticas do
+relatório (contagens, extremos e marcadores do P²) são campos numéricos do
+cabeçalho e seções de números, sem objetos serializados.
+
+A leitura mapeia o arquivo em memória e copia cada seção uma única vez, da
+região mapeada para o array, sem bytes intermediários. Os arrays não são
+visões do arquivo porque o histórico e as filas continuam crescendo depois
+da restauração.
+"""
+import gc
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate, chain, repeat
+from typing import Dict, List, Optional, Tuple
+from models.escalonador import Escalonador
+from models.especialidade import Especialidade
+from models.historico import HistoricoAtendimentos
+from models.hospital import Hospital
+from models.medico import Medico
+from models.paciente import Paciente
+from services.estatisticas import AcumuladorAtendimentos, EstatisticasEspera
+from utils.metricas import Metricas
+from utils.relogio import Relogio
+
+MAGICO = b'HOSPSNAP'
+VERSAO = 3  # 2: estatísticas acumuladas do relatório; 3: sem pickle, nomes indexados por posição
+PREAMBULO = struct.Struct('<8sII')
+ALINHAMENTO = 8
+
+# Colunas do histórico gravadas como seções 'historico.<coluna>'
+COLUNAS_HISTORICO = HistoricoAtendimentos.COLUNAS
+
+
+def _alinhar(posicao: int) -> int:
+    return (posicao + ALINHAMENTO - 1) // ALINHAMENTO * ALINHAMENTO
+
+
+def _secoes_nomes(nome: str, nomes: List[str]) -> List[Tuple[str, array, int]]:
+    """Seções do texto concatenado dos nomes e da posição final de cada um"""
+    texto = array('B', ''.join(nomes).encode('utf-8'))
+    fins = array('q', accumulate(map(len, nomes)))
+    return [(nome, texto, len(texto)), (f'{nome}.fim', fins, len(fins))]
+
+
+def _decodificar_nomes(texto: array, fins: array) -> List[str]:
+    texto = texto.tobytes().decode('utf-8')
+    return [texto[inicio:fim] for inicio, fim in zip(chain((0,), fins), fins)]
+
+
+@contextmanager
+def _sem_coleta_de_lixo():
+    """Suspende o coletor cíclico, que de outro modo dispararia várias vezes
+    durante a criação em massa dos pacientes das filas"""
+    ativo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if ativo:
+            gc.enable()
+
+
+def _registro_paciente(paciente: Paciente) -> Dict:
+    return {
+        'id': paciente.id,
+        'nome': paciente.nome,
+        'gravidade': paciente.gravidade,
+        'hora_chegada': paciente.hora_chegada,
+        'especialidade': paciente.especialidade.name if paciente.especialidade else None,
+        'hora_atendimento': paciente.hora_atendimento
+    }
+
+
+def _paciente_de_registro(registro: Dict) -> Paciente:
+    especialidade = registro['especialidade']
+    paciente = Paciente(registro['id'], registro['nome'], registro['gravidade'], registro['hora_chegada'],
+                        Especialidade[especialidade] if especialidade else None)
+    paciente.hora_atendimento = registro['hora_atendimento']
+    return paciente
+
+
+def salvar_snapshot(hospital: Hospital, caminho: str) -> None:
+    """Grava o estado do hospital: filas, atendimentos em curso, médicos e histórico
+
+    O arquivo é escrito ao lado e renomeado no final, de modo que um snapshot
+    anterior no mesmo caminho só é substituído por um completo.
+    """
+    secoes: List[Tuple[str, array, int]] = []  # (nome, dados, quantidade de itens)
+
+    # Filas, concatenadas na ordem das especialidades e na ordem interna da heap
+    filas = {}
+    ids, gravidades, horas, contadores, nomes = array('q'), array('b'), array('d'), array('q'), []
+    for especialidade, fila in hospital.filas_espera.items():
+        entradas, proximo_contador = fila.estado()
+        for (gravidade, hora_chegada, contador), paciente in entradas:
+            ids.append(paciente.id)
+            gravidades.append(gravidade)
+            horas.append(hora_chegada)
+            contadores.append(contador)
+            nomes.append(paciente.nome)
+        filas[especialidade.name] = {'quantidade': len(entradas), 'contador': proximo_contador}
+    secoes += [('fila.id', ids, len(ids)), ('fila.gravidade', gravidades, len(ids)),
+               ('fila.hora_chegada', horas, len(ids)), ('fila.contador', contadores, len(ids))]
+    secoes += _secoes_nomes('fila.nomes', nomes)
+
+    # Histórico colunar e as linhas de cada médico, concatenadas
+    colunas, nomes_historico, linhas_historico = hospital.historico.estado()
+    for coluna in COLUNAS_HISTORICO:
+        dados = colunas[coluna]
+        secoes.append((f'historico.{coluna}', dados, len(dados)))
+    secoes += _secoes_nomes('historico.nomes', nomes_historico)
+    linhas = array('q')
+    linhas_por_medico = []
+    for medico_id, linhas_medico in linhas_historico.items():
+        linhas.extend(linhas_medico)
+        linhas_por_medico.append([medico_id, len(linhas_medico)])
+    secoes.append(('historico.linhas', linhas, len(linhas)))
+    estatisticas, secoes_estatisticas = _registro_estatisticas(hospital.estatisticas)
+    secoes += secoes_estatisticas
+
+    medicos = [{
+        'id': medico.id,
+        'nome': medico.nome,
+        'especialidade': medico.especialidade.name,
+        'tempo_medio_atendimento': medico.tempo_medio_atendimento,
+        'total_pacientes_atendidos': medico.total_pacientes_atendidos,
+        'tempo_total_atendimento': medico.tempo_total_atendimento,
+        'hora_inicio_atendimento': medico.hora_inicio_atendimento,
+        'paciente_atual': _registro_paciente(medico.paciente_atual) if medico.ocupado else None
+    } for medico in hospital.medicos]
+
+    descritores = {}
+    deslocamento = 0
+    for nome, dados, quantidade in secoes:
+        deslocamento = _alinhar(deslocamento)
+        descritores[nome] = {'tipo': dados.typecode, 'tamanho_item': dados.itemsize,
+                             'deslocamento': deslocamento, 'bytes': len(dados) * dados.itemsize,
+                             'quantidade': quantidade}
+        deslocamento += len(dados) * dados.itemsize
+
+    cabecalho = json.dumps({
+        'nome': hospital.nome,
+        'ordem_bytes': sys.byteorder,
+        'medicos': medicos,
+        'filas': filas,
+        'linhas_por_medico': linhas_por_medico,
+        'estatisticas': estatisticas,
+        'secoes': descritores
+    }, ensure_ascii=False).encode('utf-8')
+
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'wb') as arquivo:
+        arquivo.write(PREAMBULO.pack(MAGICO, VERSAO, len(cabecalho)))
+        arquivo.write(cabecalho)
+        inicio_dados = _alinhar(PREAMBULO.size + len(cabecalho))
+        for nome, dados, _ in secoes:
+            arquivo.write(b'\0' * (inicio_dados + descritores[nome]['deslocamento'] - arquivo.tell()))
+            dados.tofile(arquivo)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+
+def carregar_snapshot(caminho: str, relogio: Optional[Relogio] = None,
+                      escalonador: Optional[Escalonador] = None,
+                      metricas: Optional[Metricas] = None) -> Hospital:
+    """Reconstrói um Hospital a partir de um snapshot gravado por salvar_snapshot
+
+    Relógio, escalonador e métricas não fazem parte do snapshot e são
+    informados aqui, como na criação de um Hospital.
+    """
+    with open(caminho, 'rb') as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa, \
+            _sem_coleta_de_lixo():
+        magico, versao, tamanho_cabecalho = PREAMBULO.unpack_from(mapa)
+        if magico != MAGICO:
+            raise ValueError(f"{caminho} não é um snapshot de hospital")
+        if versao != VERSAO:
+            raise ValueError(f"Versão de snapshot não suportada: {versao}")
+        cabecalho = json.loads(mapa[PREAMBULO.size:PREAMBULO.size + tamanho_cabecalho].decode('utf-8'))
+        inicio_dados = _alinhar(PREAMBULO.size + tamanho_cabecalho)
+        inverter = cabecalho['ordem_bytes'] != sys.byteorder
+
+        with memoryview(mapa) as visao:
+            def secao(nome: str) -> array:
+                descritor = cabecalho['secoes'][nome]
+                dados = array(descritor['tipo'])
+                if dados.itemsize != descritor['tamanho_item']:
+                    raise ValueError(f"Seção {nome} gravada com itens de tamanho incompatível")
+                inicio = inicio_dados + descritor['deslocamento']
+                dados.frombytes(visao[inicio:inicio + descritor['bytes']])
+                if inverter and dados.itemsize > 1:
+                    dados.byteswap()
+                return dados
+
+            hospital = Hospital(cabecalho['nome'], relogio, escalonador, metricas)
+            _restaurar_historico(hospital.historico, cabecalho, secao)
+            _restaurar_filas(hospital, cabecalho, secao)
+            hospital.estatisticas = _restaurar_estatisticas(cabecalho['estatisticas'], secao)
+            del secao
+
+    for dados in cabecalho['medicos']:
+        medico = Medico(dados['id'], dados['nome'], Especialidade[dados['especialidade']],
+                        dados['tempo_medio_atendimento'], hospital.relogio)
+        medico.total_pacientes_atendidos = dados['total_pacientes_atendidos']
+        medico.tempo_total_atendimento = dados['tempo_total_atendimento']
+        if dados['paciente_atual'] is not None:
+            medico.paciente_atual = _paciente_de_registro(dados['paciente_atual'])
+            medico.hora_inicio_atendimento = dados['hora_inicio_atendimento']
+        hospital.adicionar_medico(medico)
+    return hospital
+
+
+def _restaurar_historico(historico: HistoricoAtendimentos, cabecalho: Dict, secao) -> None:
+    colunas = {coluna: secao(f'historico.{coluna}') for coluna in COLUNAS_HISTORICO}
+    nomes = _decodificar_nomes(secao('historico.nomes'), secao('historico.nomes.fim'))
+
+    linhas = secao('historico.linhas')
+    linhas_por_medico = {}
+    inicio = 0
+    for medico_id, quantidade in cabecalho['linhas_por_medico']:
+        linhas_por_medico[medico_id] = linhas[inicio:inicio + quantidade]
+        inicio += quantidade
+    historico.restaurar_estado(colunas, nomes, linhas_por_medico)
+
+
+def _restaurar_filas(hospital: Hospital, cabecalho: Dict, secao) -> None:
+    ids = secao('fila.id').tolist()
+    gravidades = secao('fila.gravidade').tolist()
+    horas = secao('fila.hora_chegada').tolist()
+    contadores = secao('fila.contador').tolist()
+    nomes = _decodificar_nomes(secao('fila.nomes'), secao('fila.nomes.fim'))
+
+    inicio = 0
+    for nome_especialidade, dados in cabecalho['filas'].items():
+        especialidade = Especialidade[nome_especialidade]
+        fim = inicio + dados['quantidade']
+        pacientes = map(Paciente, ids[inicio:fim], nomes[inicio:fim], gravidades[inicio:fim],
+                        horas[inicio:fim], repeat(especialidade))
+        prioridades = zip(gravidades[inicio:fim], horas[inicio:fim], contadores[inicio:fim])
+        hospital.filas_espera[especialidade].restaurar_estado(list(zip(prioridades, pacientes)), dados['contador'])
+        hospital.escalonador.notificar(especialidade)
+        inicio = fim
+
+
+def _registro_estatisticas(acumulador: AcumuladorAtendimentos) -> Tuple[Dict, List[Tuple[str, array, int]]]:
+    """Campos das estatísticas acumuladas: escalares de cada grupo para o
+    cabeçalho e, em seções, as amostras exatas e os marcadores do P²"""
+    exatas, alturas, posicoes = array('d'), array('d'), array('q')
+    grupos = [('geral', None, acumulador.geral)]
+    grupos += [('gravidade', gravidade, grupo) for gravidade, grupo in acumulador.por_gravidade.items()]
+    grupos += [('especialidade', especialidade.name, grupo)
+               for especialidade, grupo in acumulador.por_especialidade.items()]
+
+    registros = []
+    for tipo, chave, grupo in grupos:
+        estado = grupo.estado()
+        estimador = estado['estimador']
+        registros.append({
+            'grupo': tipo,
+            'chave': chave,
+            'quantidade': estado['quantidade'],
+            'amostras': estado['amostras'],
+            'soma': estado['soma'],
+            'minimo': estado['minimo'],
+            'maximo': estado['maximo'],
+            'exatas': None if estado['exatas'] is None else len(estado['exatas']),
+            'estimador_n': estimador['n'],
+            'marcadores': len(estimador['alturas'])
+        })
+        exatas.extend(estado['exatas'] or ())
+        alturas.extend(estimador['alturas'])
+        posicoes.extend(estimador['posicoes'])
+
+    secoes = [('estatisticas.exatas', exatas, len(exatas)),
+              ('estatisticas.alturas', alturas, len(alturas)),
+              ('estatisticas.posicoes', posicoes, len(posicoes))]
+    return {'quantis': list(acumulador.quantis), 'grupos': registros}, secoes
+
+
+def _restaurar_estatisticas(dados: Dict, secao) -> AcumuladorAtendimentos:
+    quantis = tuple(dados['quantis'])
+    acumulador = AcumuladorAtendimentos(quantis)
+    exatas = secao('estatisticas.exatas').tolist()
+    alturas = secao('estatisticas.alturas').tolist()
+    posicoes = secao('estatisticas.posicoes').tolist()
+
+    # Cada estimador tem sempre o mesmo número de posições de marcadores
+    quantidade_posicoes = len(EstatisticasEspera(quantis).estado()['estimador']['posicoes'])
+    inicio_exatas = inicio_alturas = inicio_posicoes = 0
+    for registro in dados['grupos']:
+        if registro['exatas'] is None:
+            amostras_exatas = None
+        else:
+            amostras_exatas = exatas[inicio_exatas:inicio_exatas + registro['exatas']]
+            inicio_exatas += registro['exatas']
+        estimador = {'n': registro['estimador_n'],
+                     'alturas': alturas[inicio_alturas:inicio_alturas + registro['marcadores']],
+                     'posicoes': posicoes[inicio_posicoes:inicio_posicoes + quantidade_posicoes]}
+        inicio_alturas += registro['marcadores']
+        inicio_posicoes += quantidade_posicoes
+
+        grupo = EstatisticasEspera(quantis)
+        grupo.restaurar_estado({'quantidade': registro['quantidade'], 'amostras': registro['amostras'],
+                                'soma': registro['soma'], 'minimo': registro['minimo'],
+                                'maximo': registro['maximo'], 'exatas': amostras_exatas,
+                                'estimador': estimador})
+
+        if registro['grupo'] == 'geral':
+            acumulador.geral = grupo
+        elif registro['grupo'] == 'gravidade':
+            acumulador.por_gravidade[registro['chave']] = grupo
+        else:
+            acumulador.por_especialidade[Especialidade[registro['chave']]] = grupo
+    return acumulador
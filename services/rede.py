@@ -0,0 +1,716 @@
+"""Simulação de uma rede de hospitais com desvio de chegadas e transferência de pacientes
+
+Cada unidade é um Hospital com relógio simulado, equipe e fluxo de chegadas
+próprios. As unidades são repartidas entre processos, e um coordenador avança
+todos juntos em épocas de duração fixa:
+
+1. no início da época, o coordenador envia a cada processo a carga das suas
+   unidades e das vizinhas delas (pacientes em espera e médicos ocupados por
+   especialidade), as transferências a executar e os pacientes que chegam a
+   cada unidade vindos de outras;
+2. cada processo avança suas unidades até o fim da época. Cada chegada local é
+   encaminhada à unidade escolhida pela política de desvio, com base na carga
+   do início da época;
+3. o coordenador recolhe a nova carga e os pacientes encaminhados, e a
+   política decide as transferências da próxima época.
+
+A época nunca é mais longa que o menor deslocamento entre duas unidades.
+Assim, um paciente enviado durante uma época só chega ao destino numa época
+seguinte, e cada processo avança suas unidades sem depender dos demais. O
+resultado não depende do número de processos: cada unidade decide a partir da
+mesma carga do início da época, qualquer que seja o processo que a simula.
+"""
+import copy
+import heapq
+import json
+import os
+import random
+import sys
+from math import hypot, inf, isqrt
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from models.especialidade import Especialidade
+from models.hospital import Hospital
+from models.paciente import Paciente
+from services.chegadas import FluxoChegadas, paciente_de_registro, registro_de_paciente
+from services.replicacoes import INICIO_SIMULADO
+from utils.geradores import PESOS_GRAVIDADE_PADRAO, TAMANHO_BLOCO, fluxo_chegadas, gerar_medicos_aleatorios
+from utils.relogio import RelogioSimulado
+from utils.saida import silenciar
+
+ESPECIALIDADES = tuple(Especialidade)
+_INDICE = {especialidade: i for i, especialidade in enumerate(ESPECIALIDADES)}
+INTERVALO_SINCRONIZACAO = 15  # minutos entre trocas de carga e de pacientes
+VELOCIDADE_KMH = 40  # velocidade média de deslocamento entre unidades
+ESPACO_IDS = 10 ** 9  # IDs de pacientes de cada unidade começam em indice * ESPACO_IDS
+MAXIMO_VIZINHOS = 50  # unidades mais próximas consideradas como destino de um desvio
+
+# Origem de um paciente que chega de outra unidade
+DESVIO = 'desvio'  # chegada encaminhada sem ser admitida na origem
+TRANSFERENCIA = 'transferencia'  # paciente retirado da fila de espera da origem
+
+# Transferência decidida pela política: (origem, destino, especialidade, quantidade)
+Transferencia = Tuple[int, int, Especialidade, int]
+# Paciente a caminho de outra unidade: (destino, hora de admissão, registro, origem do envio)
+Encaminhamento = Tuple[int, float, Dict, str]
+
+
+class Unidade:
+    """Configuração de um hospital da rede: localização, equipe e demanda própria"""
+
+    def __init__(self, nome: str, posicao: Tuple[float, float],
+                 medicos_por_especialidade: Dict[Especialidade, int], chegadas_por_hora: float,
+                 faixa_tempo_atendimento: Sequence[int] = (15, 45),
+                 pesos_gravidade: Sequence[float] = PESOS_GRAVIDADE_PADRAO,
+                 mix_especialidades: Optional[Dict[Optional[Especialidade], float]] = None):
+        """
+        Args:
+            nome: Nome do hospital
+            posicao: Coordenadas (x, y) em quilômetros
+            medicos_por_especialidade: Quantidade de médicos de cada especialidade
+            chegadas_por_hora: Taxa média de chegadas que procuram esta unidade
+            faixa_tempo_atendimento: Tempo médio de atendimento mínimo e máximo dos médicos (minutos)
+            pesos_gravidade: Pesos relativos das gravidades 1 a 5
+            mix_especialidades: Pesos por especialidade dos pacientes (ver utils.geradores)
+        """
+        self.nome = nome
+        self.posicao = tuple(posicao)
+        self.medicos_por_especialidade = dict(medicos_por_especialidade)
+        self.chegadas_por_hora = chegadas_por_hora
+        self.faixa_tempo_atendimento = tuple(faixa_tempo_atendimento)
+        self.pesos_gravidade = tuple(pesos_gravidade)
+        self.mix_especialidades = mix_especialidades
+
+
+class CargaRede:
+    """Carga das unidades no início de uma época, consultada pela política de desvio
+
+    A espera estimada de um novo paciente numa especialidade é o número de
+    pacientes à sua frente que não encontram médico livre, vezes o tempo médio
+    de atendimento dividido pelo número de médicos; a prioridade por
+    gravidade é ignorada. Os encaminhamentos decididos durante a época entram
+    como acréscimos, para que uma mesma unidade não receba todos os desvios.
+
+    As unidades mais próximas de cada uma são calculadas na criação. A cópia
+    enviada a um processo (parcial()) só tem os vizinhos das unidades dele, e
+    a cada época só recebe a carga dessas unidades e das vizinhas: a política
+    de desvio não deve consultar outras unidades.
+    """
+
+    def __init__(self, posicoes: Sequence[Tuple[float, float]], medicos: Sequence[Sequence[int]],
+                 tempos: Sequence[Sequence[float]], velocidade_kmh: float = VELOCIDADE_KMH):
+        """
+        Args:
+            posicoes: Coordenadas (x, y) de cada unidade, em quilômetros
+            medicos: Médicos de cada unidade, por especialidade (na ordem de ESPECIALIDADES)
+            tempos: Tempo médio de atendimento (minutos) de cada unidade, por especialidade
+            velocidade_kmh: Velocidade média de deslocamento entre unidades
+        """
+        self.posicoes = list(posicoes)
+        self.medicos = [list(m) for m in medicos]
+        self.tempos = [list(t) for t in tempos]
+        self.velocidade_kmh = velocidade_kmh
+        self.em_espera = [[0] * len(ESPECIALIDADES) for _ in self.posicoes]
+        self.ocupados = [[0] * len(ESPECIALIDADES) for _ in self.posicoes]
+        self._acrescimos: Dict[Tuple[int, int], int] = {}
+        self._vizinhos: Dict[int, List[Tuple[float, int]]] = {}  # origem: (deslocamento, unidade)
+        self._calcular_vizinhos()
+
+    def __len__(self) -> int:
+        return len(self.posicoes)
+
+    def atualizar(self, unidade: int, em_espera: List[int], ocupados: List[int]) -> None:
+        """Substitui a carga observada de uma unidade"""
+        self.em_espera[unidade] = em_espera
+        self.ocupados[unidade] = ocupados
+
+    def parcial(self, unidades: Iterable[int]) -> 'CargaRede':
+        """Cópia para um processo, com os vizinhos apenas das unidades informadas"""
+        parcial = copy.copy(self)
+        parcial.em_espera = list(self.em_espera)
+        parcial.ocupados = list(self.ocupados)
+        parcial._acrescimos = {}
+        parcial._vizinhos = {origem: self._vizinhos[origem] for origem in unidades}
+        return parcial
+
+    def linhas_consultadas(self, unidades: Iterable[int]) -> List[int]:
+        """Unidades cuja carga é consultada ao decidir os desvios das unidades informadas"""
+        linhas = set()
+        for origem in unidades:
+            linhas.add(origem)
+            linhas.update(unidade for _, unidade in self._vizinhos[origem])
+        return sorted(linhas)
+
+    def estado(self, linhas: Iterable[int]) -> Dict[int, Tuple[List[int], List[int]]]:
+        """Parte variável da carga das unidades informadas, enviada aos processos a cada época"""
+        return {i: (self.em_espera[i], self.ocupados[i]) for i in linhas}
+
+    def restaurar_estado(self, estado: Dict[int, Tuple[List[int], List[int]]]) -> None:
+        for i, (em_espera, ocupados) in estado.items():
+            self.em_espera[i] = em_espera
+            self.ocupados[i] = ocupados
+        self._acrescimos.clear()
+
+    def deslocamento(self, origem: int, destino: int) -> float:
+        """Tempo de deslocamento entre duas unidades, em segundos"""
+        (x1, y1), (x2, y2) = self.posicoes[origem], self.posicoes[destino]
+        return hypot(x2 - x1, y2 - y1) / self.velocidade_kmh * 3600
+
+    def menor_deslocamento(self) -> float:
+        """Menor deslocamento entre duas unidades distintas (inf se houver só uma)"""
+        return min((vizinhos[0][0] for vizinhos in self._vizinhos.values() if vizinhos), default=inf)
+
+    def vizinhos(self, origem: int) -> List[Tuple[float, int]]:
+        """As MAXIMO_VIZINHOS unidades mais próximas da origem, com o deslocamento até
+        cada uma, da mais próxima à mais distante"""
+        return self._vizinhos[origem]
+
+    def _calcular_vizinhos(self) -> None:
+        """Encontra as unidades mais próximas de cada uma sem comparar todos os pares
+
+        As unidades são distribuídas numa grade com cerca de MAXIMO_VIZINHOS
+        unidades por célula. Cada origem examina anéis de células cada vez
+        maiores ao redor da sua, até que as células ainda não examinadas, todas
+        a mais de `raio` células de distância, não possam ter unidade mais
+        próxima que a última das encontradas.
+        """
+        total = len(self.posicoes)
+        quantidade = min(MAXIMO_VIZINHOS, total - 1)
+        if quantidade <= 0:
+            self._vizinhos = {origem: [] for origem in range(total)}
+            return
+        x0 = min(x for x, _ in self.posicoes)
+        y0 = min(y for _, y in self.posicoes)
+        extensao = max(max(x for x, _ in self.posicoes) - x0, max(y for _, y in self.posicoes) - y0)
+        celulas = max(1, isqrt(total // quantidade))  # células por lado
+        lado = extensao / celulas or 1.0  # km
+
+        grade: Dict[Tuple[int, int], List[int]] = {}
+        posicoes_grade = []
+        for unidade, (x, y) in enumerate(self.posicoes):
+            celula = (min(int((x - x0) / lado), celulas - 1), min(int((y - y0) / lado), celulas - 1))
+            grade.setdefault(celula, []).append(unidade)
+            posicoes_grade.append(celula)
+
+        for origem, (cx, cy) in enumerate(posicoes_grade):
+            candidatos = []
+            raio = 0
+            while True:
+                if raio == 0:
+                    anel = [(cx, cy)]
+                else:
+                    anel = [(cx + dx, cy + dy) for dx in range(-raio, raio + 1) for dy in (-raio, raio)]
+                    anel += [(cx + dx, cy + dy) for dx in (-raio, raio) for dy in range(-raio + 1, raio)]
+                for celula in anel:
+                    candidatos.extend((self.deslocamento(origem, destino), destino)
+                                      for destino in grade.get(celula, ()) if destino != origem)
+                if raio >= celulas:
+                    break  # toda a grade examinada
+                # Unidades fora dos anéis examinados ficam a pelo menos raio * lado km
+                if len(candidatos) >= quantidade and (
+                        heapq.nsmallest(quantidade, candidatos)[-1][0] < raio * lado / self.velocidade_kmh * 3600):
+                    break
+                raio += 1
+            self._vizinhos[origem] = heapq.nsmallest(quantidade, candidatos)
+
+    def espera_estimada(self, unidade: int, especialidade: Especialidade) -> float:
+        """Espera estimada de um novo paciente, em segundos (inf se não houver médico)"""
+        i = _INDICE[especialidade]
+        medicos = self.medicos[unidade][i]
+        if not medicos:
+            return inf
+        na_frente = self.em_espera[unidade][i] + self._acrescimos.get((unidade, i), 0)
+        livres = medicos - self.ocupados[unidade][i]
+        return max(0, na_frente + 1 - livres) * self.passo(unidade, especialidade)
+
+    def passo(self, unidade: int, especialidade: Especialidade) -> float:
+        """Aumento da espera estimada a cada paciente a mais na fila, em segundos"""
+        i = _INDICE[especialidade]
+        medicos = self.medicos[unidade][i]
+        return self.tempos[unidade][i] * 60 / medicos if medicos else inf
+
+    def registrar_entrada(self, unidade: int, especialidade: Especialidade, quantidade: int = 1) -> None:
+        """Conta pacientes encaminhados (ou retirados, com quantidade negativa) durante a época"""
+        chave = (unidade, _INDICE[especialidade])
+        self._acrescimos[chave] = self._acrescimos.get(chave, 0) + quantidade
+
+    def limpar_acrescimos(self) -> None:
+        """Descarta os encaminhamentos contados desde o início da época"""
+        self._acrescimos.clear()
+
+    def especialidade_provavel(self, unidade: int, paciente: Paciente) -> Especialidade:
+        """Especialidade em que o paciente seria admitido na unidade, como em
+        Hospital._determinar_especialidade"""
+        if paciente.especialidade:
+            return paciente.especialidade
+        if paciente.gravidade == 1:
+            return Especialidade.URGENCIA
+        if paciente.gravidade == 2:
+            return min((Especialidade.CARDIOLOGIA, Especialidade.NEUROLOGIA),
+                       key=lambda especialidade: self.em_espera[unidade][_INDICE[especialidade]])
+        return Especialidade.CLINICO_GERAL
+
+
+class PoliticaDesvio:
+    """Política de desvio da rede; esta base mantém cada paciente na unidade procurada"""
+
+    def destino(self, origem: int, paciente: Optional[Paciente], especialidade: Especialidade,
+                carga: CargaRede) -> int:
+        """Escolhe a unidade que recebe um paciente que chegou à origem
+        Args:
+            origem: Unidade procurada pelo paciente
+            paciente: Paciente que chegou (None ao avaliar uma transferência)
+            especialidade: Especialidade em que o paciente seria atendido
+            carga: Carga da rede no início da época
+        Returns:
+            int: Índice da unidade de destino (a própria origem para não desviar)
+        """
+        return origem
+
+    def transferencias(self, carga: CargaRede) -> List[Transferencia]:
+        """Decide as transferências de pacientes em espera a executar no início da época"""
+        return []
+
+    def pode_transferir(self, paciente: Paciente) -> bool:
+        """Indica se um paciente em espera pode ser transferido para outra unidade"""
+        return False
+
+
+class DesvioPorCarga(PoliticaDesvio):
+    """Desvia pacientes quando a espera estimada na origem passa de um limite
+
+    O destino é a unidade com menor deslocamento somado à espera estimada lá.
+    O desvio só acontece se esse total for menor que a espera na origem por pelo
+    menos `margem`. A mesma regra vale para transferir os pacientes menos graves
+    que aguardam nas filas sobrecarregadas. A cada época são transferidos, no
+    máximo, tantos pacientes quantos equilibram as duas esperas estimadas.
+    """
+
+    def __init__(self, limite_espera: float = 60, margem: float = 15,
+                 gravidade_minima_transferencia: int = 3, maximo_transferencias: int = 10):
+        """
+        Args:
+            limite_espera: Espera estimada na origem (minutos) a partir da qual se procura outra unidade
+            margem: Ganho mínimo de tempo (minutos) que justifica o deslocamento
+            gravidade_minima_transferencia: Só pacientes com gravidade a partir desta
+                (menos graves) são transferidos depois de admitidos
+            maximo_transferencias: Pacientes transferidos por fila e por época, no máximo
+        """
+        self.limite_espera = limite_espera * 60
+        self.margem = margem * 60
+        self.gravidade_minima_transferencia = gravidade_minima_transferencia
+        self.maximo_transferencias = maximo_transferencias
+
+    def destino(self, origem: int, paciente: Optional[Paciente], especialidade: Especialidade,
+                carga: CargaRede) -> int:
+        espera = carga.espera_estimada(origem, especialidade)
+        if espera <= self.limite_espera:
+            return origem
+        melhor, menor_custo = origem, espera - self.margem
+        for deslocamento, unidade in carga.vizinhos(origem):
+            if deslocamento >= menor_custo:
+                break  # vizinhos em ordem de distância: os demais são ainda mais distantes
+            custo = deslocamento + carga.espera_estimada(unidade, especialidade)
+            if custo < menor_custo:
+                melhor, menor_custo = unidade, custo
+        return melhor
+
+    def transferencias(self, carga: CargaRede) -> List[Transferencia]:
+        ordens = []
+        for origem in range(len(carga)):
+            for especialidade in ESPECIALIDADES:
+                if not carga.em_espera[origem][_INDICE[especialidade]]:
+                    continue
+                destino = self.destino(origem, None, especialidade, carga)
+                if destino == origem:
+                    continue
+                # Cada paciente transferido reduz a espera na origem e aumenta a do destino
+                ganho = (carga.espera_estimada(origem, especialidade) - self.margem
+                         - carga.deslocamento(origem, destino) - carga.espera_estimada(destino, especialidade))
+                quantidade = min(int(ganho // (carga.passo(origem, especialidade) + carga.passo(destino, especialidade))),
+                                 self.maximo_transferencias, carga.em_espera[origem][_INDICE[especialidade]])
+                if quantidade > 0:
+                    ordens.append((origem, destino, especialidade, quantidade))
+                    carga.registrar_entrada(origem, especialidade, -quantidade)
+                    carga.registrar_entrada(destino, especialidade, quantidade)
+        return ordens
+
+    def pode_transferir(self, paciente: Paciente) -> bool:
+        return paciente.gravidade >= self.gravidade_minima_transferencia
+
+
+class _Particao:
+    """Unidades simuladas por um processo (ou pelo próprio coordenador, sem processos)"""
+
+    def __init__(self, unidades: Dict[int, Unidade], sementes: Dict[int, Tuple[int, int]],
+                 tempo_total: int, politica: PoliticaDesvio):
+        self.politica = politica
+        self.carga: Optional[CargaRede] = None
+        self.hospitais: Dict[int, Hospital] = {}
+        self.chegadas: Dict[int, FluxoChegadas] = {}
+        self.contadores: Dict[int, Dict[str, int]] = {}
+        for indice, unidade in unidades.items():
+            semente_medicos, semente_chegadas = sementes[indice]
+            relogio = RelogioSimulado(INICIO_SIMULADO)
+            hospital = Hospital(unidade.nome, relogio)
+            especialidades = [especialidade
+                              for especialidade, quantidade in unidade.medicos_por_especialidade.items()
+                              for _ in range(quantidade)]
+            for medico in gerar_medicos_aleatorios(len(especialidades), relogio, semente_medicos,
+                                                   especialidades, unidade.faixa_tempo_atendimento):
+                hospital.adicionar_medico(medico)
+            self.hospitais[indice] = hospital
+            self.chegadas[indice] = FluxoChegadas(fluxo_chegadas(
+                unidade.chegadas_por_hora, semente_chegadas, unidade.pesos_gravidade,
+                unidade.mix_especialidades, inicio=INICIO_SIMULADO, duracao_turno=tempo_total,
+                id_inicial=indice * ESPACO_IDS + 1,
+                tamanho_bloco=min(TAMANHO_BLOCO, int(unidade.chegadas_por_hora * tempo_total / 60) + 1)))
+            self.contadores[indice] = dict.fromkeys(
+                ('chegadas', 'desvios_enviados', 'desvios_recebidos',
+                 'transferencias_enviadas', 'transferencias_recebidas'), 0)
+
+    def equipes(self) -> Dict[int, Tuple[List[int], List[float]]]:
+        """Médicos e tempo médio de atendimento (minutos) de cada unidade, por especialidade"""
+        equipes = {}
+        for indice, hospital in self.hospitais.items():
+            medicos = [0] * len(ESPECIALIDADES)
+            tempos = [0.0] * len(ESPECIALIDADES)
+            for medico in hospital.medicos:
+                i = _INDICE[medico.especialidade]
+                medicos[i] += 1
+                tempos[i] += medico.tempo_medio_atendimento
+            equipes[indice] = (medicos, [t / m if m else 0.0 for t, m in zip(tempos, medicos)])
+        return equipes
+
+    def configurar(self, carga: CargaRede) -> None:
+        """Recebe a carga parcial (CargaRede.parcial) com os vizinhos das unidades da partição"""
+        self.carga = carga
+
+    def epoca(self, inicio: float, fim: float, estado: Dict[int, Tuple[List[int], List[int]]],
+              admissoes: Dict[int, List[Tuple[float, Dict, str]]],
+              retiradas: Dict[int, List[Tuple[int, Especialidade, int]]]) -> Tuple[Dict, List[Encaminhamento]]:
+        """Avança as unidades da partição de `inicio` até `fim`
+        Returns:
+            Tuple: ({unidade: (em espera, ocupados) por especialidade}, pacientes encaminhados)
+        """
+        self.carga.restaurar_estado(estado)
+        cargas = {}
+        encaminhados: List[Encaminhamento] = []
+        for indice in self.hospitais:
+            self.carga.limpar_acrescimos()
+            self._avancar_unidade(indice, inicio, fim, admissoes.get(indice, ()),
+                                  retiradas.get(indice, ()), encaminhados)
+            cargas[indice] = self._carga_unidade(indice)
+        return cargas, encaminhados
+
+    def _avancar_unidade(self, indice: int, inicio: float, fim: float, admissoes, retiradas,
+                         encaminhados: List[Encaminhamento]) -> None:
+        hospital = self.hospitais[indice]
+        contadores = self.contadores[indice]
+        carga = self.carga
+
+        # Transferências decididas pela rede: os pacientes menos prioritários da fila
+        for destino, especialidade, quantidade in retiradas:
+            for paciente in hospital.filas_espera[especialidade].ultimos(quantidade):
+                if self.politica.pode_transferir(paciente):
+                    hospital.remover_paciente(paciente.id)
+                    encaminhados.append((destino, inicio + carga.deslocamento(indice, destino),
+                                         registro_de_paciente(paciente), TRANSFERENCIA))
+                    contadores['transferencias_enviadas'] += 1
+
+        # Pacientes vindos de outras unidades e chegadas locais, em ordem de admissão
+        entradas: List[Tuple[float, Paciente]] = []
+        for hora, registro, origem in admissoes:
+            entradas.append((max(hora, inicio), paciente_de_registro(registro)))
+            contadores['desvios_recebidos' if origem == DESVIO else 'transferencias_recebidas'] += 1
+        for paciente in self.chegadas[indice].ate(fim):
+            contadores['chegadas'] += 1
+            especialidade = carga.especialidade_provavel(indice, paciente)
+            destino = self.politica.destino(indice, paciente, especialidade, carga)
+            carga.registrar_entrada(destino, especialidade)
+            if destino == indice:
+                entradas.append((paciente.hora_chegada, paciente))
+            else:
+                encaminhados.append((destino, paciente.hora_chegada + carga.deslocamento(indice, destino),
+                                     registro_de_paciente(paciente), DESVIO))
+                contadores['desvios_enviados'] += 1
+
+        entradas.sort(key=lambda entrada: entrada[0])
+        for hora, paciente in entradas:
+            hospital.avancar_ate(hora)
+            hospital.admitir_paciente(paciente)
+        hospital.avancar_ate(fim)
+
+    def _carga_unidade(self, indice: int) -> Tuple[List[int], List[int]]:
+        hospital = self.hospitais[indice]
+        em_espera = [len(hospital.filas_espera[especialidade]) for especialidade in ESPECIALIDADES]
+        ocupados = [0] * len(ESPECIALIDADES)
+        for medico in hospital.medicos:
+            if medico.ocupado:
+                ocupados[_INDICE[medico.especialidade]] += 1
+        return em_espera, ocupados
+
+    def relatorios(self) -> Dict[int, Dict]:
+        """Relatório de cada unidade: o do Hospital, os fluxos da rede e a espera por gravidade"""
+        relatorios = {}
+        for indice, hospital in self.hospitais.items():
+            estatisticas = hospital.estatisticas
+            relatorio = dict(self.contadores[indice])
+            relatorio['pacientes_em_espera'] = sum(len(fila) for fila in hospital.filas_espera.values())
+            relatorio['pacientes_em_atendimento'] = sum(1 for medico in hospital.medicos if medico.ocupado)
+            relatorio['tempo_espera'] = {'soma': estatisticas.geral.soma,
+                                         'quantidade': estatisticas.geral.quantidade,
+                                         **estatisticas.geral.quantis()}
+            relatorio['por_gravidade'] = {
+                gravidade: {'soma': grupo.soma, 'quantidade': grupo.quantidade, **grupo.quantis()}
+                for gravidade, grupo in sorted(estatisticas.por_gravidade.items())}
+            relatorio['hospital'] = hospital.gerar_relatorio()
+            relatorios[indice] = relatorio
+        return relatorios
+
+
+def _executar_particao(conexao: Connection, *argumentos) -> None:
+    """Laço de um processo: executa os métodos de _Particao pedidos pelo coordenador"""
+    with silenciar():
+        try:
+            particao = _Particao(*argumentos)
+        except Exception as erro:
+            conexao.send(erro)
+            return
+        conexao.send(None)
+        while True:
+            metodo, args = conexao.recv()
+            if metodo is None:
+                break
+            try:
+                conexao.send(getattr(particao, metodo)(*args))
+            except Exception as erro:
+                conexao.send(erro)
+    conexao.close()
+
+
+class RedeHospitalar:
+    """Simula várias unidades em conjunto, com desvio de chegadas e transferências"""
+
+    def __init__(self, unidades: Sequence[Unidade], politica: Optional[PoliticaDesvio] = None,
+                 tempo_total: int = 480, semente: int = 0, processos: Optional[int] = None,
+                 intervalo_sincronizacao: float = INTERVALO_SINCRONIZACAO,
+                 velocidade_kmh: float = VELOCIDADE_KMH):
+        """
+        Args:
+            unidades: Hospitais da rede
+            politica: Política de desvio e transferência (padrão: DesvioPorCarga())
+            tempo_total: Duração do turno em minutos
+            semente: Semente mestre; cada unidade recebe sementes próprias derivadas dela
+            processos: Processos que dividem as unidades (None: um por núcleo; 1: no processo atual)
+            intervalo_sincronizacao: Minutos entre trocas de carga e de pacientes
+                (reduzido ao menor deslocamento entre unidades)
+            velocidade_kmh: Velocidade média de deslocamento entre unidades
+        """
+        if not unidades:
+            raise ValueError("A rede precisa de pelo menos uma unidade")
+        self.unidades = list(unidades)
+        self.politica = politica if politica is not None else DesvioPorCarga()
+        self.tempo_total = tempo_total
+        self.semente = semente
+        self.processos = min(processos or os.cpu_count() or 1, len(self.unidades))
+        self.intervalo_sincronizacao = intervalo_sincronizacao
+        self.velocidade_kmh = velocidade_kmh
+
+    def executar(self) -> Dict:
+        """Executa o turno e retorna os relatórios das unidades e da rede
+        Returns:
+            Dict: {'unidades': [relatório por unidade], 'rede': totais da rede,
+                'epocas', 'duracao_epoca' (segundos), 'processos', 'tempo_execucao' (segundos)}
+        """
+        inicio_execucao = perf_counter()
+        gerador = random.Random(self.semente)
+        sementes = {indice: (gerador.getrandbits(64), gerador.getrandbits(64))
+                    for indice in range(len(self.unidades))}
+        # Faixas contíguas do mapa: os vizinhos de cada unidade ficam quase todos no
+        # mesmo processo, que recebe a cada época só a carga da faixa e das bordas
+        ordem = sorted(range(len(self.unidades)),
+                       key=lambda indice: (self.unidades[indice].posicao[1], self.unidades[indice].posicao[0]))
+        grupos = [{indice: self.unidades[indice]
+                   for indice in sorted(ordem[p * len(ordem) // self.processos:(p + 1) * len(ordem) // self.processos])}
+                  for p in range(self.processos)]
+
+        if self.processos == 1:
+            particoes = [_Particao(grupos[0], sementes, self.tempo_total, self.politica)]
+
+            def chamar(metodo: str, argumentos: List[tuple]) -> list:
+                with silenciar():
+                    return [getattr(particao, metodo)(*args) for particao, args in zip(particoes, argumentos)]
+
+            encerrar = None
+        else:
+            conexoes, processos = [], []
+            for grupo in grupos:
+                conexao, conexao_filho = Pipe()
+                processo = Process(target=_executar_particao, daemon=True,
+                                   args=(conexao_filho, grupo, sementes, self.tempo_total, self.politica))
+                processo.start()
+                conexao_filho.close()
+                conexoes.append(conexao)
+                processos.append(processo)
+
+            def receber(conexao: Connection):
+                resposta = conexao.recv()
+                if isinstance(resposta, Exception):
+                    raise resposta
+                return resposta
+
+            def chamar(metodo: str, argumentos: List[tuple]) -> list:
+                for conexao, args in zip(conexoes, argumentos):
+                    conexao.send((metodo, args))
+                return [receber(conexao) for conexao in conexoes]
+
+            def encerrar() -> None:
+                for conexao in conexoes:
+                    conexao.send((None, None))
+                    conexao.close()
+                for processo in processos:
+                    processo.join()
+
+        try:
+            if encerrar is not None:
+                for conexao in conexoes:
+                    receber(conexao)  # confirmação da criação das unidades
+            return self._simular(chamar, grupos, inicio_execucao)
+        finally:
+            if encerrar is not None:
+                encerrar()
+
+    def _simular(self, chamar, grupos: List[Dict[int, Unidade]], inicio_execucao: float) -> Dict:
+        todos = [()] * len(grupos)
+        equipes = {}
+        for resposta in chamar('equipes', todos):
+            equipes.update(resposta)
+        carga = CargaRede([unidade.posicao for unidade in self.unidades],
+                          [equipes[i][0] for i in range(len(self.unidades))],
+                          [equipes[i][1] for i in range(len(self.unidades))], self.velocidade_kmh)
+        chamar('configurar', [(carga.parcial(grupo),) for grupo in grupos])
+        linhas = [carga.linhas_consultadas(grupo) for grupo in grupos]
+        duracao_epoca = min(self.intervalo_sincronizacao * 60, carga.menor_deslocamento())
+        if duracao_epoca <= 0:
+            duracao_epoca = self.intervalo_sincronizacao * 60  # unidades no mesmo lugar: admissão no início da época
+
+        # Pacientes a caminho de cada unidade: heap de (hora de admissão, sequência, registro, origem do envio)
+        a_caminho: List[list] = [[] for _ in self.unidades]
+        sequencia = 0
+        epocas = 0
+        fim_turno = INICIO_SIMULADO + self.tempo_total * 60
+        agora = INICIO_SIMULADO
+        while agora < fim_turno:
+            fim = min(agora + duracao_epoca, fim_turno)
+            carga.limpar_acrescimos()
+            retiradas: Dict[int, List[Tuple[int, Especialidade, int]]] = {}
+            for origem, destino, especialidade, quantidade in self.politica.transferencias(carga):
+                retiradas.setdefault(origem, []).append((destino, especialidade, quantidade))
+            admissoes: Dict[int, List[Tuple[float, Dict, str]]] = {}
+            for destino, pendentes in enumerate(a_caminho):
+                while pendentes and pendentes[0][0] <= fim:
+                    hora, _, registro, origem = heapq.heappop(pendentes)
+                    admissoes.setdefault(destino, []).append((hora, registro, origem))
+
+            respostas = chamar('epoca', [
+                (agora, fim, carga.estado(linhas_grupo), {i: admissoes[i] for i in grupo if i in admissoes},
+                 {i: retiradas[i] for i in grupo if i in retiradas})
+                for grupo, linhas_grupo in zip(grupos, linhas)])
+            for cargas, encaminhados in respostas:
+                for indice, (em_espera, ocupados) in cargas.items():
+                    carga.atualizar(indice, em_espera, ocupados)
+                for destino, hora, registro, origem in encaminhados:
+                    heapq.heappush(a_caminho[destino], (hora, sequencia, registro, origem))
+                    sequencia += 1
+            agora = fim
+            epocas += 1
+
+        relatorios = {}
+        for resposta in chamar('relatorios', [()] * len(grupos)):
+            relatorios.update(resposta)
+        em_transito = sum(len(pendentes) for pendentes in a_caminho)
+        return self._relatorio(relatorios, em_transito, epocas, duracao_epoca, perf_counter() - inicio_execucao)
+
+    def _relatorio(self, relatorios: Dict[int, Dict], em_transito: int, epocas: int,
+                   duracao_epoca: float, tempo_execucao: float) -> Dict:
+        unidades = []
+        rede = dict.fromkeys(('chegadas', 'desvios_enviados', 'transferencias_enviadas',
+                              'pacientes_atendidos', 'pacientes_em_atendimento', 'pacientes_em_espera'), 0)
+        soma_espera = 0.0
+        gravidades: Dict[int, List[float]] = {}  # gravidade: [soma, quantidade]
+        pior_p90 = 0
+        for indice, unidade in enumerate(self.unidades):
+            relatorio = relatorios[indice]
+            tempo_espera = relatorio.pop('tempo_espera')
+            por_gravidade = relatorio.pop('por_gravidade')
+            for chave in ('chegadas', 'desvios_enviados', 'transferencias_enviadas',
+                          'pacientes_em_atendimento', 'pacientes_em_espera'):
+                rede[chave] += relatorio[chave]
+            rede['pacientes_atendidos'] += tempo_espera['quantidade']
+            soma_espera += tempo_espera['soma']
+            for gravidade, grupo in por_gravidade.items():
+                acumulado = gravidades.setdefault(gravidade, [0.0, 0])
+                acumulado[0] += grupo['soma']
+                acumulado[1] += grupo['quantidade']
+            pior_p90 = max(pior_p90, tempo_espera['p90'])
+            unidades.append({
+                'nome': unidade.nome,
+                'posicao': list(unidade.posicao),
+                **relatorio,
+                'tempo_medio_espera': tempo_espera['soma'] / tempo_espera['quantidade'] if tempo_espera['quantidade'] else 0,
+                'tempos_espera': {rotulo: valor for rotulo, valor in tempo_espera.items() if rotulo.startswith('p')},
+                'por_gravidade': {gravidade: {'quantidade': grupo['quantidade'],
+                                              'tempo_medio_espera': grupo['soma'] / grupo['quantidade'] if grupo['quantidade'] else 0,
+                                              'tempo_espera_p90': grupo['p90']}
+                                  for gravidade, grupo in por_gravidade.items()},
+            })
+
+        rede['pacientes_em_transito'] = em_transito
+        rede['tempo_medio_espera'] = soma_espera / rede['pacientes_atendidos'] if rede['pacientes_atendidos'] else 0
+        # Os quantis de cada unidade não se combinam exatamente: a rede informa a pior unidade
+        rede['tempo_espera_p90_pior_unidade'] = pior_p90
+        rede['por_gravidade'] = {gravidade: {'quantidade': quantidade,
+                                             'tempo_medio_espera': soma / quantidade if quantidade else 0}
+                                 for gravidade, (soma, quantidade) in sorted(gravidades.items())}
+        return {
+            'unidades': unidades,
+            'rede': rede,
+            'epocas': epocas,
+            'duracao_epoca': duracao_epoca,
+            'processos': self.processos,
+            'tempo_execucao': tempo_execucao
+        }
+
+
+def rede_em_grade(lado: int, espacamento_km: float, medicos_por_especialidade: Dict[Especialidade, int],
+                  chegadas_por_hora: float, variacao: float = 0.5, semente: int = 0) -> List[Unidade]:
+    """Monta lado x lado unidades em grade, com demanda variando entre elas
+    Args:
+        lado: Unidades em cada lado da grade
+        espacamento_km: Distância entre unidades vizinhas
+        medicos_por_especialidade: Equipe de cada unidade
+        chegadas_por_hora: Taxa média de chegadas por unidade
+        variacao: Variação relativa máxima da taxa entre unidades (0.5: de 50% a 150% da média)
+        semente: Semente do sorteio das taxas
+    """
+    rng = random.Random(semente)
+    return [Unidade(f'Hospital {linha * lado + coluna + 1}', (coluna * espacamento_km, linha * espacamento_km),
+                    medicos_por_especialidade,
+                    chegadas_por_hora * rng.uniform(1 - variacao, 1 + variacao))
+            for linha in range(lado) for coluna in range(lado)]
+
+
+if __name__ == '__main__':
+    # Uso: python -m services.rede [lado da grade] [processos]
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    processos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    equipe = {Especialidade.URGENCIA: 2, Especialidade.CARDIOLOGIA: 1,
+              Especialidade.NEUROLOGIA: 1, Especialidade.CLINICO_GERAL: 3}
+    resultado = {}
+    for nome, politica in (('sem_desvio', PoliticaDesvio()), ('desvio_por_carga', DesvioPorCarga())):
+        execucao = RedeHospitalar(rede_em_grade(lado, 10, equipe, 12), politica, processos=processos).executar()
+        resultado[nome] = {**execucao['rede'], 'tempo_execucao': execucao['tempo_execucao']}
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
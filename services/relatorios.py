@@ -2,16 +2,45 @@ from typing import Dict, List
 from models.paciente import Paciente
 from models.medico import Medico
 from services.atendimento import SimuladorAtendimento
+from services.estatisticas import AcumuladorAtendimentos, EstatisticasEspera
+from utils.saida import mostrar, mostrar_ativo, obter_logger
 
+_saida = obter_logger(__name__)
 
-def gerar_relatorio(simulador: SimuladorAtendimento) -> Dict:
+
+def gerar_relatorio(simulador: SimuladorAtendimento, exibir: bool = True) -> Dict:
+    """Gera o relatório da simulação a partir das estatísticas acumuladas em fluxo,
+    sem percorrer a lista de pacientes atendidos (pode ser chamado durante a simulação)
+
+    Args:
+        simulador: Simulação de origem dos dados
+        exibir: Se False, apenas retorna o relatório, sem exibi-lo
+    """
+    relatorio = montar_relatorio(simulador.estatisticas, simulador.medicos, len(simulador.fila),
+                                 simulador.tempo_total)
+    if exibir:
+        exibir_relatorio(relatorio)
+    return relatorio
+
+
+def montar_relatorio(estatisticas: AcumuladorAtendimentos, medicos: List[Medico],
+                     pacientes_na_fila: int, tempo_total: float) -> Dict:
+    """Monta o relatório de gerar_relatorio a partir de estatísticas acumuladas
+    (de um SimuladorAtendimento ou de um Hospital)
+
+    Args:
+        estatisticas: Estatísticas dos atendimentos finalizados
+        medicos: Médicos cujo desempenho é informado
+        pacientes_na_fila: Pacientes ainda aguardando atendimento
+        tempo_total: Duração da simulação em minutos
+    """
+    total_atendidos = estatisticas.total
     relatorio = {
         'estatisticas_gerais': {
-            'tempo_total': simulador.tempo_total,
-            'pacientes_atendidos': len(simulador.pacientes_atendidos),
-            'pacientes_na_fila': len(simulador.fila),
-            'taxa_atendimento': len(
-                simulador.pacientes_atendidos) / simulador.tempo_total if simulador.tempo_total > 0 else 0
+            'tempo_total': tempo_total,
+            'pacientes_atendidos': total_atendidos,
+            'pacientes_na_fila': pacientes_na_fila,
+            'taxa_atendimento': total_atendidos / tempo_total if tempo_total > 0 else 0
         },
         'tempos_espera': {
             'medio': 0,
@@ -23,34 +52,25 @@ def gerar_relatorio(simulador: SimuladorAtendimento) -> Dict:
         'desempenho_medicos': []
     }
 
-    # Calcula tempos de espera
-    tempos_espera = [p.tempo_espera() for p in simulador.pacientes_atendidos if p.tempo_espera() is not None]
-    if tempos_espera:
-        relatorio['tempos_espera']['medio'] = sum(tempos_espera) / len(tempos_espera)
-        relatorio['tempos_espera']['maximo'] = max(tempos_espera)
-        relatorio['tempos_espera']['minimo'] = min(tempos_espera)
+    # Tempos de espera
+    geral = estatisticas.geral
+    if geral.amostras:
+        relatorio['tempos_espera']['medio'] = geral.media
+        relatorio['tempos_espera']['maximo'] = geral.maximo
+        relatorio['tempos_espera']['minimo'] = geral.minimo
+    relatorio['tempos_espera'].update(geral.quantis())
 
     # Agrupa por gravidade
     for gravidade in range(1, 6):
-        pacientes_grav = [p for p in simulador.pacientes_atendidos if p.gravidade == gravidade]
-        relatorio['por_gravidade'][gravidade] = {
-            'quantidade': len(pacientes_grav),
-            'tempo_medio_espera': sum(p.tempo_espera() for p in pacientes_grav if p.tempo_espera()) / len(
-                pacientes_grav) if pacientes_grav else 0
-        }
+        grupo = estatisticas.gravidade(gravidade)
+        relatorio['por_gravidade'][gravidade] = _resumo_grupo(grupo)
 
     # Agrupa por especialidade
-    especialidades = set(p.especialidade for p in simulador.pacientes_atendidos if p.especialidade)
-    for esp in especialidades:
-        pacientes_esp = [p for p in simulador.pacientes_atendidos if p.especialidade == esp]
-        relatorio['por_especialidade'][str(esp)] = {
-            'quantidade': len(pacientes_esp),
-            'tempo_medio_espera': sum(p.tempo_espera() for p in pacientes_esp if p.tempo_espera()) / len(
-                pacientes_esp) if pacientes_esp else 0
-        }
+    for esp, grupo in estatisticas.por_especialidade.items():
+        relatorio['por_especialidade'][str(esp)] = _resumo_grupo(grupo)
 
     # Desempenho dos médicos
-    for medico in simulador.medicos:
+    for medico in medicos:
         relatorio['desempenho_medicos'].append({
             'id': medico.id,
             'nome': medico.nome,
@@ -58,19 +78,36 @@ def gerar_relatorio(simulador: SimuladorAtendimento) -> Dict:
             'pacientes_atendidos': medico.total_pacientes_atendidos,
             'tempo_medio_atendimento': medico.tempo_total_atendimento / medico.total_pacientes_atendidos / 60 if medico.total_pacientes_atendidos > 0 else 0
         })
+    return relatorio
+
+
+def exibir_relatorio(relatorio: Dict) -> None:
+    """Exibe um relatório no formato de gerar_relatorio"""
+    if not mostrar_ativo(_saida):
+        return
 
     # Exibe o relatório formatado
-    print("\n=== RELATÓRIO FINAL ===")
-    print(f"Total pacientes atendidos: {relatorio['estatisticas_gerais']['pacientes_atendidos']}")
-    print(f"Tempo médio de espera: {relatorio['tempos_espera']['medio']:.1f} minutos")
+    linhas = ["\n=== RELATÓRIO FINAL ===",
+              f"Total pacientes atendidos: {relatorio['estatisticas_gerais']['pacientes_atendidos']}",
+              f"Tempo médio de espera: {relatorio['tempos_espera']['medio']:.1f} minutos",
+              f"Percentis de espera: p50 {relatorio['tempos_espera']['p50']:.1f} | "
+              f"p90 {relatorio['tempos_espera']['p90']:.1f} | p99 {relatorio['tempos_espera']['p99']:.1f}"]
 
-    print("\nPor gravidade:")
+    linhas.append("\nPor gravidade:")
     for grav, dados in relatorio['por_gravidade'].items():
-        print(f"  Gravidade {grav}: {dados['quantidade']} pacientes (média {dados['tempo_medio_espera']:.1f} min)")
+        linhas.append(f"  Gravidade {grav}: {dados['quantidade']} pacientes (média {dados['tempo_medio_espera']:.1f} min)")
 
-    print("\nDesempenho dos médicos:")
+    linhas.append("\nDesempenho dos médicos:")
     for med in relatorio['desempenho_medicos']:
-        print(
+        linhas.append(
             f"  {med['nome']}: {med['pacientes_atendidos']} atendidos (média {med['tempo_medio_atendimento']:.1f} min/paciente)")
+    mostrar(_saida, "\n".join(linhas))
 
-    return relatorio
\ No newline at end of file
+
+def _resumo_grupo(grupo: EstatisticasEspera) -> Dict:
+    resumo = {
+        'quantidade': grupo.quantidade,
+        'tempo_medio_espera': grupo.soma / grupo.quantidade if grupo.quantidade else 0
+    }
+    resumo.update({f'tempo_espera_{rotulo}': valor for rotulo, valor in grupo.quantis().items()})
+    return resumo
@@ -0,0 +1,152 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist, fmean, stdev
+from typing import Dict, List, Optional, Sequence
+from models.especialidade import Especialidade
+from models.hospital import Hospital
+from services.chegadas import FluxoChegadas
+from services.relatorios import montar_relatorio
+from utils.geradores import PESOS_GRAVIDADE_PADRAO, fluxo_chegadas, gerar_lote_pacientes, gerar_medicos_aleatorios
+from utils.relogio import RelogioSimulado
+from utils.saida import silenciar
+
+INICIO_SIMULADO = 0.0  # instante inicial do relógio de cada replicação
+
+
+class Cenario:
+    """Configuração de equipe e demanda avaliada pelas replicações"""
+
+    def __init__(self, nome: str, medicos_por_especialidade: Dict[Especialidade, int],
+                 chegadas_por_hora: float, tempo_total: int = 480,
+                 faixa_tempo_atendimento: Sequence[int] = (15, 45),
+                 pacientes_iniciais: int = 0,
+                 pesos_gravidade: Sequence[float] = PESOS_GRAVIDADE_PADRAO,
+                 mix_especialidades: Optional[Dict[Optional[Especialidade], float]] = None):
+        """
+        Args:
+            nome: Identificação do cenário
+            medicos_por_especialidade: Quantidade de médicos de cada especialidade
+            chegadas_por_hora: Taxa média de chegadas ao longo do turno
+            tempo_total: Duração do turno em minutos
+            faixa_tempo_atendimento: Tempo médio de atendimento mínimo e máximo dos médicos (minutos)
+            pacientes_iniciais: Pacientes já aguardando no início do turno
+            pesos_gravidade: Pesos relativos das gravidades 1 a 5
+            mix_especialidades: Pesos por especialidade dos pacientes (ver utils.geradores)
+        """
+        self.nome = nome
+        self.medicos_por_especialidade = dict(medicos_por_especialidade)
+        self.chegadas_por_hora = chegadas_por_hora
+        self.tempo_total = tempo_total
+        self.faixa_tempo_atendimento = tuple(faixa_tempo_atendimento)
+        self.pacientes_iniciais = pacientes_iniciais
+        self.pesos_gravidade = tuple(pesos_gravidade)
+        self.mix_especialidades = mix_especialidades
+
+
+def executar_replicacao(cenario: Cenario, semente: int) -> Dict:
+    """Executa uma simulação do cenário, sem saída no console, e retorna seu relatório
+
+    A simulação usa um Hospital, com uma fila por especialidade: cada médico
+    atende a fila da sua especialidade, de modo que a distribuição da equipe
+    entre especialidades afeta o resultado. Os atendimentos em curso no fim do
+    turno são finalizados nesse instante, como em SimuladorAtendimento.
+    """
+    rng = random.Random(semente)
+    relogio = RelogioSimulado(INICIO_SIMULADO)
+    hospital = Hospital(cenario.nome, relogio)
+
+    especialidades = [especialidade
+                      for especialidade, quantidade in cenario.medicos_por_especialidade.items()
+                      for _ in range(quantidade)]
+    for medico in gerar_medicos_aleatorios(len(especialidades), relogio, semente=rng.getrandbits(64),
+                                           especialidades=especialidades,
+                                           faixa_tempo_atendimento=cenario.faixa_tempo_atendimento):
+        hospital.adicionar_medico(medico)
+
+    for paciente in gerar_lote_pacientes(cenario.pacientes_iniciais, rng.getrandbits(64),
+                                         cenario.pesos_gravidade, cenario.mix_especialidades,
+                                         inicio=INICIO_SIMULADO):
+        hospital.admitir_paciente(paciente)
+    chegadas = FluxoChegadas(fluxo_chegadas(cenario.chegadas_por_hora, rng.getrandbits(64),
+                                            cenario.pesos_gravidade, cenario.mix_especialidades,
+                                            inicio=INICIO_SIMULADO, duracao_turno=cenario.tempo_total,
+                                            id_inicial=cenario.pacientes_iniciais + 1))
+
+    fim = INICIO_SIMULADO + cenario.tempo_total * 60
+    with silenciar():
+        hospital.avancar_ate(fim, chegadas)
+        hospital.encerrar_atendimentos(fim)
+    em_espera = sum(len(fila) for fila in hospital.filas_espera.values())
+    return montar_relatorio(hospital.estatisticas, hospital.medicos, em_espera, cenario.tempo_total)
+
+
+def metricas_relatorio(relatorio: Dict) -> Dict[str, float]:
+    """Extrai do relatório as métricas numéricas agregadas entre replicações"""
+    metricas = {
+        'pacientes_atendidos': relatorio['estatisticas_gerais']['pacientes_atendidos'],
+        'pacientes_na_fila': relatorio['estatisticas_gerais']['pacientes_na_fila'],
+        'tempo_espera_medio': relatorio['tempos_espera']['medio'],
+        'tempo_espera_p90': relatorio['tempos_espera']['p90'],
+        'tempo_espera_p99': relatorio['tempos_espera']['p99'],
+    }
+    for gravidade, dados in relatorio['por_gravidade'].items():
+        metricas[f'gravidade_{gravidade}_tempo_medio_espera'] = dados['tempo_medio_espera']
+        metricas[f'gravidade_{gravidade}_tempo_espera_p90'] = dados['tempo_espera_p90']
+    return metricas
+
+
+def intervalo_confianca(valores: Sequence[float], confianca: float = 0.95) -> Dict[str, float]:
+    """Média e intervalo de confiança pela aproximação normal (adequada a dezenas de replicações ou mais)"""
+    media = fmean(valores)
+    desvio = stdev(valores) if len(valores) > 1 else 0.0
+    margem = NormalDist().inv_cdf((1 + confianca) / 2) * desvio / len(valores) ** 0.5
+    return {
+        'media': media,
+        'desvio': desvio,
+        'minimo': min(valores),
+        'maximo': max(valores),
+        'ic_inferior': media - margem,
+        'ic_superior': media + margem
+    }
+
+
+def executar_replicacoes(cenario: Cenario, replicacoes: int, semente: int = 0,
+                         processos: Optional[int] = None, confianca: float = 0.95) -> Dict:
+    """Executa replicações independentes do cenário em paralelo e agrega os resultados
+
+    Cada replicação recebe uma semente própria derivada de `semente`, de modo que
+    o resultado não depende do número de processos.
+
+    Args:
+        cenario: Cenário a simular
+        replicacoes: Número de replicações
+        semente: Semente mestre
+        processos: Processos do pool (None: um por núcleo; 1: executa no processo atual)
+        confianca: Nível de confiança dos intervalos
+    Returns:
+        Dict: {'cenario', 'replicacoes': [relatórios], 'resumo': {métrica: estatísticas}}
+    """
+    gerador = random.Random(semente)
+    sementes = [gerador.getrandbits(64) for _ in range(replicacoes)]
+
+    if processos == 1:
+        relatorios = [executar_replicacao(cenario, s) for s in sementes]
+    else:
+        trabalhadores = processos or os.cpu_count() or 1
+        lote = max(1, replicacoes // (trabalhadores * 4))
+        with ProcessPoolExecutor(max_workers=trabalhadores) as executor:
+            relatorios = list(executor.map(executar_replicacao, [cenario] * replicacoes,
+                                           sementes, chunksize=lote))
+
+    resumo = {}
+    if relatorios:
+        metricas: List[Dict[str, float]] = [metricas_relatorio(r) for r in relatorios]
+        for nome in metricas[0]:
+            resumo[nome] = intervalo_confianca([m[nome] for m in metricas], confianca)
+
+    return {
+        'cenario': cenario.nome,
+        'replicacoes': relatorios,
+        'resumo': resumo
+    }
@@ -0,0 +1,76 @@
+import json
+import sys
+from typing import Dict, Optional
+from models.escalonador import Escalonador
+from models.especialidade import Especialidade
+from models.hospital import Hospital
+from models.medico import Medico
+from services.chegadas import paciente_de_registro
+from utils.diario import DiarioEventos, ler_diario
+from utils.metricas import Metricas
+from utils.relogio import Relogio, RelogioSimulado
+
+
+def reproduzir_diario(caminho: str, relogio: Optional[Relogio] = None,
+                      escalonador: Optional[Escalonador] = None, metricas: Optional[Metricas] = None,
+                      diario: Optional[DiarioEventos] = None) -> Hospital:
+    """Reconstrói um Hospital aplicando em ordem os eventos de um diário
+
+    Os atendimentos são refeitos exatamente como registrados (mesmo médico,
+    mesmo paciente, mesmo instante), sem consultar o escalonador. Se o relógio
+    for um RelogioSimulado, ele acompanha o instante de cada evento.
+
+    Args:
+        caminho: Arquivo do diário
+        relogio, escalonador, metricas: Como na criação de um Hospital
+        diario: Diário associado ao hospital depois da reprodução, para que ele
+            continue registrando eventos (ex.: o próprio diário reaberto)
+    Returns:
+        Hospital: Estado do hospital após o último evento registrado
+    """
+    simulado = relogio if isinstance(relogio, RelogioSimulado) else None
+    hospital: Optional[Hospital] = None
+    medicos: Dict[int, Medico] = {}
+
+    for evento in ler_diario(caminho):
+        tipo = evento['tipo']
+        instante = evento['instante']
+        if simulado and instante > simulado.agora():
+            simulado.definir(instante)
+
+        if tipo == 'hospital':
+            if hospital is not None:
+                raise ValueError("O diário contém mais de um hospital")
+            hospital = Hospital(evento['nome'], relogio, escalonador, metricas)
+            continue
+        if hospital is None:
+            raise ValueError("O diário não começa com o registro do hospital")
+
+        if tipo == 'medico':
+            medico = Medico(evento['id'], evento['nome'], Especialidade[evento['especialidade']],
+                            evento['tempo_medio_atendimento'], hospital.relogio)
+            medicos[medico.id] = medico
+            hospital.adicionar_medico(medico)
+        elif tipo == 'admissao':
+            hospital.admitir_paciente(paciente_de_registro(evento))
+        elif tipo == 'inicio':
+            hospital.iniciar_atendimento(medicos[evento['medico_id']], evento['paciente_id'],
+                                         Especialidade[evento['fila']], instante)
+        elif tipo == 'fim':
+            hospital.finalizar_atendimento(medicos[evento['medico_id']], instante)
+        elif tipo == 'remocao':
+            hospital.remover_paciente(evento['paciente_id'])
+        elif tipo == 'gravidade':
+            hospital.atualizar_gravidade(evento['paciente_id'], evento['gravidade'])
+        else:
+            raise ValueError(f"Evento desconhecido no diário: {tipo}")
+
+    if hospital is None:
+        raise ValueError(f"{caminho} não contém eventos")
+    hospital.diario = diario
+    return hospital
+
+
+if __name__ == '__main__':
+    # Uso: python -m services.reproducao diario.jsonl
+    print(json.dumps(reproduzir_diario(sys.argv[1]).gerar_relatorio(), ensure_ascii=False, indent=2))
@@ -0,0 +1,40 @@
+import pytest
+
+from models.fila import Fila
+from services.atendimento import SimuladorAtendimento, MODO_EVENTOS, MODO_TEMPO_REAL
+from services.relatorios import gerar_relatorio
+from utils.geradores import fluxo_chegadas, gerar_lote_pacientes, gerar_medicos_aleatorios
+from utils.relogio import RelogioSimulado
+
+
+def _simular(modo, semente, intervalo=1, tempo_total=240):
+    relogio = RelogioSimulado(0.0)
+    fila = Fila(relogio)
+    fila.adicionar_varios(gerar_lote_pacientes(10, semente, inicio=0.0))
+    chegadas = fluxo_chegadas(20, semente, inicio=0.0, limite=200, id_inicial=11)
+    simulador = SimuladorAtendimento(fila, gerar_medicos_aleatorios(4, relogio, semente=semente),
+                                     tempo_total, intervalo, modo=modo, relogio=relogio,
+                                     chegadas=chegadas, exibir=False)
+    for paciente in gerar_lote_pacientes(5, semente + 100, inicio=1800.0):
+        paciente.id += 1000
+        simulador.agendar_chegada(paciente)
+    simulador.executar()
+    atendidos = [(p.id, p.hora_atendimento) for p in simulador.pacientes_atendidos]
+    return atendidos, gerar_relatorio(simulador, exibir=False)
+
+
+@pytest.mark.parametrize('semente', range(5))
+def test_modo_eventos_reproduz_o_modo_tempo_real(semente):
+    assert _simular(MODO_EVENTOS, semente) == _simular(MODO_TEMPO_REAL, semente)
+
+
+@pytest.mark.parametrize('intervalo, tempo_total', [(0.5, 240), (7, 100), (45, 97)])
+def test_modos_coincidem_com_outros_intervalos(intervalo, tempo_total):
+    assert (_simular(MODO_EVENTOS, 1, intervalo, tempo_total)
+            == _simular(MODO_TEMPO_REAL, 1, intervalo, tempo_total))
+
+
+def test_intervalo_zero_usa_tempo_continuo():
+    atendidos, _ = _simular(MODO_EVENTOS, 0, intervalo=0)
+    alinhados, _ = _simular(MODO_EVENTOS, 0)
+    assert atendidos != alinhados
@@ -0,0 +1,74 @@
+import itertools
+
+import pytest
+
+from models.especialidade import Especialidade
+from models.paciente import Paciente
+from services.chegadas import (FluxoChegadas, ler_chegadas_csv, ler_chegadas_jsonl, paciente_de_registro,
+                               registro_de_paciente, salvar_chegadas_csv, salvar_chegadas_jsonl)
+from utils.geradores import fluxo_chegadas
+
+
+def _pacientes():
+    return [Paciente(1, 'Ana', 2, 10.0, Especialidade.CARDIOLOGIA),
+            Paciente(2, 'José, "Zé"', 5, 12.5),
+            Paciente(3, 'Çécilia', 1, 30.25, Especialidade.PEDIATRIA)]
+
+
+def _campos(pacientes):
+    return [registro_de_paciente(paciente) for paciente in pacientes]
+
+
+def test_registro_de_paciente_ida_e_volta():
+    for paciente in _pacientes():
+        registro = registro_de_paciente(paciente)
+        assert registro_de_paciente(paciente_de_registro(registro)) == registro
+    assert registro_de_paciente(_pacientes()[1])['especialidade'] == ''
+
+
+@pytest.mark.parametrize('salvar, ler', [(salvar_chegadas_csv, ler_chegadas_csv),
+                                         (salvar_chegadas_jsonl, ler_chegadas_jsonl)], ids=['csv', 'jsonl'])
+def test_arquivos_ida_e_volta(tmp_path, salvar, ler):
+    caminho = tmp_path / 'chegadas'
+    salvar(_pacientes(), str(caminho))
+    assert _campos(ler(str(caminho))) == _campos(_pacientes())
+
+
+def test_jsonl_ignora_linhas_em_branco(tmp_path):
+    caminho = tmp_path / 'chegadas.jsonl'
+    salvar_chegadas_jsonl(_pacientes(), str(caminho))
+    caminho.write_text(caminho.read_text(encoding='utf-8') + '\n  \n', encoding='utf-8')
+    assert len(list(ler_chegadas_jsonl(str(caminho)))) == 3
+
+
+def test_leitores_sao_preguicosos(tmp_path):
+    caminho = tmp_path / 'chegadas.csv'
+    salvar_chegadas_csv(_pacientes(), str(caminho))
+    leitor = ler_chegadas_csv(str(caminho))
+    caminho.unlink()  # nada é aberto antes da primeira leitura
+    with pytest.raises(FileNotFoundError):
+        next(leitor)
+
+
+def test_fluxo_le_apenas_um_paciente_adiante():
+    lidos = []
+
+    def fonte():
+        for paciente in _pacientes():
+            lidos.append(paciente.id)
+            yield paciente
+
+    fluxo = FluxoChegadas(fonte())
+    assert lidos == [1] and fluxo.proxima_hora() == 10.0
+    assert [p.id for p in fluxo.ate(12.5)] == [1, 2]
+    assert lidos == [1, 2, 3] and fluxo.consumidos == 2
+    assert list(fluxo.ate(20.0)) == []
+    assert fluxo.proximo().id == 3
+    assert fluxo.esgotado and fluxo.proxima_hora() is None and fluxo.proximo() is None
+
+
+def test_fluxo_sobre_fonte_infinita():
+    fluxo = FluxoChegadas(fluxo_chegadas(60, semente=1, inicio=0.0))
+    primeiros = list(itertools.islice(fluxo, 50))
+    assert len(primeiros) == 50 and not fluxo.esgotado
+    assert all(a.hora_chegada <= b.hora_chegada for a, b in zip(primeiros, primeiros[1:]))
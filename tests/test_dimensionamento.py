@@ -0,0 +1,14 @@
+from services.dimensionamento import dimensionar_equipe
+from services.replicacoes import Cenario
+
+
+def test_equipe_retornada_atende_a_meta_na_validacao():
+    resultado = dimensionar_equipe(Cenario('dimensionamento', {}, 12, 480), 30)
+    assert resultado['atende_meta']
+    assert all(p90 <= 30 for p90 in resultado['tempo_espera_p90'].values())
+
+
+def test_orcamento_limita_a_equipe():
+    resultado = dimensionar_equipe(Cenario('dimensionamento', {}, 12, 480), 10, orcamento=12)
+    assert resultado['custo'] <= 12
+    assert not resultado['atende_meta']
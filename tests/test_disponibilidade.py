@@ -0,0 +1,68 @@
+from models.disponibilidade import IndiceDisponibilidade
+from models.especialidade import Especialidade
+from models.medico import Medico
+from models.paciente import Paciente
+from utils.relogio import RelogioSimulado
+
+
+def _medico(id, especialidade=Especialidade.CLINICO_GERAL, tempo=10):
+    return Medico(id, f'Médico {id}', especialidade, tempo, RelogioSimulado(0.0))
+
+
+def _paciente(id):
+    return Paciente(id, f'Paciente {id}', 3, 0.0)
+
+
+def test_livres_saem_na_ordem_de_cadastro_por_grupo():
+    medicos = [_medico(i, Especialidade.CLINICO_GERAL if i % 2 else Especialidade.PEDIATRIA)
+               for i in range(1, 7)]
+    indice = IndiceDisponibilidade()
+    for medico in reversed(medicos):
+        indice.adicionar(medico)
+
+    assert set(indice.grupos_com_livres()) == {Especialidade.CLINICO_GERAL, Especialidade.PEDIATRIA}
+    clinicos = [indice.retirar_livre(Especialidade.CLINICO_GERAL) for _ in range(3)]
+    assert [m.id for m in clinicos] == [5, 3, 1]
+    assert indice.retirar_livre(Especialidade.CLINICO_GERAL) is None
+    assert indice.grupos_com_livres() == [Especialidade.PEDIATRIA]
+
+    # Devolvidos fora de ordem, voltam a sair pela ordem de cadastro
+    for medico in (clinicos[2], clinicos[0], clinicos[1]):
+        indice.liberar(medico)
+    indice.retirar(clinicos[1])
+    assert [indice.retirar_livre(Especialidade.CLINICO_GERAL).id for _ in range(2)] == [5, 1]
+    assert indice.total_livres() == 3
+
+
+def test_concluidos_em_ordem_de_termino():
+    indice = IndiceDisponibilidade(agrupar=lambda medico: None)
+    medicos = [_medico(i, tempo=t) for i, t in ((1, 30), (2, 10), (3, 20))]
+    for medico in medicos:
+        medico.iniciar_atendimento(_paciente(medico.id), 0.0)
+        indice.adicionar(medico)
+
+    assert not indice.tem_livre(None)
+    assert indice.proximo_termino() == 600.0
+    assert indice.concluidos(599.0) == []
+    assert [m.id for m in indice.concluidos(1200.0)] == [2, 3]
+    assert indice.proximo_termino() == 1800.0
+
+
+def test_terminos_obsoletos_sao_descartados():
+    indice = IndiceDisponibilidade(agrupar=lambda medico: None)
+    encerrado, reiniciado, ativo = _medico(1, tempo=5), _medico(2, tempo=10), _medico(3, tempo=60)
+    for medico in (encerrado, reiniciado, ativo):
+        medico.iniciar_atendimento(_paciente(medico.id), 0.0)
+        indice.adicionar(medico)
+
+    # Finalizado por fora do índice: o término registrado fica obsoleto
+    encerrado.finalizar_atendimento(100.0)
+    # Finalizado e reiniciado por fora: só o novo término vale
+    reiniciado.finalizar_atendimento(100.0)
+    reiniciado.iniciar_atendimento(_paciente(4), 100.0)
+    indice.ocupar(reiniciado)
+
+    assert indice.proximo_termino() == 700.0
+    assert indice.concluidos(3599.0) == [reiniciado]
+    assert indice.concluidos(3600.0) == [ativo]
+    assert indice.proximo_termino() is None
@@ -0,0 +1,70 @@
+import pytest
+
+from models.escalonador import Escalonador, EscalonadorMultiFila
+from models.especialidade import Especialidade
+from models.fila import Fila
+from models.paciente import Paciente
+from utils.relogio import RelogioSimulado
+
+HORA = 3600
+
+
+def _filas(**pacientes):
+    relogio = RelogioSimulado(0.0)
+    filas = {especialidade: Fila(relogio) for especialidade in Especialidade}
+    for nome, lista in pacientes.items():
+        for paciente in lista:
+            filas[Especialidade[nome]].adicionar_paciente(paciente)
+    return filas
+
+
+def test_escalonador_base_e_abstrato():
+    with pytest.raises(TypeError):
+        Escalonador()
+
+
+@pytest.mark.parametrize('envelhecimento, esperada', [(1.0, Especialidade.CLINICO_GERAL),
+                                                      (0.0, Especialidade.CARDIOLOGIA)])
+def test_espera_longa_supera_gravidade_maior(envelhecimento, esperada):
+    # Gravidade 4 há 3 h contra gravidade 2 recém-chegada: 4 - 3 < 2 com envelhecimento
+    filas = _filas(CLINICO_GERAL=[Paciente(1, 'Antigo', 4, 0.0)],
+                   CARDIOLOGIA=[Paciente(2, 'Recente', 2, 3 * HORA)])
+    escalonador = EscalonadorMultiFila(envelhecimento=envelhecimento)
+    escalonador.configurar(filas)
+    assert escalonador.escolher(Especialidade.CARDIOLOGIA, 3 * HORA) == esperada
+    # O clínico não atende cardiologia
+    assert escalonador.escolher(Especialidade.CLINICO_GERAL, 3 * HORA) == Especialidade.CLINICO_GERAL
+
+
+def test_respeita_a_matriz_de_compatibilidade():
+    filas = _filas(CARDIOLOGIA=[Paciente(1, 'Grave', 1, 0.0)],
+                   ORTOPEDIA=[Paciente(2, 'Leve', 5, HORA)])
+    escalonador = EscalonadorMultiFila({Especialidade.PEDIATRIA: (Especialidade.ORTOPEDIA,)})
+    escalonador.configurar(filas)
+    assert escalonador.filas_atendidas(Especialidade.PEDIATRIA) == (Especialidade.PEDIATRIA, Especialidade.ORTOPEDIA)
+    assert escalonador.escolher(Especialidade.PEDIATRIA, HORA) == Especialidade.ORTOPEDIA
+    assert escalonador.escolher(Especialidade.NEUROLOGIA, HORA) is None
+    assert escalonador.escolher(Especialidade.CARDIOLOGIA, HORA) == Especialidade.CARDIOLOGIA
+
+
+def test_entradas_obsoletas_sao_ignoradas():
+    filas = _filas(CLINICO_GERAL=[Paciente(i, f'Paciente {i}', 3, i * 60.0) for i in range(1, 201)],
+                   URGENCIA=[Paciente(1000, 'Urgente', 3, 30 * 60.0)])
+    escalonador = EscalonadorMultiFila()
+    escalonador.configurar(filas)
+
+    for i in range(1, 201):
+        escolhida = escalonador.escolher(Especialidade.URGENCIA, 0.0)
+        # O urgente (chegada aos 30 min) passa à frente dos clínicos que chegaram depois dele
+        if escolhida == Especialidade.URGENCIA:
+            assert filas[escolhida].atender_proximo().hora_chegada == 30 * 60.0
+            escalonador.notificar(Especialidade.URGENCIA)
+            escolhida = escalonador.escolher(Especialidade.URGENCIA, 0.0)
+        assert escolhida == Especialidade.CLINICO_GERAL
+        assert filas[escolhida].atender_proximo().id == i
+        escalonador.notificar(Especialidade.CLINICO_GERAL)
+        assert len(escalonador._heaps[Especialidade.URGENCIA]) <= 4 * 2 + 64
+
+    assert len(filas[Especialidade.URGENCIA]) == 0
+    assert escalonador.escolher(Especialidade.URGENCIA, 0.0) is None
+    assert escalonador.escolher(Especialidade.CLINICO_GERAL, 0.0) is None
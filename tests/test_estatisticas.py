@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from services.estatisticas import EstatisticasEspera, LIMITE_AMOSTRAS_EXATAS, QuantisP2
+
+QUANTIS = (0.5, 0.9, 0.99)
+
+
+def _exato(ordenadas, p):
+    return ordenadas[round(p * (len(ordenadas) - 1))]
+
+
+@pytest.mark.parametrize('distribuicao', ['uniforme', 'exponencial'])
+def test_quantis_p2_aproximam_os_exatos(distribuicao):
+    gerador = random.Random(11)
+    sortear = gerador.random if distribuicao == 'uniforme' else lambda: gerador.expovariate(1 / 600)
+    amostras = [sortear() for _ in range(20000)]
+    estimador = QuantisP2(QUANTIS)
+    for valor in amostras:
+        estimador.registrar(valor)
+
+    ordenadas = sorted(amostras)
+    amplitude = ordenadas[-1] - ordenadas[0]
+    for p in QUANTIS:
+        assert abs(estimador.valor(p) - _exato(ordenadas, p)) < 0.02 * amplitude
+
+
+def test_quantis_p2_exatos_com_poucas_amostras():
+    estimador = QuantisP2(QUANTIS)
+    assert estimador.valor(0.5) == 0
+    for valor in (5.0, 1.0, 3.0):
+        estimador.registrar(valor)
+    assert estimador.valor(0.5) == 3.0
+    with pytest.raises(ValueError):
+        QuantisP2((0.5, 1.0))
+
+
+def test_iniciar_posiciona_marcadores_nos_quantis_exatos():
+    ordenadas = sorted(random.Random(12).random() for _ in range(500))
+    estimador = QuantisP2(QUANTIS)
+    estimador.iniciar(ordenadas)
+    for p in QUANTIS:
+        assert estimador.valor(p) == _exato(ordenadas, p)
+
+
+def test_estatisticas_trocam_para_estimativa_no_limite():
+    gerador = random.Random(13)
+    estatisticas = EstatisticasEspera(QUANTIS)
+    amostras = []
+    for _ in range(LIMITE_AMOSTRAS_EXATAS):
+        amostras.append(gerador.uniform(0, 3600))
+        estatisticas.registrar(amostras[-1])
+    estatisticas.registrar(None)
+
+    ordenadas = sorted(amostras)
+    assert [estatisticas.quantil(p) for p in QUANTIS] == [_exato(ordenadas, p) for p in QUANTIS]
+
+    amostras.append(gerador.uniform(0, 3600))
+    estatisticas.registrar(amostras[-1])
+    ordenadas = sorted(amostras)
+    for p in QUANTIS:
+        assert abs(estatisticas.quantil(p) - _exato(ordenadas, p)) <= 3600 / LIMITE_AMOSTRAS_EXATAS * 5
+
+    assert (estatisticas.quantidade, estatisticas.amostras) == (LIMITE_AMOSTRAS_EXATAS + 2, LIMITE_AMOSTRAS_EXATAS + 1)
+    assert estatisticas.media == pytest.approx(sum(amostras) / len(amostras))
+    assert (estatisticas.minimo, estatisticas.maximo) == (ordenadas[0], ordenadas[-1])
+    with pytest.raises(KeyError):
+        estatisticas.quantil(0.75)
@@ -0,0 +1,149 @@
+import random
+
+import pytest
+
+from models.fila import Fila
+from models.paciente import Paciente
+from utils.relogio import RelogioSimulado
+
+
+def _pacientes(quantidade, semente=0, id_inicial=1):
+    gerador = random.Random(semente)
+    return [Paciente(i, f'Paciente {i}', gerador.randint(1, 5), float(gerador.randint(0, 50)))
+            for i in range(id_inicial, id_inicial + quantidade)]
+
+
+def _nova_fila(pacientes):
+    fila = Fila(RelogioSimulado(0.0))
+    for paciente in pacientes:
+        fila.adicionar_paciente(paciente)
+    return fila
+
+
+def _verificar_invariantes(fila):
+    entradas = fila._fila
+    assert fila._posicoes == {paciente.id: i for i, (_, paciente) in enumerate(entradas)}
+    for i in range(1, len(entradas)):
+        assert entradas[(i - 1) // 2][0] <= entradas[i][0]
+    for (gravidade, hora_chegada, _), paciente in entradas:
+        assert (gravidade, hora_chegada) == (paciente.gravidade, paciente.hora_chegada)
+
+
+def _esvaziar(fila):
+    atendidos = []
+    while len(fila):
+        atendidos.append(fila.atender_proximo())
+        _verificar_invariantes(fila)
+    return atendidos
+
+
+def _ordem_esperada(pacientes):
+    # Desempate pela ordem de inserção, como o contador da fila
+    return sorted(pacientes, key=lambda p: (p.gravidade, p.hora_chegada))
+
+
+def test_atende_por_gravidade_chegada_e_ordem_de_insercao():
+    pacientes = _pacientes(60)
+    assert _esvaziar(_nova_fila(pacientes)) == _ordem_esperada(pacientes)
+    assert Fila(RelogioSimulado(0.0)).atender_proximo() is None
+
+
+@pytest.mark.parametrize('escolher', [lambda fila: fila._fila[0], lambda fila: fila._fila[len(fila) // 2],
+                                      lambda fila: fila._fila[-1]], ids=['topo', 'meio', 'ultima'])
+def test_remover_em_qualquer_posicao(escolher):
+    pacientes = _pacientes(40)
+    fila = _nova_fila(pacientes)
+    alvo = escolher(fila)[1]
+    assert fila.remover(alvo.id) is alvo
+    assert alvo.id not in fila
+    _verificar_invariantes(fila)
+    assert _esvaziar(fila) == _ordem_esperada([p for p in pacientes if p is not alvo])
+
+
+def test_remover_paciente_ausente():
+    fila = _nova_fila(_pacientes(5))
+    assert fila.remover(99) is None
+    assert len(fila) == 5
+    _verificar_invariantes(fila)
+
+
+def test_remocoes_aleatorias_preservam_invariantes():
+    pacientes = _pacientes(200, semente=1)
+    fila = _nova_fila(pacientes)
+    restantes = list(pacientes)
+    gerador = random.Random(2)
+    for paciente in gerador.sample(pacientes, 120):
+        assert fila.remover(paciente.id) is paciente
+        restantes.remove(paciente)
+        _verificar_invariantes(fila)
+    assert _esvaziar(fila) == _ordem_esperada(restantes)
+
+
+@pytest.mark.parametrize('nova_gravidade', [1, 5])
+def test_atualizar_gravidade_para_cima_e_para_baixo(nova_gravidade):
+    pacientes = _pacientes(50, semente=3)
+    fila = _nova_fila(pacientes)
+    gerador = random.Random(4)
+    for paciente in gerador.sample(pacientes, 15):
+        fila.atualizar_gravidade(paciente.id, nova_gravidade)
+        assert paciente.gravidade == nova_gravidade
+        _verificar_invariantes(fila)
+    assert _esvaziar(fila) == _ordem_esperada(pacientes)
+
+
+def test_atualizar_gravidade_mantem_ordem_de_chegada_no_empate():
+    primeiro, segundo = Paciente(1, 'A', 3, 10.0), Paciente(2, 'B', 2, 10.0)
+    fila = _nova_fila([primeiro, segundo])
+    fila.atualizar_gravidade(1, 2)
+    assert fila.atender_proximo() is primeiro
+    with pytest.raises(KeyError):
+        fila.atualizar_gravidade(99, 1)
+
+
+@pytest.mark.parametrize('existentes, novos', [(500, 5), (10, 200), (0, 30)],
+                         ids=['insercoes', 'heapify', 'fila_vazia'])
+def test_adicionar_varios_nos_dois_ramos(existentes, novos):
+    antigos = _pacientes(existentes, semente=5)
+    lote = _pacientes(novos, semente=6, id_inicial=existentes + 1)
+    fila = _nova_fila(antigos)
+    fila.adicionar_varios(lote)
+    _verificar_invariantes(fila)
+    assert len(fila) == existentes + novos
+    assert _esvaziar(fila) == _ordem_esperada(antigos + lote)
+
+
+def test_adicionar_varios_recusa_repetidos():
+    fila = _nova_fila(_pacientes(3))
+    with pytest.raises(ValueError):
+        fila.adicionar_varios(_pacientes(2, id_inicial=3))
+    with pytest.raises(ValueError):
+        fila.adicionar_varios([Paciente(10, 'X', 1, 0.0), Paciente(10, 'X', 1, 0.0)])
+    fila.adicionar_varios([])
+    _verificar_invariantes(fila)
+
+
+def _fila_com_empates():
+    # Poucas gravidades e horários: muitos empates decididos pelo contador
+    gerador = random.Random(7)
+    pacientes = [Paciente(i, f'Paciente {i}', gerador.randint(1, 2), float(gerador.randint(0, 3)))
+                 for i in range(1, 41)]
+    fila = _nova_fila(pacientes)
+    chaves = sorted(fila._fila, key=lambda entrada: entrada[0])
+    return fila, [paciente for _, paciente in chaves]
+
+
+def test_em_ordem_segue_as_chaves_da_heap():
+    fila, ordenados = _fila_com_empates()
+    assert list(fila.em_ordem()) == ordenados
+    assert fila.pacientes_em_espera() == ordenados
+    assert list(Fila(RelogioSimulado(0.0)).em_ordem()) == []
+
+
+@pytest.mark.parametrize('k', [0, 1, 15, 40, 100])
+def test_primeiros_e_ultimos(k):
+    fila, ordenados = _fila_com_empates()
+    assert fila.primeiros(k) == ordenados[:k]
+    assert fila.pacientes_em_espera(k) == ordenados[:k]
+    assert fila.ultimos(k) == ordenados[::-1][:k]
+    assert len(fila) == 40
+    _verificar_invariantes(fila)
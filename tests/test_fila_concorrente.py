@@ -0,0 +1,109 @@
+import random
+import threading
+
+import pytest
+
+from models.fila_concorrente import FilaFragmentada, FilaSincronizada
+from utils.geradores import gerar_lote_pacientes
+
+
+@pytest.mark.parametrize('classe', [FilaSincronizada, FilaFragmentada])
+def test_produtores_e_consumidores_entregam_cada_paciente_uma_vez(classe):
+    fila = classe()
+    pacientes = list(gerar_lote_pacientes(4000, 1, inicio=0.0))
+    atendidos = []
+    trava = threading.Lock()
+
+    def produzir(lote):
+        for paciente in lote:
+            fila.adicionar_paciente(paciente)
+
+    def consumir(quantidade):
+        for _ in range(quantidade):
+            paciente = fila.atender_proximo(timeout=5)
+            with trava:
+                atendidos.append(paciente)
+
+    threads = [threading.Thread(target=produzir, args=(pacientes[i::4],)) for i in range(4)]
+    threads += [threading.Thread(target=consumir, args=(1000,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert None not in atendidos
+    assert sorted(p.id for p in atendidos) == [p.id for p in pacientes]
+    assert len(fila) == 0
+
+
+def test_fragmentada_preserva_a_ordem_da_fila_unica():
+    pacientes = list(gerar_lote_pacientes(500, 2, inicio=0.0))
+    fragmentada, sincronizada = FilaFragmentada(), FilaSincronizada()
+    fragmentada.adicionar_varios(pacientes)
+    sincronizada.adicionar_varios(pacientes)
+    assert ([fragmentada.atender_proximo().id for _ in pacientes]
+            == [sincronizada.atender_proximo().id for _ in pacientes])
+    assert fragmentada.atender_proximo() is None
+
+
+def test_consumidor_bloqueado_acorda_com_nova_chegada():
+    fila = FilaFragmentada()
+    paciente = gerar_lote_pacientes(1, 3, inicio=0.0)[0]
+    recebido = []
+    consumidor = threading.Thread(target=lambda: recebido.append(fila.atender_proximo(timeout=5)))
+    consumidor.start()
+    threading.Timer(0.05, fila.adicionar_paciente, args=(paciente,)).start()
+    consumidor.join()
+    assert recebido == [paciente]
+    assert fila.atender_proximo(timeout=0.01) is None
+
+
+def test_reclassificacao_preserva_desempate_da_fila_unica():
+    # Mesma hora de chegada para todos: a ordem depende só do contador
+    pacientes = list(gerar_lote_pacientes(300, 4, inicio=0.0))
+    for paciente in pacientes:
+        paciente.hora_chegada = 0.0
+    fragmentada, sincronizada = FilaFragmentada(), FilaSincronizada()
+    fragmentada.adicionar_varios(pacientes)
+    sincronizada.adicionar_varios(pacientes)
+    gerador = random.Random(5)
+    for paciente in gerador.sample(pacientes, 150):
+        gravidade = gerador.randint(1, 5)
+        fragmentada.atualizar_gravidade(paciente.id, gravidade)
+        sincronizada.atualizar_gravidade(paciente.id, gravidade)
+    assert ([fragmentada.atender_proximo().id for _ in pacientes]
+            == [sincronizada.atender_proximo().id for _ in pacientes])
+
+
+def test_reclassificacoes_concorrentes_nao_escondem_pacientes():
+    pacientes = list(gerar_lote_pacientes(200, 6, inicio=0.0))
+    fila = FilaFragmentada()
+    fila.adicionar_varios(pacientes)
+    ordem_original = {paciente.id: i for i, paciente in enumerate(pacientes)}
+    falhas = []
+
+    def reclassificar(semente):
+        gerador = random.Random(semente)
+        try:
+            for _ in range(2000):
+                fila.atualizar_gravidade(gerador.choice(pacientes).id, gerador.randint(1, 5))
+        except Exception as erro:
+            falhas.append(erro)
+
+    def conferir():
+        gerador = random.Random(99)
+        for _ in range(4000):
+            if not fila.contem(gerador.choice(pacientes).id):
+                falhas.append('paciente ausente')
+
+    threads = [threading.Thread(target=reclassificar, args=(i,)) for i in range(4)]
+    threads.append(threading.Thread(target=conferir))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert falhas == []
+    assert len(fila) == len(pacientes)
+    esperada = sorted(pacientes, key=lambda p: (p.gravidade, p.hora_chegada, ordem_original[p.id]))
+    assert [fila.atender_proximo() for _ in pacientes] == esperada
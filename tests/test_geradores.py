@@ -0,0 +1,20 @@
+import pytest
+from utils.geradores import fluxo_chegadas
+
+
+def test_fluxo_com_taxa_zero_e_vazio():
+    assert list(fluxo_chegadas(0, semente=1, inicio=0.0, duracao_turno=60)) == []
+    assert list(fluxo_chegadas(0, semente=1, inicio=0.0)) == []
+
+
+def test_fluxo_com_taxa_negativa_e_rejeitado():
+    with pytest.raises(ValueError):
+        fluxo_chegadas(-1, semente=1, inicio=0.0)
+
+
+def test_fluxo_respeita_turno_e_ordem():
+    chegadas = list(fluxo_chegadas(60, semente=1, inicio=0.0, duracao_turno=120))
+    horas = [paciente.hora_chegada for paciente in chegadas]
+    assert horas == sorted(horas)
+    assert all(0 < hora <= 120 * 60 for hora in horas)
+
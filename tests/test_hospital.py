@@ -0,0 +1,53 @@
+from models.especialidade import Especialidade
+from models.hospital import Hospital
+from models.medico import Medico
+from models.paciente import Paciente
+from utils.relogio import RelogioSimulado
+from utils.saida import silenciar
+
+
+def _hospital():
+    relogio = RelogioSimulado(0.0)
+    hospital = Hospital('Relatório', relogio)
+    hospital.adicionar_medico(Medico(1, 'Dr. Rui', Especialidade.CLINICO_GERAL, 10, relogio))
+    return hospital
+
+
+def _mudou(hospital, alterar) -> bool:
+    """Gera o relatório, aplica a alteração e diz se o relatório seguinte foi recalculado"""
+    antes = hospital.gerar_relatorio()
+    assert hospital.gerar_relatorio() is antes  # sem mudança, o relatório guardado é reutilizado
+    alterar()
+    return hospital.gerar_relatorio() is not antes
+
+
+def test_cada_mudanca_de_estado_atualiza_o_relatorio():
+    hospital = _hospital()
+    with silenciar():
+        assert _mudou(hospital, lambda: hospital.adicionar_medico(
+            Medico(2, 'Dra. Eva', Especialidade.CLINICO_GERAL, 10, hospital.relogio)))
+        for i in range(1, 5):
+            assert _mudou(hospital, lambda: hospital.admitir_paciente(
+                Paciente(i, f'Paciente {i}', 3, 0.0, Especialidade.CLINICO_GERAL)))
+        assert _mudou(hospital, lambda: hospital.remover_paciente(4))
+        assert _mudou(hospital, lambda: hospital.atualizar_gravidade(3, 1))
+        assert _mudou(hospital, lambda: hospital.atender_pacientes(0.0))
+        assert hospital.gerar_relatorio()['especialidades']['CLINICO_GERAL']['em_espera'] == 1
+        assert _mudou(hospital, lambda: hospital.finalizar_atendimentos(600.0))
+        assert hospital.gerar_relatorio()['total_pacientes_atendidos'] == 2
+        assert _mudou(hospital, lambda: hospital.atender_pacientes(600.0))
+        assert _mudou(hospital, lambda: hospital.encerrar_atendimentos(900.0))
+    assert hospital.gerar_relatorio()['total_pacientes_atendidos'] == 3
+
+    # Operações sem efeito não descartam o relatório
+    assert not _mudou(hospital, lambda: hospital.remover_paciente(99))
+    assert not _mudou(hospital, lambda: hospital.finalizar_atendimentos(900.0))
+
+
+def test_invalidar_relatorio_apos_mudanca_externa():
+    hospital = _hospital()
+    antes = hospital.gerar_relatorio()
+    hospital.medicos[0].nome = 'Dr. Rui Costa'
+    assert hospital.gerar_relatorio() is antes
+    hospital.invalidar_relatorio()
+    assert hospital.gerar_relatorio()['medicos'][0]['nome'] == 'Dr. Rui Costa'
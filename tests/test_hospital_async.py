@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from models.especialidade import Especialidade
+from models.hospital import Hospital
+from models.medico import Medico
+from models.paciente import Paciente
+from services.hospital_async import HospitalAsync
+from utils.relogio import RelogioAcelerado
+
+LIMITE_SEGUNDOS = 5  # protege o teste contra esperas sem fim
+
+
+def _hospital(medicos=2):
+    # Um minuto simulado a cada 10 ms
+    relogio = RelogioAcelerado(6000, inicio=0.0)
+    hospital = Hospital('Teste', relogio)
+    for i in range(1, medicos + 1):
+        hospital.adicionar_medico(Medico(i, f'Médico {i}', Especialidade.CLINICO_GERAL, 1, relogio))
+    return hospital
+
+
+def _pacientes(quantidade, hora_chegada=0.0):
+    return [Paciente(i, f'Paciente {i}', 3, hora_chegada, Especialidade.CLINICO_GERAL)
+            for i in range(1, quantidade + 1)]
+
+
+def test_aguardar_consultas_conclui_todos_os_atendimentos():
+    hospital = _hospital()
+
+    async def cenario():
+        async with HospitalAsync(hospital) as fachada:
+            for paciente in _pacientes(6):
+                await fachada.admitir_paciente(paciente)
+            await asyncio.wait_for(fachada.aguardar_consultas(), LIMITE_SEGUNDOS)
+            assert len(hospital.pacientes_atendidos) == 6
+            assert not fachada._consultas and fachada._ocioso.is_set()
+
+    asyncio.run(cenario())
+
+
+def test_admitir_fluxo_respeita_horarios():
+    hospital = _hospital(medicos=1)
+
+    async def cenario():
+        async with HospitalAsync(hospital) as fachada:
+            chegadas = [Paciente(i, f'Paciente {i}', 3, i * 120.0, Especialidade.CLINICO_GERAL)
+                        for i in range(1, 4)]
+            assert await fachada.admitir_fluxo(chegadas) == 3
+        return [paciente.hora_atendimento for paciente in hospital.pacientes_atendidos]
+
+    inicios = asyncio.run(cenario())
+    assert len(inicios) == 3
+    assert all(inicio >= i * 120.0 for i, inicio in enumerate(inicios, start=1))
+
+
+def test_falha_do_despachante_e_relancada(monkeypatch):
+    hospital = _hospital()
+
+    def falhar(agora=None):
+        raise RuntimeError('despachante quebrado')
+
+    monkeypatch.setattr(hospital, 'atender_pacientes', falhar)
+
+    async def cenario():
+        fachada = HospitalAsync(hospital)
+        fachada.iniciar()
+        await fachada.admitir_paciente(_pacientes(1)[0])
+        with pytest.raises(RuntimeError, match='despachante quebrado'):
+            await asyncio.wait_for(fachada.encerrar(), LIMITE_SEGUNDOS)
+        assert fachada._despachante is None
+
+    asyncio.run(cenario())
+
+
+def test_falha_de_um_atendimento_e_relancada(monkeypatch):
+    hospital = _hospital()
+
+    def falhar(agora=None):
+        raise RuntimeError('término quebrado')
+
+    monkeypatch.setattr(hospital, 'finalizar_atendimentos', falhar)
+
+    async def cenario():
+        async with HospitalAsync(hospital) as fachada:
+            await fachada.admitir_paciente(_pacientes(1)[0])
+            with pytest.raises(RuntimeError, match='término quebrado'):
+                await asyncio.wait_for(fachada.aguardar_consultas(), LIMITE_SEGUNDOS)
+            await fachada.encerrar(aguardar_consultas=False)
+
+    asyncio.run(cenario())
@@ -0,0 +1,93 @@
+import json
+
+from models.fila import Fila
+from services.atendimento import SimuladorAtendimento, MODO_EVENTOS
+from utils.geradores import fluxo_chegadas, gerar_medicos_aleatorios
+from utils.metricas import Histograma, Metricas, METRICAS_DESATIVADAS, MetricasDesativadas
+from utils.relogio import RelogioSimulado
+
+
+def _metricas():
+    metricas = Metricas(intervalo_amostragem=60, limites_latencia=(0.001, 0.01))
+    for segundos in (0.0005, 0.002, 0.002, 0.5):
+        metricas.observar('fila.atender_proximo', segundos)
+    metricas.amostrar('tamanho_fila', 0.0, 3, rotulo='CARDIOLOGIA')
+    metricas.amostrar('tamanho_fila', 30.0, 9, rotulo='CARDIOLOGIA')  # antes do intervalo: descartado
+    metricas.amostrar('tamanho_fila', 60.0, 5, rotulo='CARDIOLOGIA')
+    metricas.amostrar('utilizacao_medicos', 0.0, 0.5)
+    metricas.contar_evento(7)
+    return metricas
+
+
+def test_histograma_quantis_por_faixa():
+    histograma = Histograma((1, 2, 4))
+    assert histograma.quantil(0.5) is None
+    for valor in (0.5, 1.5, 1.5, 3, 10):
+        histograma.observar(valor)
+    assert list(histograma.contagens) == [1, 2, 1, 1]
+    assert histograma.quantil(0.5) == 2
+    assert histograma.quantil(0.99) is None  # acima do maior limite
+
+
+def test_exportacao_prometheus():
+    linhas = _metricas().exportar_prometheus().splitlines()
+    nome = 'hospital_latencia_segundos'
+    assert linhas[:7] == [
+        f'# HELP {nome} Latência das operações instrumentadas',
+        f'# TYPE {nome} histogram',
+        f'{nome}_bucket{{operacao="fila.atender_proximo",le="0.001"}} 1',
+        f'{nome}_bucket{{operacao="fila.atender_proximo",le="0.01"}} 3',
+        f'{nome}_bucket{{operacao="fila.atender_proximo",le="+Inf"}} 4',
+        f'{nome}_sum{{operacao="fila.atender_proximo"}} {0.0005 + 0.002 + 0.002 + 0.5!r}',
+        f'{nome}_count{{operacao="fila.atender_proximo"}} 4',
+    ]
+    assert linhas[7:11] == ['# TYPE hospital_tamanho_fila gauge',
+                            'hospital_tamanho_fila{rotulo="CARDIOLOGIA"} 5.0',
+                            '# TYPE hospital_utilizacao_medicos gauge',
+                            'hospital_utilizacao_medicos 0.5']
+    assert linhas[11:13] == ['# TYPE hospital_eventos_total counter', 'hospital_eventos_total 7']
+    assert linhas[13] == '# TYPE hospital_eventos_por_segundo gauge'
+    assert len(linhas) == 15
+
+
+def test_exportacao_json(tmp_path):
+    caminho = tmp_path / 'metricas.json'
+    texto = _metricas().exportar_json(str(caminho))
+    assert caminho.read_text(encoding='utf-8') == texto
+    dados = json.loads(texto)
+    latencia = dados['latencias']['fila.atender_proximo']
+    assert (latencia['quantidade'], latencia['contagens'], latencia['limites']) == (4, [1, 2, 1], [0.001, 0.01])
+    assert latencia['p50'] == 0.01
+    assert dados['series']['tamanho_fila']['CARDIOLOGIA'] == {'instantes': [0.0, 60.0], 'valores': [3.0, 5.0]}
+    assert dados['series']['utilizacao_medicos'][''] == {'instantes': [0.0], 'valores': [0.5]}
+    assert dados['eventos']['total'] == 7
+
+
+def test_metricas_desativadas_nao_registram_nada():
+    metricas = MetricasDesativadas()
+    metricas.observar('x', 1.0)
+    metricas.amostrar('tamanho_fila', 0.0, 1)
+    metricas.contar_evento()
+    assert not metricas.ativo
+    assert metricas.para_dict() == {'latencias': {}, 'series': {}, 'eventos': {'total': 0, 'por_segundo': 0.0}}
+
+
+def _simular(metricas=None):
+    relogio = RelogioSimulado(0.0)
+    fila = Fila(relogio, metricas)
+    simulador = SimuladorAtendimento(fila, gerar_medicos_aleatorios(3, relogio, semente=1), 120,
+                                     modo=MODO_EVENTOS, relogio=relogio, exibir=False, metricas=metricas,
+                                     chegadas=fluxo_chegadas(30, 1, inicio=0.0, duracao_turno=120))
+    simulador.executar()
+    return [(p.id, p.hora_atendimento) for p in simulador.pacientes_atendidos]
+
+
+def test_simulacao_sem_metricas_usa_o_coletor_desativado():
+    assert _simular() == _simular(Metricas())
+    assert METRICAS_DESATIVADAS.para_dict()['latencias'] == {}
+    assert METRICAS_DESATIVADAS.eventos == 0
+
+    metricas = Metricas()
+    _simular(metricas)
+    assert {'simulador.executar', 'fila.adicionar_paciente', 'fila.atender_proximo'} <= set(metricas.latencias)
+    assert metricas.eventos > 0 and ('tamanho_fila', '') in metricas.series
@@ -0,0 +1,92 @@
+from models.hospital import Hospital
+from models.paciente import Paciente
+from services.persistencia import carregar_snapshot, salvar_snapshot
+from utils.geradores import gerar_lote_pacientes, gerar_medicos_aleatorios
+from utils.relogio import RelogioSimulado
+from utils.saida import silenciar
+
+
+def _hospital_atendido(pacientes: int, medicos: int, atendidos: int) -> Hospital:
+    """Hospital com ao menos `atendidos` pacientes atendidos (se possível), os demais em atendimento ou na fila"""
+    relogio = RelogioSimulado(0.0)
+    hospital = Hospital('Snapshot', relogio)
+    for medico in gerar_medicos_aleatorios(medicos, relogio, semente=1):
+        hospital.adicionar_medico(medico)
+    for paciente in gerar_lote_pacientes(pacientes, 1, inicio=0.0):
+        hospital.admitir_paciente(paciente)
+    with silenciar():
+        hospital.atender_pacientes(0.0)
+        while (len(hospital.pacientes_atendidos) < atendidos
+               and (proximo := hospital.proximo_termino()) is not None):
+            relogio.definir(proximo)
+            hospital.finalizar_atendimentos(proximo)
+            hospital.atender_pacientes(proximo)
+    return hospital
+
+
+def _resumo(estatisticas) -> dict:
+    grupos = {'geral': estatisticas.geral}
+    grupos.update({f'g{chave}': grupo for chave, grupo in estatisticas.por_gravidade.items()})
+    grupos.update({str(chave): grupo for chave, grupo in estatisticas.por_especialidade.items()})
+    return {nome: (grupo.quantidade, grupo.amostras, grupo.soma, grupo.minimo, grupo.maximo, grupo.quantis())
+            for nome, grupo in grupos.items()}
+
+
+def test_snapshot_restaura_estatisticas_em_fluxo(tmp_path):
+    hospital = _hospital_atendido(3000, 40, 1500)
+    assert hospital.estatisticas.geral.amostras > 1000  # já estimando pelo P²
+    caminho = str(tmp_path / 'hospital.snap')
+    salvar_snapshot(hospital, caminho)
+    restaurado = carregar_snapshot(caminho, RelogioSimulado(hospital.relogio.agora()))
+
+    assert _resumo(restaurado.estatisticas) == _resumo(hospital.estatisticas)
+    assert restaurado.gerar_relatorio() == hospital.gerar_relatorio()
+
+    # Os estimadores continuam a partir do mesmo estado
+    extra = list(gerar_lote_pacientes(50, 2, inicio=0.0))
+    for paciente in extra:
+        paciente.hora_atendimento = paciente.hora_chegada + 600
+        hospital.estatisticas.registrar(paciente)
+        restaurado.estatisticas.registrar(paciente)
+    assert _resumo(restaurado.estatisticas) == _resumo(hospital.estatisticas)
+
+
+def test_snapshot_preserva_nomes_com_quebra_de_linha(tmp_path):
+    hospital = _hospital_atendido(30, 2, 5)
+    hospital.admitir_paciente(Paciente(9001, 'Ana\nSilva', 2, 0.0))
+    hospital.admitir_paciente(Paciente(9002, '', 3, 0.0))
+    hospital.admitir_paciente(Paciente(9003, 'José Ávila', 1, 0.0))
+    caminho = str(tmp_path / 'hospital.snap')
+    salvar_snapshot(hospital, caminho)
+    restaurado = carregar_snapshot(caminho)
+
+    for especialidade, fila in hospital.filas_espera.items():
+        assert ([(p.id, p.nome) for p in restaurado.filas_espera[especialidade].pacientes_em_espera()]
+                == [(p.id, p.nome) for p in fila.pacientes_em_espera()])
+    assert restaurado.historico.nomes == hospital.historico.nomes
+    assert _resumo(restaurado.estatisticas) == _resumo(hospital.estatisticas)
+
+
+def _campos_paciente(paciente) -> tuple:
+    return (paciente.id, paciente.nome, paciente.gravidade, paciente.hora_chegada, paciente.hora_atendimento,
+            paciente.hora_saida)
+
+
+def test_estado_dos_modelos_ida_e_volta():
+    hospital = _hospital_atendido(300, 5, 100)
+    copia = Hospital('Cópia', RelogioSimulado(0.0))
+
+    copia.historico.restaurar_estado(*hospital.historico.estado())
+    assert len(copia.pacientes_atendidos) >= 100
+    assert ([_campos_paciente(p) for p in copia.pacientes_atendidos]
+            == [_campos_paciente(p) for p in hospital.pacientes_atendidos])
+    assert dict(copia.historico_medicos) == dict(hospital.historico_medicos)
+
+    for especialidade, fila in hospital.filas_espera.items():
+        copia.filas_espera[especialidade].restaurar_estado(*fila.estado())
+        assert copia.filas_espera[especialidade].pacientes_em_espera() == fila.pacientes_em_espera()
+
+    for gravidade, grupo in hospital.estatisticas.por_gravidade.items():
+        restaurado = type(grupo)(hospital.estatisticas.quantis)
+        restaurado.restaurar_estado(grupo.estado())
+        assert restaurado.estado() == grupo.estado()
@@ -0,0 +1,94 @@
+import heapq
+import random
+
+import pytest
+
+from models.especialidade import Especialidade
+from services.rede import (CargaRede, DesvioPorCarga, ESPECIALIDADES, MAXIMO_VIZINHOS, PoliticaDesvio,
+                           RedeHospitalar, Unidade, rede_em_grade)
+
+EQUIPE = {Especialidade.URGENCIA: 1, Especialidade.CARDIOLOGIA: 1,
+          Especialidade.NEUROLOGIA: 1, Especialidade.CLINICO_GERAL: 2}
+CLINICO = ESPECIALIDADES.index(Especialidade.CLINICO_GERAL)
+
+
+def _carga(posicoes, medicos_clinicos=2, tempo=30):
+    medicos = [[0] * len(ESPECIALIDADES) for _ in posicoes]
+    for linha in medicos:
+        linha[CLINICO] = medicos_clinicos
+    tempos = [[tempo] * len(ESPECIALIDADES) for _ in posicoes]
+    return CargaRede(posicoes, medicos, tempos)
+
+
+def _sem_tempos(resultado):
+    return {chave: valor for chave, valor in resultado.items() if chave not in ('processos', 'tempo_execucao')}
+
+
+def test_resultado_nao_depende_do_numero_de_processos():
+    unidades = rede_em_grade(3, 8, EQUIPE, 14, semente=2)
+    resultados = [RedeHospitalar(unidades, DesvioPorCarga(), tempo_total=180, semente=5,
+                                 processos=processos).executar() for processos in (1, 2, 4)]
+    assert [resultado['processos'] for resultado in resultados] == [1, 2, 4]
+    assert resultados[0]['rede']['desvios_enviados'] > 0
+    assert _sem_tempos(resultados[1]) == _sem_tempos(resultados[0])
+    assert _sem_tempos(resultados[2]) == _sem_tempos(resultados[0])
+
+
+@pytest.mark.parametrize('quantidade', [1, 2, 30, 400])
+def test_vizinhos_iguais_aos_da_busca_exaustiva(quantidade):
+    gerador = random.Random(quantidade)
+    # Metade espalhada, metade concentrada num canto, com posições repetidas
+    posicoes = [(gerador.uniform(0, 100), gerador.uniform(0, 100)) for _ in range(quantidade // 2)]
+    posicoes += [(round(gerador.uniform(0, 5)), round(gerador.uniform(0, 5))) for _ in range(quantidade - len(posicoes))]
+    carga = _carga(posicoes)
+    for origem in range(quantidade):
+        todos = [(carga.deslocamento(origem, destino), destino) for destino in range(quantidade) if destino != origem]
+        assert carga.vizinhos(origem) == heapq.nsmallest(MAXIMO_VIZINHOS, todos)
+    parcial = carga.parcial([0])
+    assert parcial.vizinhos(0) == carga.vizinhos(0)
+    assert carga.linhas_consultadas([0]) == sorted({0} | {unidade for _, unidade in carga.vizinhos(0)})
+
+
+def test_desvio_para_unidade_proxima_e_livre():
+    # 0 sobrecarregada; 1 perto e livre; 2 mais longe e livre; 3 perto e também cheia
+    carga = _carga([(0, 0), (10, 0), (30, 0), (0, 5)])
+    carga.atualizar(0, [0] * CLINICO + [12] + [0] * (len(ESPECIALIDADES) - CLINICO - 1), [0] * len(ESPECIALIDADES))
+    carga.atualizar(3, list(carga.em_espera[0]), [0] * len(ESPECIALIDADES))
+    politica = DesvioPorCarga(limite_espera=60, margem=15)
+
+    assert carga.espera_estimada(0, Especialidade.CLINICO_GERAL) == 11 * 15 * 60
+    assert politica.destino(0, None, Especialidade.CLINICO_GERAL, carga) == 1
+    assert politica.destino(1, None, Especialidade.CLINICO_GERAL, carga) == 1  # abaixo do limite
+    assert politica.destino(0, None, Especialidade.URGENCIA, carga) == 0  # nenhuma unidade tem urgência
+    assert PoliticaDesvio().destino(0, None, Especialidade.CLINICO_GERAL, carga) == 0
+
+    ordens = politica.transferencias(carga)
+    assert ordens[0][:3] == (0, 1, Especialidade.CLINICO_GERAL)
+    assert 0 < ordens[0][3] <= politica.maximo_transferencias
+    # As transferências decididas entram na carga, equilibrando as esperas
+    assert carga.espera_estimada(1, Especialidade.CLINICO_GERAL) > 0
+
+
+def test_rede_desvia_e_transfere_para_unidade_ociosa():
+    unidades = [Unidade('Cheia', (0, 0), {Especialidade.CLINICO_GERAL: 1}, 6,
+                        mix_especialidades={Especialidade.CLINICO_GERAL: 1}),
+                Unidade('Ociosa', (5, 0), {Especialidade.CLINICO_GERAL: 4}, 1,
+                        mix_especialidades={Especialidade.CLINICO_GERAL: 1})]
+    resultado = RedeHospitalar(unidades, DesvioPorCarga(limite_espera=30), tempo_total=240, processos=1).executar()
+    cheia, ociosa = resultado['unidades']
+    assert cheia['desvios_enviados'] > 0
+    assert cheia['transferencias_enviadas'] > 0
+    assert ociosa['desvios_recebidos'] + ociosa['transferencias_recebidas'] > 0
+
+    sem_desvio = RedeHospitalar(unidades, PoliticaDesvio(), tempo_total=240, processos=1).executar()
+    assert sem_desvio['rede']['desvios_enviados'] == sem_desvio['rede']['transferencias_enviadas'] == 0
+    assert resultado['rede']['pacientes_atendidos'] > sem_desvio['rede']['pacientes_atendidos']
+    assert resultado['rede']['pacientes_em_espera'] < sem_desvio['rede']['pacientes_em_espera']
+
+
+def test_rede_com_unidade_que_so_recebe():
+    unidades = [Unidade('A', (0, 0), {Especialidade.CLINICO_GERAL: 1}, 20),
+                Unidade('B', (10, 0), {Especialidade.CLINICO_GERAL: 3}, 0)]
+    resultado = RedeHospitalar(unidades, processos=1, tempo_total=120).executar()
+    assert resultado['unidades'][1]['chegadas'] == 0
+    assert resultado['rede']['chegadas'] > 0
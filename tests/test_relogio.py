@@ -0,0 +1,34 @@
+import pytest
+
+from models.hospital import Hospital
+from services.hospital_async import HospitalAsync
+from utils.relogio import Relogio, RelogioAcelerado, RelogioAssincrono, RelogioSimulado
+
+
+def test_relogio_base_e_abstrato():
+    with pytest.raises(TypeError):
+        Relogio()
+
+    class SemAguardar(RelogioAssincrono):
+        def agora(self):
+            return 0.0
+
+        def dormir(self, segundos):
+            pass
+
+    with pytest.raises(TypeError):
+        SemAguardar()
+
+
+def test_relogio_simulado_nao_retrocede():
+    relogio = RelogioSimulado(10.0)
+    relogio.dormir(5)
+    assert relogio.agora() == 15.0
+    with pytest.raises(ValueError):
+        relogio.definir(14.0)
+
+
+def test_hospital_async_recusa_relogio_sem_aguardar():
+    with pytest.raises(TypeError, match='RelogioSimulado'):
+        HospitalAsync(Hospital('Teste', RelogioSimulado(0.0)))
+    assert HospitalAsync(Hospital('Teste', RelogioAcelerado(1000.0))).hospital.nome == 'Teste'
@@ -0,0 +1,21 @@
+from models.especialidade import Especialidade
+from services.replicacoes import Cenario, executar_replicacao, executar_replicacoes
+
+
+def test_especialidades_da_equipe_alteram_o_resultado():
+    clinicos = executar_replicacoes(Cenario('clinicos', {Especialidade.CLINICO_GERAL: 4}, 12), 5, processos=1)
+    dermatologistas = executar_replicacoes(Cenario('dermato', {Especialidade.DERMATOLOGIA: 4}, 12), 5, processos=1)
+    assert (clinicos['resumo']['pacientes_atendidos']['media']
+            > dermatologistas['resumo']['pacientes_atendidos']['media'])
+
+
+def test_resultado_nao_depende_do_numero_de_processos():
+    cenario = Cenario('misto', {Especialidade.CLINICO_GERAL: 2, Especialidade.URGENCIA: 1}, 8)
+    sequencial = executar_replicacoes(cenario, 4, semente=3, processos=1)
+    paralelo = executar_replicacoes(cenario, 4, semente=3, processos=2)
+    assert sequencial['resumo'] == paralelo['resumo']
+
+
+def test_cenario_sem_chegadas():
+    relatorio = executar_replicacao(Cenario('vazio', {Especialidade.CLINICO_GERAL: 1}, 0), 1)
+    assert relatorio['estatisticas_gerais']['pacientes_atendidos'] == 0
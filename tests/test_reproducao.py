@@ -0,0 +1,82 @@
+import pytest
+
+from models.especialidade import Especialidade
+from models.hospital import Hospital
+from models.medico import Medico
+from models.paciente import Paciente
+from services.chegadas import FluxoChegadas
+from services.reproducao import reproduzir_diario
+from utils.diario import DiarioEventos
+from utils.geradores import fluxo_chegadas, gerar_medicos_aleatorios
+from utils.relogio import RelogioSimulado
+from utils.saida import silenciar
+
+
+def _espera(hospital):
+    return {especialidade.name: [(p.id, p.gravidade) for p in fila.pacientes_em_espera()]
+            for especialidade, fila in hospital.filas_espera.items()}
+
+
+def _em_curso(hospital):
+    return [(m.id, m.paciente_atual.id if m.ocupado else None, m.hora_inicio_atendimento)
+            for m in hospital.medicos]
+
+
+def test_diario_reproduz_o_hospital(tmp_path):
+    caminho = str(tmp_path / 'diario.jsonl')
+    relogio = RelogioSimulado(0.0)
+    with DiarioEventos(caminho, intervalo_fsync=None) as diario, silenciar():
+        hospital = Hospital('Diário', relogio, diario=diario)
+        for medico in gerar_medicos_aleatorios(6, relogio, semente=3):
+            hospital.adicionar_medico(medico)
+        chegadas = FluxoChegadas(fluxo_chegadas(40, 3, inicio=0.0, duracao_turno=240))
+        hospital.avancar_ate(2 * 3600, chegadas)
+        em_espera = [p for fila in hospital.filas_espera.values() for p in fila.pacientes_em_espera()]
+        hospital.remover_paciente(em_espera[0].id)
+        hospital.atualizar_gravidade(em_espera[-1].id, 1)
+        hospital.avancar_ate(4 * 3600, chegadas)
+
+    reproduzido = reproduzir_diario(caminho, RelogioSimulado(0.0))
+    assert reproduzido.gerar_relatorio() == hospital.gerar_relatorio()
+    assert _espera(reproduzido) == _espera(hospital)
+    assert _em_curso(reproduzido) == _em_curso(hospital)
+    assert reproduzido.relogio.agora() <= hospital.relogio.agora()
+
+    # O hospital reproduzido continua a partir do mesmo estado
+    for h in (hospital, reproduzido):
+        h.encerrar_atendimentos(5 * 3600)
+    assert reproduzido.gerar_relatorio() == hospital.gerar_relatorio()
+
+
+def test_atendimento_aplicado_por_fora_do_escalonador():
+    relogio = RelogioSimulado(0.0)
+    hospital = Hospital('Manual', relogio)
+    medico = Medico(1, 'Dra. Ana', Especialidade.CARDIOLOGIA, 20, relogio)
+    hospital.adicionar_medico(medico)
+    hospital.admitir_paciente(Paciente(1, 'Primeiro', 3, 0.0, Especialidade.CARDIOLOGIA))
+    hospital.admitir_paciente(Paciente(2, 'Segundo', 3, 60.0, Especialidade.CARDIOLOGIA))
+
+    # O diário pode chamar quem não é o primeiro da fila
+    assert hospital.iniciar_atendimento(medico, 2, Especialidade.CARDIOLOGIA, 120.0).id == 2
+    with pytest.raises(ValueError):
+        hospital.iniciar_atendimento(medico, 1, Especialidade.CARDIOLOGIA, 120.0)
+    assert hospital.finalizar_atendimento(medico, 600.0).hora_saida == 600.0
+    with pytest.raises(ValueError):
+        hospital.finalizar_atendimento(medico, 600.0)
+    with pytest.raises(ValueError):
+        hospital.iniciar_atendimento(medico, 2, Especialidade.CARDIOLOGIA, 600.0)
+
+    # O término previsto do atendimento encerrado por fora não é repetido
+    assert hospital.proximo_termino() is None
+    assert [m.id for m in hospital.atender_pacientes(700.0)] == [1]
+    assert hospital.gerar_relatorio()['total_pacientes_atendidos'] == 1
+
+
+def test_diario_invalido(tmp_path):
+    caminho = tmp_path / 'diario.jsonl'
+    caminho.write_text('{"tipo": "medico", "instante": 0}\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        reproduzir_diario(str(caminho))
+    caminho.write_text('', encoding='utf-8')
+    with pytest.raises(ValueError):
+        reproduzir_diario(str(caminho))
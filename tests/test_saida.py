@@ -0,0 +1,43 @@
+import io
+import logging
+
+import pytest
+
+from models.fila import Fila
+from utils.geradores import gerar_lote_pacientes
+from utils.relogio import RelogioSimulado
+from utils.saida import configurar_saida, encerrar_saida, silenciar
+
+
+@pytest.fixture
+def fila():
+    fila = Fila(RelogioSimulado(0.0))
+    fila.adicionar_varios(gerar_lote_pacientes(3, 1, inicio=0.0))
+    yield fila
+    encerrar_saida()
+
+
+def _sem_logging_da_aplicacao(monkeypatch):
+    # O pytest instala handlers no logger raiz durante a execução de cada teste
+    monkeypatch.setattr(logging.getLogger(), 'handlers', [])
+
+
+def test_mostrar_fila_sem_configuracao_imprime_no_stdout(fila, monkeypatch, capsys):
+    _sem_logging_da_aplicacao(monkeypatch)
+    fila.mostrar_fila()
+    assert 'Total na fila: 3 pacientes' in capsys.readouterr().out
+
+
+def test_silenciar_suprime_exibicoes(fila, monkeypatch, capsys):
+    _sem_logging_da_aplicacao(monkeypatch)
+    with silenciar():
+        fila.mostrar_fila()
+    assert capsys.readouterr().out == ''
+
+
+def test_saida_configurada_recebe_exibicoes(fila, capsys):
+    destino = io.StringIO()
+    configurar_saida(destino=destino, em_lote=False)
+    fila.mostrar_fila()
+    assert 'Total na fila: 3 pacientes' in destino.getvalue()
+    assert capsys.readouterr().out == ''
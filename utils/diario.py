@@ -0,0 +1,91 @@
+import json
+import os
+from time import monotonic
+from typing import Dict, Iterator, List, Optional
+
+TAMANHO_LOTE = 512  # registros acumulados antes de gravar um lote
+INTERVALO_FSYNC = 1.0  # segundos máximos entre sincronizações com o disco
+
+
+class DiarioEventos:
+    """Diário de eventos somente de acréscimo, gravado em lotes (group commit)
+
+    Cada evento vira uma linha JSON acumulada em memória; o lote é gravado
+    quando atinge `tamanho_lote` registros ou quando passou `intervalo_fsync`
+    desde a última gravação, e só então o arquivo é sincronizado com o disco.
+    Assim o custo de fsync é dividido por todos os eventos do lote, e uma
+    queda perde no máximo os eventos do lote em aberto.
+
+    Num período sem eventos o lote em aberto só é gravado na próxima chamada
+    de registrar(), confirmar() ou fechar().
+    """
+
+    def __init__(self, caminho: str, intervalo_fsync: Optional[float] = INTERVALO_FSYNC,
+                 tamanho_lote: int = TAMANHO_LOTE):
+        """
+        Args:
+            caminho: Arquivo do diário (criado se não existir; eventos são acrescentados)
+            intervalo_fsync: Segundos máximos entre gravações sincronizadas
+                (0 sincroniza a cada registro; None nunca chama fsync, deixando
+                a gravação em disco a cargo do sistema operacional)
+            tamanho_lote: Registros acumulados que forçam a gravação do lote
+        """
+        self.caminho = caminho
+        self.intervalo_fsync = intervalo_fsync
+        self.tamanho_lote = tamanho_lote
+        self.registros = 0  # total de eventos registrados
+        self.sincronizacoes = 0
+        self._arquivo = open(caminho, 'a', encoding='utf-8')
+        self._pendentes: List[str] = []
+        self._ultima_gravacao = monotonic()
+
+    def __enter__(self) -> 'DiarioEventos':
+        return self
+
+    def __exit__(self, *excecao) -> None:
+        self.fechar()
+
+    def registrar(self, tipo: str, instante: float, **dados) -> None:
+        """Acrescenta um evento ao lote em aberto
+        Args:
+            tipo: Tipo do evento (ex.: 'admissao', 'inicio', 'fim')
+            instante: Instante do evento no relógio do hospital
+            dados: Campos do evento, serializáveis em JSON
+        """
+        dados['tipo'] = tipo
+        dados['instante'] = instante
+        self._pendentes.append(json.dumps(dados, ensure_ascii=False, separators=(',', ':')))
+        self.registros += 1
+        if (len(self._pendentes) >= self.tamanho_lote or self.intervalo_fsync is not None
+                and monotonic() - self._ultima_gravacao >= self.intervalo_fsync):
+            self.confirmar()
+
+    def confirmar(self) -> None:
+        """Grava o lote em aberto e sincroniza o arquivo com o disco"""
+        if self._pendentes:
+            self._arquivo.write('\n'.join(self._pendentes) + '\n')
+            self._pendentes.clear()
+        self._arquivo.flush()
+        if self.intervalo_fsync is not None:
+            os.fsync(self._arquivo.fileno())
+            self.sincronizacoes += 1
+        self._ultima_gravacao = monotonic()
+
+    def fechar(self) -> None:
+        """Confirma o lote em aberto e fecha o arquivo"""
+        if not self._arquivo.closed:
+            self.confirmar()
+            self._arquivo.close()
+
+
+def ler_diario(caminho: str) -> Iterator[Dict]:
+    """Lê os eventos de um diário em ordem
+
+    Uma última linha incompleta (gravação interrompida por uma queda) é ignorada.
+    """
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            if not linha.endswith('\n'):
+                return
+            if linha.strip():
+                yield json.loads(linha)
@@ -1,51 +1,213 @@
 import random
-import time
-from typing import List
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Sequence
 
 from models.paciente import Paciente
 from models.medico import Medico
 from models.especialidade import Especialidade
+from utils.relogio import Relogio, RELOGIO_REAL
 
+NOMES = ["João", "Maria", "Pedro", "Ana", "Carlos", "Lucia", "Fernanda",
+         "Ricardo", "Mariana", "José", "Patricia", "Rodrigo"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Pereira", "Costa"]
+NOMES_MEDICOS = ["Dr. Carlos", "Dra. Ana", "Dr. Pedro", "Dra. Juliana",
+                 "Dr. Marcelo", "Dra. Beatriz", "Dr. Rafael", "Dra. Camila"]
+ESPECIALIDADES = list(Especialidade)
 
-def gerar_pacientes_aleatorios(quantidade: int) -> List[Paciente]:
-    nomes = ["João", "Maria", "Pedro", "Ana", "Carlos", "Lucia", "Fernanda",
-             "Ricardo", "Mariana", "José", "Patricia", "Rodrigo"]
-    sobrenomes = ["Silva", "Santos", "Oliveira", "Souza", "Pereira", "Costa"]
-
-    pacientes = []
-    for i in range(1, quantidade + 1):
-        nome = f"{random.choice(nomes)} {random.choice(sobrenomes)}"
-        gravidade = random.randint(1, 5)
-        hora_chegada = time.time() - random.randint(0, 3600)  # Chegou até 1 hora atrás
-        especialidade = random.choice(list(Especialidade)) if random.random() > 0.3 else None
-
-        pacientes.append(
-            Paciente(
-                id=i,
-                nome=nome,
-                gravidade=gravidade,
-                hora_chegada=hora_chegada,
-                especialidade=especialidade
-            )
-        )
+PESOS_GRAVIDADE_PADRAO = (1, 1, 1, 1, 1)  # gravidades 1 a 5 equiprováveis
+PROPORCAO_SEM_ESPECIALIDADE = 0.3  # pacientes que chegam sem especialidade definida
+TAMANHO_BLOCO = 10000  # pacientes gerados por vez nos fluxos
+
+
+def _gerador(semente: Optional[int]):
+    """Usa o gerador global do módulo random quando não há semente, como antes"""
+    return random if semente is None else random.Random(semente)
+
+
+def _mix_padrao() -> Dict[Optional[Especialidade], float]:
+    mix = {None: PROPORCAO_SEM_ESPECIALIDADE}
+    for especialidade in ESPECIALIDADES:
+        mix[especialidade] = (1 - PROPORCAO_SEM_ESPECIALIDADE) / len(ESPECIALIDADES)
+    return mix
+
+
+class LotePacientes:
+    """Pacientes gerados em colunas compactas; os objetos Paciente são criados sob demanda
+
+    Guarda por paciente apenas índices de nome, gravidade, hora de chegada e o
+    código da especialidade (0 = não definida), cerca de 15 bytes cada.
+    """
 
-    return pacientes
+    def __init__(self, id_inicial: int, nomes: array, sobrenomes: array, gravidades: array,
+                 horas_chegada: array, especialidades: array):
+        self.id_inicial = id_inicial
+        self.nomes = nomes
+        self.sobrenomes = sobrenomes
+        self.gravidades = gravidades
+        self.horas_chegada = horas_chegada
+        self.especialidades = especialidades
 
+    def __len__(self) -> int:
+        return len(self.gravidades)
 
-def gerar_medicos_aleatorios(quantidade: int) -> List[Medico]:
-    nomes = ["Dr. Carlos", "Dra. Ana", "Dr. Pedro", "Dra. Juliana",
-             "Dr. Marcelo", "Dra. Beatriz", "Dr. Rafael", "Dra. Camila"]
-    especialidades = list(Especialidade)
+    @property
+    def ids(self) -> range:
+        return range(self.id_inicial, self.id_inicial + len(self))
 
-    medicos = []
-    for i in range(1, quantidade + 1):
-        medicos.append(
-            Medico(
-                id=i,
-                nome=random.choice(nomes),
-                especialidade=random.choice(especialidades),
-                tempo_medio_atendimento=random.randint(15, 45)  # 15-45 minutos
-            )
+    def __getitem__(self, indice: int) -> Paciente:
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("Índice fora do lote")
+        codigo = self.especialidades[indice]
+        return Paciente(
+            id=self.id_inicial + indice,
+            nome=f"{NOMES[self.nomes[indice]]} {SOBRENOMES[self.sobrenomes[indice]]}",
+            gravidade=self.gravidades[indice],
+            hora_chegada=self.horas_chegada[indice],
+            especialidade=ESPECIALIDADES[codigo - 1] if codigo else None
         )
 
-    return medicos
\ No newline at end of file
+    def __iter__(self) -> Iterator[Paciente]:
+        for indice in range(len(self)):
+            yield self[indice]
+
+
+def gerar_lote_pacientes(quantidade: int, semente: Optional[int] = None,
+                         pesos_gravidade: Sequence[float] = PESOS_GRAVIDADE_PADRAO,
+                         mix_especialidades: Optional[Dict[Optional[Especialidade], float]] = None,
+                         inicio: Optional[float] = None, duracao_turno: Optional[float] = None,
+                         id_inicial: int = 1, relogio: Optional[Relogio] = None) -> LotePacientes:
+    """Gera pacientes em lote, sorteando cada atributo de uma vez para todo o lote
+
+    Args:
+        quantidade: Número de pacientes
+        semente: Semente do gerador (None usa o gerador global de random)
+        pesos_gravidade: Pesos relativos das gravidades 1 a 5
+        mix_especialidades: Pesos por especialidade; a chave None representa
+            pacientes sem especialidade definida (padrão: 30% sem, resto uniforme)
+        inicio: Instante de referência (padrão: agora no relógio)
+        duracao_turno: Se informado (minutos), as chegadas seguem um processo de
+            Poisson ao longo do turno a partir de `inicio`, em ordem cronológica;
+            senão, cada paciente chegou até 1 hora antes de `inicio`
+        id_inicial: ID do primeiro paciente
+        relogio: Relógio usado quando `inicio` não é informado
+    """
+    rng = _gerador(semente)
+    if inicio is None:
+        inicio = (relogio or RELOGIO_REAL).agora()
+
+    sortear = rng.random
+    if duracao_turno is not None:
+        # Dado o número de chegadas, os instantes de um processo de Poisson
+        # são uniformes no intervalo; ordenados, formam a sequência de chegadas
+        segundos = duracao_turno * 60
+        horas_chegada = array('d', sorted(inicio + sortear() * segundos for _ in range(quantidade)))
+    else:
+        horas_chegada = array('d', (inicio - int(sortear() * 3601) for _ in range(quantidade)))
+
+    return _sortear_lote(rng, quantidade, pesos_gravidade, mix_especialidades, horas_chegada, id_inicial)
+
+
+def _sortear_lote(rng, quantidade: int, pesos_gravidade: Sequence[float],
+                  mix_especialidades: Optional[Dict[Optional[Especialidade], float]],
+                  horas_chegada: array, id_inicial: int) -> LotePacientes:
+    """Sorteia nome, gravidade e especialidade de todo o lote, uma coluna por vez"""
+    mix = mix_especialidades or _mix_padrao()
+    codigos = [ESPECIALIDADES.index(esp) + 1 if esp else 0 for esp in mix]
+
+    nomes = array('B', rng.choices(range(len(NOMES)), k=quantidade))
+    sobrenomes = array('B', rng.choices(range(len(SOBRENOMES)), k=quantidade))
+    gravidades = array('b', rng.choices(range(1, 6), weights=pesos_gravidade, k=quantidade))
+    especialidades = array('b', rng.choices(codigos, weights=list(mix.values()), k=quantidade))
+
+    return LotePacientes(id_inicial, nomes, sobrenomes, gravidades, horas_chegada, especialidades)
+
+
+def fluxo_chegadas(taxa_por_hora: float, semente: Optional[int] = None,
+                   pesos_gravidade: Sequence[float] = PESOS_GRAVIDADE_PADRAO,
+                   mix_especialidades: Optional[Dict[Optional[Especialidade], float]] = None,
+                   inicio: Optional[float] = None, duracao_turno: Optional[float] = None,
+                   limite: Optional[int] = None, tamanho_bloco: int = TAMANHO_BLOCO,
+                   id_inicial: int = 1, relogio: Optional[Relogio] = None) -> Iterator[Paciente]:
+    """Gera chegadas de um processo de Poisson em ordem cronológica, bloco a bloco
+
+    Usa memória constante: apenas um bloco de `tamanho_bloco` pacientes fica em
+    colunas por vez. Sem `duracao_turno` nem `limite`, o fluxo é infinito.
+
+    Args:
+        taxa_por_hora: Média de chegadas por hora (0 produz um fluxo vazio)
+        duracao_turno: Encerra o fluxo após este tempo (minutos) desde `inicio`
+        limite: Encerra o fluxo após este número de pacientes
+        (demais argumentos como em gerar_lote_pacientes)
+    Raises:
+        ValueError: Se a taxa for negativa
+    """
+    if taxa_por_hora < 0:
+        raise ValueError(f"Taxa de chegadas negativa: {taxa_por_hora}")
+    if taxa_por_hora == 0:
+        return iter(())
+    if inicio is None:
+        inicio = (relogio or RELOGIO_REAL).agora()
+    return _fluxo_chegadas(taxa_por_hora, _gerador(semente), pesos_gravidade, mix_especialidades,
+                           inicio, duracao_turno, limite, tamanho_bloco, id_inicial)
+
+
+def _fluxo_chegadas(taxa_por_hora: float, rng, pesos_gravidade: Sequence[float],
+                    mix_especialidades: Optional[Dict[Optional[Especialidade], float]],
+                    inicio: float, duracao_turno: Optional[float], limite: Optional[int],
+                    tamanho_bloco: int, id_inicial: int) -> Iterator[Paciente]:
+    fim = inicio + duracao_turno * 60 if duracao_turno is not None else None
+    taxa_por_segundo = taxa_por_hora / 3600
+    proximo_id = id_inicial
+    hora = inicio
+
+    while limite is None or proximo_id - id_inicial < limite:
+        tamanho = tamanho_bloco
+        if limite is not None:
+            tamanho = min(tamanho, limite - (proximo_id - id_inicial))
+        intervalos = (rng.expovariate(taxa_por_segundo) for _ in range(tamanho))
+        horas_chegada = array('d', accumulate(intervalos, initial=hora))[1:]
+        bloco = _sortear_lote(rng, tamanho, pesos_gravidade, mix_especialidades,
+                              horas_chegada, proximo_id)
+
+        for paciente in bloco:
+            if fim is not None and paciente.hora_chegada > fim:
+                return
+            yield paciente
+        hora = bloco.horas_chegada[-1]
+        proximo_id += tamanho
+
+
+def gerar_pacientes_aleatorios(quantidade: int, relogio: Optional[Relogio] = None,
+                               semente: Optional[int] = None) -> List[Paciente]:
+    return list(gerar_lote_pacientes(quantidade, semente, relogio=relogio))
+
+
+def gerar_medicos_aleatorios(quantidade: int, relogio: Optional[Relogio] = None,
+                             semente: Optional[int] = None,
+                             especialidades: Optional[Sequence[Especialidade]] = None,
+                             faixa_tempo_atendimento: Sequence[int] = (15, 45)) -> List[Medico]:
+    """
+    Args:
+        especialidades: Especialidade de cada médico, em ordem (padrão: sorteadas)
+        faixa_tempo_atendimento: Tempo médio de atendimento mínimo e máximo, em minutos
+    """
+    rng = _gerador(semente)
+    if especialidades is None:
+        especialidades = rng.choices(ESPECIALIDADES, k=quantidade)
+    nomes = rng.choices(NOMES_MEDICOS, k=quantidade)
+    minimo, maximo = faixa_tempo_atendimento
+    tempos = rng.choices(range(minimo, maximo + 1), k=quantidade)
+
+    return [
+        Medico(
+            id=i + 1,
+            nome=nomes[i],
+            especialidade=especialidades[i],
+            tempo_medio_atendimento=tempos[i],
+            relogio=relogio
+        )
+        for i in range(quantidade)
+    ]
@@ -0,0 +1,194 @@
+import json
+from array import array
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, Optional, Sequence, Tuple
+
+# Limites superiores (segundos) das faixas dos histogramas de latência
+LIMITES_LATENCIA = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+INTERVALO_AMOSTRAGEM = 60.0  # segundos simulados mínimos entre pontos de uma série
+PREFIXO_PROMETHEUS = 'hospital'
+
+
+class Histograma:
+    """Histograma de latências em faixas fixas, no formato dos histogramas do Prometheus"""
+
+    def __init__(self, limites: Sequence[float] = LIMITES_LATENCIA):
+        self.limites = tuple(limites)
+        self.contagens = array('q', [0] * (len(self.limites) + 1))  # última faixa: acima do maior limite
+        self.quantidade = 0
+        self.soma = 0.0
+
+    def observar(self, valor: float) -> None:
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.quantidade += 1
+        self.soma += valor
+
+    def quantil(self, p: float) -> Optional[float]:
+        """Limite superior da faixa que contém o quantil p (None se vazio ou acima do maior limite)"""
+        if not self.quantidade:
+            return None
+        alvo = p * self.quantidade
+        acumulado = 0
+        for indice, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return self.limites[indice] if indice < len(self.limites) else None
+        return None
+
+    def para_dict(self) -> Dict:
+        return {
+            'quantidade': self.quantidade,
+            'soma': self.soma,
+            'media': self.soma / self.quantidade if self.quantidade else 0,
+            'p50': self.quantil(0.5),
+            'p99': self.quantil(0.99),
+            'limites': list(self.limites),
+            'contagens': list(self.contagens)
+        }
+
+
+class SerieTemporal:
+    """Valores amostrados ao longo do tempo simulado, no máximo um ponto por intervalo"""
+
+    def __init__(self, intervalo: float = INTERVALO_AMOSTRAGEM):
+        self.intervalo = intervalo
+        self.instantes = array('d')
+        self.valores = array('d')
+
+    def amostrar(self, instante: float, valor: float) -> None:
+        if self.instantes and instante < self.instantes[-1] + self.intervalo:
+            return
+        self.instantes.append(instante)
+        self.valores.append(valor)
+
+    @property
+    def ultimo(self) -> Optional[float]:
+        return self.valores[-1] if self.valores else None
+
+    def para_dict(self) -> Dict:
+        return {'instantes': list(self.instantes), 'valores': list(self.valores)}
+
+
+class Metricas:
+    """Coleta de latências, séries temporais e vazão de eventos da simulação
+
+    Os pontos instrumentados testam `ativo` antes de medir qualquer coisa;
+    com METRICAS_DESATIVADAS (o padrão de Fila, Hospital e do simulador) o
+    custo é só esse teste.
+    """
+
+    ativo = True
+
+    def __init__(self, intervalo_amostragem: float = INTERVALO_AMOSTRAGEM,
+                 limites_latencia: Sequence[float] = LIMITES_LATENCIA):
+        """
+        Args:
+            intervalo_amostragem: Segundos simulados mínimos entre pontos de uma série
+            limites_latencia: Limites das faixas dos histogramas (segundos)
+        """
+        self.intervalo_amostragem = intervalo_amostragem
+        self.limites_latencia = tuple(limites_latencia)
+        self.latencias: Dict[str, Histograma] = {}
+        self.series: Dict[Tuple[str, str], SerieTemporal] = {}  # (nome, rótulo): série
+        self.eventos = 0
+        self._primeiro_evento: Optional[float] = None
+        self._ultimo_evento: Optional[float] = None
+
+    def observar(self, operacao: str, segundos: float) -> None:
+        """Registra a latência de uma execução da operação"""
+        histograma = self.latencias.get(operacao)
+        if histograma is None:
+            histograma = self.latencias[operacao] = Histograma(self.limites_latencia)
+        histograma.observar(segundos)
+
+    def amostrar(self, nome: str, instante: float, valor: float, rotulo: str = '') -> None:
+        """Registra o valor de uma série (ex.: tamanho de fila) no instante simulado"""
+        serie = self.series.get((nome, rotulo))
+        if serie is None:
+            serie = self.series[(nome, rotulo)] = SerieTemporal(self.intervalo_amostragem)
+        serie.amostrar(instante, valor)
+
+    def contar_evento(self, quantidade: int = 1) -> None:
+        """Conta eventos processados para o cálculo de eventos por segundo"""
+        agora = perf_counter()
+        if self._primeiro_evento is None:
+            self._primeiro_evento = agora
+        self._ultimo_evento = agora
+        self.eventos += quantidade
+
+    @property
+    def eventos_por_segundo(self) -> float:
+        if self._primeiro_evento is None or self._ultimo_evento == self._primeiro_evento:
+            return 0.0
+        return self.eventos / (self._ultimo_evento - self._primeiro_evento)
+
+    def para_dict(self) -> Dict:
+        series = {}
+        for (nome, rotulo), serie in self.series.items():
+            series.setdefault(nome, {})[rotulo] = serie.para_dict()
+        return {
+            'latencias': {operacao: h.para_dict() for operacao, h in self.latencias.items()},
+            'series': series,
+            'eventos': {'total': self.eventos, 'por_segundo': self.eventos_por_segundo}
+        }
+
+    def exportar_json(self, caminho: Optional[str] = None) -> str:
+        """Retorna as métricas em JSON e, se informado, grava-as em `caminho`"""
+        texto = json.dumps(self.para_dict(), ensure_ascii=False)
+        if caminho:
+            with open(caminho, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(texto)
+        return texto
+
+    def exportar_prometheus(self) -> str:
+        """Retorna as métricas no formato de texto de exposição do Prometheus
+
+        Das séries temporais é exportado apenas o último valor, como gauge.
+        """
+        linhas = []
+        nome = f'{PREFIXO_PROMETHEUS}_latencia_segundos'
+        if self.latencias:
+            linhas.append(f'# HELP {nome} Latência das operações instrumentadas')
+            linhas.append(f'# TYPE {nome} histogram')
+        for operacao, histograma in self.latencias.items():
+            acumulado = 0
+            for limite, contagem in zip(histograma.limites, histograma.contagens):
+                acumulado += contagem
+                linhas.append(f'{nome}_bucket{{operacao="{operacao}",le="{limite:g}"}} {acumulado}')
+            linhas.append(f'{nome}_bucket{{operacao="{operacao}",le="+Inf"}} {histograma.quantidade}')
+            linhas.append(f'{nome}_sum{{operacao="{operacao}"}} {histograma.soma!r}')
+            linhas.append(f'{nome}_count{{operacao="{operacao}"}} {histograma.quantidade}')
+
+        for nome_serie in dict.fromkeys(nome for nome, _ in self.series):
+            nome = f'{PREFIXO_PROMETHEUS}_{nome_serie}'
+            linhas.append(f'# TYPE {nome} gauge')
+            for (serie_nome, rotulo), serie in self.series.items():
+                if serie_nome == nome_serie and serie.ultimo is not None:
+                    rotulos = f'{{rotulo="{rotulo}"}}' if rotulo else ''
+                    linhas.append(f'{nome}{rotulos} {serie.ultimo!r}')
+
+        linhas.append(f'# TYPE {PREFIXO_PROMETHEUS}_eventos_total counter')
+        linhas.append(f'{PREFIXO_PROMETHEUS}_eventos_total {self.eventos}')
+        linhas.append(f'# TYPE {PREFIXO_PROMETHEUS}_eventos_por_segundo gauge')
+        linhas.append(f'{PREFIXO_PROMETHEUS}_eventos_por_segundo {self.eventos_por_segundo!r}')
+        return '\n'.join(linhas) + '\n'
+
+
+class MetricasDesativadas(Metricas):
+    """Coletor que descarta tudo; é o padrão quando a instrumentação não é pedida"""
+
+    ativo = False
+
+    def observar(self, operacao: str, segundos: float) -> None:
+        pass
+
+    def amostrar(self, nome: str, instante: float, valor: float, rotulo: str = '') -> None:
+        pass
+
+    def contar_evento(self, quantidade: int = 1) -> None:
+        pass
+
+
+METRICAS_DESATIVADAS = MetricasDesativadas()
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class Relogio(ABC):
+    """Fonte de tempo usada pelos modelos e pelo simulador (timestamps em segundos)"""
+
+    @abstractmethod
+    def agora(self) -> float:
+        """Retorna o instante atual"""
+
+    @abstractmethod
+    def dormir(self, segundos: float) -> None:
+        """Aguarda a passagem de `segundos` no tempo deste relógio"""
+
+
+class RelogioAssincrono(Relogio):
+    """Relógio que também pode ser aguardado por tarefas asyncio"""
+
+    @abstractmethod
+    async def aguardar(self, segundos: float) -> None:
+        """Versão assíncrona de dormir(), que libera o laço de eventos enquanto espera"""
+
+
+class RelogioReal(RelogioAssincrono):
+    """Relógio de parede do sistema"""
+
+    def agora(self) -> float:
+        return time.time()
+
+    def dormir(self, segundos: float) -> None:
+        time.sleep(segundos)
+
+    async def aguardar(self, segundos: float) -> None:
+        await asyncio.sleep(max(0, segundos))
+
+
+class RelogioSimulado(Relogio):
+    """Relógio manual: o tempo só avança quando solicitado, sem esperas reais"""
+
+    def __init__(self, inicio: float = 0.0):
+        self._agora = inicio
+
+    def agora(self) -> float:
+        return self._agora
+
+    def avancar(self, segundos: float) -> None:
+        """Avança o relógio em `segundos`"""
+        if segundos < 0:
+            raise ValueError("O relógio simulado não pode retroceder")
+        self._agora += segundos
+
+    def definir(self, instante: float) -> None:
+        """Posiciona o relógio em `instante`"""
+        if instante < self._agora:
+            raise ValueError("O relógio simulado não pode retroceder")
+        self._agora = instante
+
+    def dormir(self, segundos: float) -> None:
+        self.avancar(segundos)
+
+    # Não é um RelogioAssincrono: com várias tarefas esperando ao mesmo tempo,
+    # um relógio manual não tem como decidir sozinho até onde avançar
+
+
+class RelogioAcelerado(RelogioAssincrono):
+    """Relógio que corre `fator` vezes mais rápido que o tempo real"""
+
+    def __init__(self, fator: float, inicio: Optional[float] = None):
+        """
+        Args:
+            fator: Quantos segundos simulados passam a cada segundo real
+            inicio: Instante simulado de partida (padrão: agora)
+        """
+        if fator <= 0:
+            raise ValueError("O fator de aceleração deve ser positivo")
+        self.fator = fator
+        self._origem_real = time.time()
+        self._origem = inicio if inicio is not None else self._origem_real
+
+    def agora(self) -> float:
+        return self._origem + (time.time() - self._origem_real) * self.fator
+
+    def dormir(self, segundos: float) -> None:
+        time.sleep(segundos / self.fator)
+
+    async def aguardar(self, segundos: float) -> None:
+        await asyncio.sleep(max(0, segundos) / self.fator)
+
+
+RELOGIO_REAL = RelogioReal()
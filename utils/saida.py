@@ -0,0 +1,265 @@
+"""Saída de mensagens da simulação e do hospital
+
+As mensagens passam pelo logging da biblioteca padrão, sob o logger 'hospital'.
+Sem configurar_saida(), as mensagens de cada evento são descartadas (como em
+qualquer biblioteca), mas o que é pedido explicitamente, via mostrar()
+(estado do hospital, fila, relatório, status da simulação), é impresso no
+stdout. A aplicação escolhe nível, destino e se a gravação é feita em lotes:
+
+    configurar_saida()                          # console, em lotes
+    configurar_saida(destino='simulacao.log')   # arquivo, com data e nível
+    configurar_saida(silencioso=True)           # descarta tudo
+
+Na gravação em lotes, quem registra a mensagem só a coloca numa fila; uma
+thread em segundo plano formata e grava os registros acumulados de uma vez.
+Depois de um lote incompleto ela espera `intervalo` segundos para juntar mais
+registros; lotes cheios são gravados sem espera. Os argumentos das
+mensagens são formatados nessa thread, então devem ser valores imutáveis
+(nomes, números), não objetos que a simulação ainda vai alterar.
+"""
+import atexit
+import logging
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Optional, Union
+
+NOME_RAIZ = 'hospital'
+SILENCIOSO = logging.CRITICAL + 10  # nível acima de qualquer mensagem
+TAMANHO_LOTE = 1024  # registros gravados por vez, no máximo
+INTERVALO_GRAVACAO = 0.05  # espera para acumular registros após um lote incompleto
+LIMITE_PENDENTES = 100000  # registros aguardando gravação antes de descartar os novos
+FORMATO_CONSOLE = '%(message)s'
+FORMATO_ARQUIVO = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+_RAIZ = logging.getLogger(NOME_RAIZ)
+_RAIZ.addHandler(logging.NullHandler())  # sem configuração, não recorre ao stderr
+
+
+def obter_logger(nome: str) -> logging.Logger:
+    """Retorna o logger de um módulo, subordinado ao logger 'hospital'
+    Args:
+        nome: Nome do módulo (normalmente __name__)
+    """
+    return logging.getLogger(f'{NOME_RAIZ}.{nome}')
+
+
+class GravadorEmLote(logging.Handler):
+    """Handler que só enfileira os registros; uma thread os formata e grava em lotes
+
+    Se a gravação não acompanhar e houver mais de `limite_pendentes` registros
+    na fila, os novos são descartados e contados, e uma linha informando
+    quantos foram perdidos é gravada no lote seguinte.
+    """
+
+    def __init__(self, fluxo: IO[str], tamanho_lote: int = TAMANHO_LOTE,
+                 intervalo: float = INTERVALO_GRAVACAO,
+                 limite_pendentes: Optional[int] = LIMITE_PENDENTES):
+        """
+        Args:
+            fluxo: Destino das mensagens (ex.: sys.stdout ou um arquivo aberto)
+            tamanho_lote: Máximo de registros por gravação
+            intervalo: Espera após um lote incompleto (0 grava assim que possível)
+            limite_pendentes: Registros pendentes a partir dos quais os novos são
+                descartados (None nunca descarta)
+        """
+        super().__init__()
+        self.fluxo = fluxo
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.limite_pendentes = limite_pendentes
+        self.gravados = 0
+        self.lotes = 0
+        self.descartados = 0
+        self._descartados_avisados = 0
+        self._pendentes: 'queue.SimpleQueue' = queue.SimpleQueue()
+        self._acordar = threading.Event()  # interrompe a espera entre lotes
+        self._thread = threading.Thread(target=self._gravar, name='gravador-saida', daemon=True)
+        self._thread.start()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # Sem o lock do Handler: a fila já é segura entre threads
+        if not self.filter(record):
+            return False
+        self.emit(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.limite_pendentes is not None and self._pendentes.qsize() >= self.limite_pendentes:
+            self.descartados += 1
+            return
+        if record.exc_info:
+            # O traceback não sobrevive à troca de thread: formata aqui
+            self.format(record)
+            record.exc_info = None
+        self._pendentes.put(record)
+
+    def flush(self) -> None:
+        """Aguarda a gravação de tudo o que foi registrado até agora"""
+        if self._thread.is_alive():
+            gravado = threading.Event()
+            self._pendentes.put(gravado)
+            self._acordar.set()
+            gravado.wait()
+
+    def close(self) -> None:
+        """Grava os registros pendentes e encerra a thread"""
+        if self._thread.is_alive():
+            self._pendentes.put(None)
+            self._acordar.set()
+            self._thread.join()
+        super().close()
+
+    def _gravar(self) -> None:
+        while True:
+            lote = [self._pendentes.get()]
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(self._pendentes.get_nowait())
+                except queue.Empty:
+                    break
+            registros = [item for item in lote if isinstance(item, logging.LogRecord)]
+            self._escrever(registros)
+            for item in lote:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in lote:
+                return
+            if self.intervalo and len(lote) < self.tamanho_lote:
+                self._acordar.wait(self.intervalo)
+                self._acordar.clear()
+
+    def _escrever(self, registros: List[logging.LogRecord]) -> None:
+        linhas = []
+        descartados = self.descartados - self._descartados_avisados
+        if descartados:
+            linhas.append(f'... {descartados} mensagens descartadas (gravação sobrecarregada)')
+            self._descartados_avisados += descartados
+        for registro in registros:
+            try:
+                linhas.append(self.format(registro))
+            except Exception:
+                self.handleError(registro)
+        if not linhas:
+            return
+        try:
+            self.fluxo.write('\n'.join(linhas) + '\n')
+            self.fluxo.flush()
+        except Exception:
+            if registros:
+                self.handleError(registros[-1])
+        self.gravados += len(registros)
+        self.lotes += 1
+
+
+_handler: Optional[logging.Handler] = None
+_arquivo: Optional[IO[str]] = None
+
+
+def configurar_saida(nivel: int = logging.INFO, destino: Union[None, str, IO[str]] = None,
+                     em_lote: bool = True, silencioso: bool = False,
+                     formato: Optional[str] = None, **opcoes) -> Optional[logging.Handler]:
+    """Define para onde vão as mensagens do hospital e da simulação
+
+    Substitui a configuração anterior (gravando o que estava pendente).
+
+    Args:
+        nivel: Nível mínimo exibido (ex.: logging.WARNING omite início e fim de atendimentos)
+        destino: None para o console (stdout), caminho de arquivo (acrescentado) ou fluxo aberto
+        em_lote: Se True, grava numa thread separada, em lotes; se False, a cada mensagem
+        silencioso: Se True, descarta todas as mensagens sem formatá-las
+        formato: Formato do logging (padrão: só a mensagem no console; data,
+            nível e origem em arquivo)
+        opcoes: Repassadas a GravadorEmLote (tamanho_lote, intervalo, limite_pendentes)
+    Returns:
+        logging.Handler: O handler instalado (None no modo silencioso)
+    """
+    global _handler, _arquivo
+    encerrar_saida()
+    if silencioso:
+        _RAIZ.setLevel(SILENCIOSO)
+        return None
+
+    if destino is None:
+        fluxo = sys.stdout
+    elif isinstance(destino, str):
+        fluxo = _arquivo = open(destino, 'a', encoding='utf-8')
+    else:
+        fluxo = destino
+    if formato is None:
+        formato = FORMATO_ARQUIVO if isinstance(destino, str) else FORMATO_CONSOLE
+
+    _handler = GravadorEmLote(fluxo, **opcoes) if em_lote else logging.StreamHandler(fluxo)
+    _handler.setFormatter(logging.Formatter(formato))
+    _RAIZ.addHandler(_handler)
+    _RAIZ.setLevel(nivel)
+    _RAIZ.propagate = False
+    return _handler
+
+
+def descarregar_saida() -> None:
+    """Aguarda a gravação das mensagens pendentes (ex.: antes de imprimir diretamente)"""
+    if _handler is not None:
+        _handler.flush()
+
+
+def encerrar_saida() -> None:
+    """Grava as mensagens pendentes e remove a configuração atual"""
+    global _handler, _arquivo
+    if _handler is not None:
+        _RAIZ.removeHandler(_handler)
+        _handler.close()
+        _handler = None
+    if _arquivo is not None:
+        _arquivo.close()
+        _arquivo = None
+    _RAIZ.setLevel(logging.NOTSET)
+    _RAIZ.propagate = True
+
+
+@contextmanager
+def silenciar() -> Iterator[None]:
+    """Descarta as mensagens do hospital dentro do bloco, restaurando o nível depois"""
+    nivel = _RAIZ.level
+    _RAIZ.setLevel(SILENCIOSO)
+    try:
+        yield
+    finally:
+        _RAIZ.setLevel(nivel)
+
+
+atexit.register(encerrar_saida)
+
+
+def _sem_configuracao() -> bool:
+    """True se nem configurar_saida(), nem silenciar(), nem a aplicação (no
+    logger raiz) definiram para onde vão as mensagens"""
+    return _handler is None and _RAIZ.level == logging.NOTSET and not logging.getLogger().handlers
+
+
+def mostrar_ativo(logger: logging.Logger) -> bool:
+    """Indica se mostrar() vai exibir algo (para não montar textos que seriam descartados)"""
+    return _sem_configuracao() or logger.isEnabledFor(logging.INFO)
+
+
+def mostrar(logger: logging.Logger, mensagem: str, *args) -> None:
+    """Exibe uma saída pedida explicitamente (estado, fila, relatório, status)
+
+    Com a saída configurada, vai pelo logger no nível INFO, respeitando nível,
+    destino e silenciar(); sem configuração, é impressa direto no stdout.
+    """
+    if _sem_configuracao():
+        print(mensagem % args if args else mensagem)
+    else:
+        logger.info(mensagem, *args)
+
+
+def registrar_evento(logger: logging.Logger, mensagem: str, *args) -> None:
+    """Equivalente a logger.info() para mensagens emitidas a cada evento
+
+    Não procura o arquivo e a linha de origem na pilha (a parte mais cara de
+    criar um registro); %(pathname)s e %(lineno)d ficam vazios.
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.handle(logger.makeRecord(logger.name, logging.INFO, '', 0, mensagem, args, None))